@@ -1,25 +1,37 @@
 from __future__ import annotations
 import argparse
-import csv
-import io
 import logging
 import os
-from datetime import datetime
+import sys
+import threading
 from typing import List, Dict, Optional, Tuple
 
-from flask import Flask, render_template, request, redirect, url_for, flash, jsonify
+from flask import Flask, render_template, request, redirect, url_for, flash, jsonify, abort
 
 from steam.clients import (
     resolve_steam64,
     fetch_friends,
     check_library_access,
-    fetch_library,
+    check_access_many,
+    fetch_libraries,
+    RESPONSE_CACHE,
+    GATE,
 )
-from steam.aggregate import aggregate
-from steam.util import slugify, is_steam64, unique_by_steam64
+from steam.aggregate import IncrementalAggregator
+from steam.jobs import Job, JobManager, QUEUED, CHECKING, FETCHING, PARSED, FAILED, EXCLUDED
+from steam.util import unique_by_steam64, iter_id_csv
+from steam.resolver import resolve_entries
+from steam.cli import add_network_args, configure, main as cli_main, write_results, write_store_csv
+from steam.results_index import DEFAULT_SORT, ResultsIndex
+from steam.journal import RunJournal, RunState, dismiss_run, list_runs, open_journal, run_summary
+from steam.metrics import METRICS, metrics_path, run_metrics, stage, write_json
 
 APP_HOST = "127.0.0.1"
 APP_PORT = 8765
+# extra result formats written next to the CSV (see steam.export), set by --format
+EXPORT_FORMATS: List[str] = []
+# add store data (steam.store) to each run's results, set by --enrich
+ENRICH = False
 
 logging.basicConfig(level=logging.INFO, format='[%(asctime)s] %(levelname)s: %(message)s')
 logger = logging.getLogger("steamagg")
@@ -27,19 +39,37 @@ logger = logging.getLogger("steamagg")
 app = Flask(__name__)
 app.secret_key = os.environ.get("FLASK_SECRET", "dev-secret")
 
-# In-memory stash for current session (simple and local only)
+# In-memory stash for current session (simple and local only): one user, one seed at a time.
+# Request threads and background jobs both touch it, so every access goes through SESSION_LOCK.
+SESSION_LOCK = threading.Lock()
 SESSION_STATE = {
     "seed_input": None,
     "seed64": None,
     "seed_accessible": None,
     "friends": [],  # list of dicts: {steam64, name}
-    "access_checked": {},  # steam64 -> bool/None
+    "access_checked": {},  # steam64 -> bool, answers Steam actually gave
 }
 
 
+def _session() -> dict:
+    """A consistent copy of SESSION_STATE, access results included."""
+    with SESSION_LOCK:
+        return dict(SESSION_STATE, access_checked=dict(SESSION_STATE["access_checked"]))
+
+
+def _remember_access(steam64: str, ok: bool) -> None:
+    with SESSION_LOCK:
+        SESSION_STATE["access_checked"][steam64] = ok
+
+
+# Background runs so /run returns immediately; several can be in flight at once.
+JOBS = JobManager(max_workers=4)
+MAX_PAGE_ROWS = 500  # per /api/results request
+
+
 @app.get("/")
 def index():
-    return render_template("index.html")
+    return render_template("index.html", runs=list_runs(finished=False, limit=5))
 
 
 def parse_uploaded_csv(file_storage) -> List[Tuple[str, str]]:
@@ -48,12 +78,7 @@ def parse_uploaded_csv(file_storage) -> List[Tuple[str, str]]:
     if not file_storage or file_storage.filename == '':
         return out
     try:
-        data = file_storage.stream.read().decode('utf-8', errors='ignore')
-        rdr = csv.DictReader(io.StringIO(data))
-        for row in rdr:
-            vanity = (row.get('vanity') or '').strip()
-            steam64_id = (row.get('steam64_id') or '').strip()
-            out.append((vanity, steam64_id))
+        out.extend(iter_id_csv(file_storage.stream))
     except Exception as e:
         logger.exception("Failed to parse uploaded CSV: %s", e)
         flash("Could not parse the uploaded CSV. Ensure headers: vanity,steam64_id.", "error")
@@ -76,15 +101,11 @@ def load_friends():
 
     # Ingest CSV entries and resolve any vanities
     csv_entries = parse_uploaded_csv(csv_file)
-    resolved: List[Tuple[str, Optional[str]]] = []
-    for vanity, s64 in csv_entries:
-        if s64 and is_steam64(s64):
-            resolved.append((vanity or s64, s64))
-        elif vanity:
-            r, _err = resolve_steam64(vanity)
-            if r:
-                resolved.append((vanity, r))
-        # else: skip blanks
+    resolved, failures = resolve_entries(csv_entries)
+    if failures:
+        shown = ", ".join(f"{v} ({err})" for v, err in failures[:5])
+        more = f" and {len(failures) - 5} more" if len(failures) > 5 else ""
+        flash(f"Could not resolve {len(failures)} CSV row(s): {shown}{more}.", "warn")
 
     # Build friend candidate set from the seed's friends page if we have a seed64
     friends = []
@@ -108,214 +129,369 @@ def load_friends():
     if seed64:
         try:
             seed_access = check_library_access(seed64)
-        except Exception:
-            seed_access = False
+        except Exception as e:
+            logger.warning("Access check failed for seed %s: %s", seed64, e)
+            flash("Could not check the seed's library access; it will be skipped unless checked again.", "warn")
 
     # Stash state
-    SESSION_STATE.update({
-        "seed_input": seed_input,
-        "seed64": seed64,
-        "seed_accessible": seed_access,
-        "friends": friends,
-        "access_checked": {},
-    })
+    with SESSION_LOCK:
+        SESSION_STATE.update({
+            "seed_input": seed_input,
+            "seed64": seed64,
+            "seed_accessible": seed_access,
+            "friends": friends,
+            "access_checked": {},
+        })
 
     return render_template("friends.html", seed64=seed64, seed_access=seed_access, friends=friends)
 
 
+def _badge(steam64: str, ok: Optional[bool], **extra) -> str:
+    if ok is None:
+        return render_template("_badge.html", badge_id=steam64, status="error", text="Check failed", **extra)
+    return render_template("_badge.html", badge_id=steam64, status=("ok" if ok else "bad"),
+                           text=("OK" if ok else "Not accessible"), **extra)
+
+
 @app.post("/check_access")
 def check_access():
     steam64 = (request.form.get("steam64") or '').strip()
     if not steam64:
         return render_template("_badge.html", status="error", text="No ID"), 400
-    try:
-        ok = check_library_access(steam64)
-    except Exception:
-        ok = False
-    SESSION_STATE["access_checked"][steam64] = ok
-    return render_template("_badge.html", status=("ok" if ok else "bad"), text=("OK" if ok else "Not accessible"))
+    with SESSION_LOCK:
+        ok = SESSION_STATE["access_checked"].get(steam64)
+    if ok is None:
+        try:
+            ok = check_library_access(steam64)
+        except Exception as e:
+            logger.warning("Access check failed for %s: %s", steam64, e)
+            return _badge(steam64, None)
+        _remember_access(steam64, ok)
+    return _badge(steam64, ok)
+
+
+@app.post("/check_access_batch")
+def check_access_batch():
+    """Check a whole list of steam64s in the background; badges stream back via polling."""
+    ids = list(dict.fromkeys(s.strip() for s in request.form.getlist('steam64') if s.strip()))
+    job = JOBS.submit("access", _check_access_job, ids)
+    job.data["total"] = len(ids)
+    if request.accept_mimetypes.best == 'application/json':
+        return jsonify({"job_id": job.id, "status_url": url_for('job_status', job_id=job.id)}), 202
+    return _access_batch_fragment(job, since=0)
+
+
+@app.get("/check_access_batch/<job_id>")
+def check_access_batch_progress(job_id: str):
+    job = _job_or_404(job_id)
+    return _access_batch_fragment(job, since=request.args.get('since', 0, type=int))
+
+
+def _check_access_job(job: Job, ids: List[str]) -> Dict[str, Optional[bool]]:
+    results: List[Tuple[str, Optional[bool]]] = job.data.setdefault("results", [])
+    for s64 in ids:
+        job.set_user(s64, QUEUED)
+    for s64, ok in check_access_many(ids, on_start=lambda u: job.set_user(u, CHECKING)):
+        if ok is None:
+            job.set_user(s64, FAILED)
+        else:
+            _remember_access(s64, ok)
+            job.set_user(s64, PARSED if ok else EXCLUDED)
+        results.append((s64, ok))
+    return dict(results)
+
+
+def _access_batch_fragment(job: Job, since: int) -> str:
+    # read "done" before the results so a finished job never hides its last few answers
+    finished = job.done
+    results = list(job.data.get("results", ()))
+    since = max(0, min(since, len(results)))
+    return render_template("_access_batch.html", job_id=job.id, results=results[since:],
+                           since=len(results), total=job.data.get("total", len(job.users)),
+                           finished=finished)
+
 
 @app.post("/confirm_selection")
 def confirm_selection():
     selected = request.form.getlist('friend')
     selected = list(dict.fromkeys([s for s in selected if s]))
 
-    accessible, inaccessible = [], []
-    for s64 in selected:
-        st = SESSION_STATE["access_checked"].get(s64)
-        if st is None:
-            try:
-                st = check_library_access(s64)
-            except Exception:
-                st = False
-            SESSION_STATE["access_checked"][s64] = st
-        (accessible if st else inaccessible).append(s64)
-
-    seed64 = SESSION_STATE.get("seed64")
-    seed_access = SESSION_STATE.get("seed_accessible")
+    state = _session()
+    known = state["access_checked"]
+    unknown = [s64 for s64 in selected if known.get(s64) is None]
+    for s64, ok in check_access_many(unknown):
+        if ok is not None:
+            known[s64] = ok
+            _remember_access(s64, ok)
+
+    accessible = [s64 for s64 in selected if known.get(s64)]
+    inaccessible = [s64 for s64 in selected if not known.get(s64)]
+
+    seed64 = state.get("seed64")
+    seed_access = state.get("seed_accessible")
     return render_template("_confirm.html",
                            seed64=seed64, seed_access=seed_access,
                            accessible=accessible, inaccessible=inaccessible)
 
+def write_results_csv(agg_rows: List[dict], seed_label: str) -> str:
+    """Write the run's CSV plus any extra EXPORT_FORMATS; returns the CSV path."""
+    return write_results(agg_rows, seed_label, EXPORT_FORMATS)
+
+
 @app.post("/run")
 def run_pass1():
     # Selected friend ids (checkboxes)
     selected = request.form.getlist('friend')  # list of steam64 strings
     selected = list(dict.fromkeys([s for s in selected if s]))  # dedupe preserve order
 
+    state = _session()
+    seed64 = state.get("seed64")
+    if not seed64 and not selected:
+        flash("No accessible profiles selected (seed + friends). Please select at least one accessible profile.", "error")
+        return redirect(url_for('index'))
+
+    # The fetch phase can take minutes (gate delays, backoff); run it off the request thread.
+    job = JOBS.submit(
+        "run", _run_pass1_job,
+        seed64=seed64,
+        seed_access=state.get("seed_accessible"),
+        seed_label=state.get("seed_input") or (seed64 or "unknown"),
+        selected=selected,
+        access_checked=state["access_checked"],
+    )
+    if request.accept_mimetypes.best == 'application/json':
+        return jsonify({"job_id": job.id, "status_url": url_for('job_status', job_id=job.id)}), 202
+    return redirect(url_for('job_page', job_id=job.id), code=303)
+
+
+def _run_pass1_job(job: Job, seed64: Optional[str], seed_access: Optional[bool], seed_label: str,
+                   selected: List[str], access_checked: Dict[str, bool], run_id: Optional[str] = None) -> dict:
+    journal, done = open_journal(run_id, mode="web", seed64=seed64, seed_access=seed_access,
+                                 seed_label=seed_label, selected=selected)
+    job.data["run_id"] = journal.run_id
+    with journal, run_metrics() as rm:
+        job.data["metrics"] = rm
+        return _run_pass1(job, journal, done, seed64, seed_access, seed_label, selected, access_checked)
+
+
+def _run_pass1(job: Job, journal: RunJournal, done: RunState, seed64: Optional[str], seed_access: Optional[bool], seed_label: str,
+               selected: List[str], access_checked: Dict[str, bool]) -> dict:
     included_users: List[str] = []
     excluded_users: List[str] = []
 
-    seed64 = SESSION_STATE.get("seed64")
-    seed_access = SESSION_STATE.get("seed_accessible")
-
     # Determine who to include
     if seed64 and seed_access:
         included_users.append(seed64)
+        job.set_user(seed64, QUEUED)
     elif seed64 and not seed_access:
-        flash("Seed library appears private/unavailable; proceeding with accessible friends only.", "warn")
+        job.message("warn", "Seed library appears private/unavailable; proceeding with accessible friends only.")
 
     # For selected friends: include if accessible, else keep but mark excluded
-    # Immediate validation may have run; if absent, re-check now.
+    # Immediate validation may have run; check whatever is left concurrently.
+    access_checked = dict(access_checked, **done.access)
+    unknown = [s64 for s64 in selected if access_checked.get(s64) is None]
+    with stage("access"):
+        for s64, ok in check_access_many(unknown, on_start=lambda u: job.set_user(u, CHECKING)):
+            if ok is None:
+                # not journalled, so a resumed run checks it again
+                job.message("warn", f"Could not check library access for {s64}; left out of this run.")
+                continue
+            access_checked[s64] = ok
+            _remember_access(s64, ok)
+            journal.access(s64, ok)
     for s64 in selected:
-        ok = SESSION_STATE["access_checked"].get(s64)
-        if ok is None:
-            try:
-                ok = check_library_access(s64)
-            except Exception:
-                ok = False
-        if ok:
+        if access_checked.get(s64):
             included_users.append(s64)
+            job.set_user(s64, QUEUED)
         else:
             excluded_users.append(s64)
+            job.set_user(s64, EXCLUDED)
 
     included_users = list(dict.fromkeys(included_users))
 
     if not included_users:
-        flash("No accessible profiles selected (seed + friends). Please select at least one accessible profile.", "error")
-        return redirect(url_for('index'))
+        raise RuntimeError("No accessible profiles selected (seed + friends). Please select at least one accessible profile.")
 
-    # Fetch libraries
-    games_by_user: Dict[str, List[dict]] = {}
-    errors: List[str] = []
+    # Fetch libraries, folding each into the family totals as it lands;
+    # a resumed run already has some of them in its journal
+    agg = IncrementalAggregator()
+    job.data["aggregator"] = agg
     for uid in included_users:
-        try:
-            rows = fetch_library(uid)
-            games_by_user[uid] = rows
-        except Exception as e:
-            logger.exception("Library fetch failed for %s: %s", uid, e)
-            errors.append(uid)
-
-    if not games_by_user:
-        flash("Failed to fetch any libraries due to network/parse errors.", "error")
-        return redirect(url_for('index'))
-
-    # Aggregate
-    agg_rows = aggregate(games_by_user)
-
-    # Write CSV
-    os.makedirs('output', exist_ok=True)
-    seed_slug = slugify(SESSION_STATE.get("seed_input") or (seed64 or "unknown"))
-    ts = datetime.now().strftime('%Y-%m-%d_%H-%M')
-    csv_path = os.path.join('output', f'libraries_{ts}_seed-{seed_slug}.csv')
-
-    headers = ["appid", "name", "family_playtime_forever_h", "family_playtime_recent_h", "owners_count"]
-    with open(csv_path, 'w', newline='', encoding='utf-8') as f:
-        w = csv.DictWriter(f, fieldnames=headers)
-        w.writeheader()
-        for row in agg_rows:
-            w.writerow(row)
+        if uid in done.libraries:
+            agg.add_user(uid, done.libraries[uid])
+            job.set_user(uid, PARSED)
+    pending = [uid for uid in included_users if uid not in done.libraries]
+    with stage("fetch_libraries"):
+        for uid, rows, err in fetch_libraries(pending, on_start=lambda u: job.set_user(u, FETCHING)):
+            if err is not None:
+                logger.error("Library fetch failed for %s: %s", uid, err, exc_info=err)
+                journal.failed(uid, str(err) or type(err).__name__)
+                job.set_user(uid, FAILED)
+            else:
+                journal.library(uid, rows)
+                agg.add_user(uid, rows)
+                job.set_user(uid, PARSED)
+
+    if not agg.users:
+        raise RuntimeError("Failed to fetch any libraries due to network/parse errors.")
+
+    # Aggregate (already folded in; just round and sort)
+    with stage("aggregate"):
+        agg_rows = agg.snapshot()
+    logger.info("Response cache: %s", RESPONSE_CACHE.stats())
+    logger.info("Rate limiter: %s", GATE.stats())
+
+    with stage("write"):
+        csv_path = write_results_csv(agg_rows, seed_label)
+    journal.done(csv_path)
+    if ENRICH:
+        with stage("enrich"):
+            job.message("info", f"Store data saved to {write_store_csv(agg_rows, csv_path)}.")
 
     if excluded_users:
-        flash(f"Run complete: {len(included_users)} included, {len(excluded_users)} excluded (private/inaccessible).", "info")
-
-    return render_template("results.html", rows=agg_rows, csv_path=csv_path)
-
-
-# ---------------------------
-# Optional CLI (no UI)
-# ---------------------------
-
-def run_cli(seed: Optional[str], input_csv: Optional[str]):
-    if not seed and not input_csv:
-        print("Provide --seed or --input-csv for CLI mode.")
-        return
-
-    seed64 = None
-    if seed:
-        seed64, err = resolve_steam64(seed)
-        if not seed64:
-            print(f"Seed could not be resolved: {err}")
-
-    candidates = []
-    if seed64:
-        try:
-            candidates = fetch_friends(seed64)
-        except Exception as e:
-            logger.warning("CLI: could not fetch friends: %s", e)
-
-    # ingest CSV
-    if input_csv and os.path.exists(input_csv):
-        with open(input_csv, 'r', encoding='utf-8') as f:
-            rdr = csv.DictReader(f)
-            for row in rdr:
-                vanity = (row.get('vanity') or '').strip()
-                s64 = (row.get('steam64_id') or '').strip()
-                if s64 and is_steam64(s64):
-                    candidates.append({"steam64": s64, "name": vanity or s64})
-                elif vanity:
-                    r, _ = resolve_steam64(vanity)
-                    if r:
-                        candidates.append({"steam64": r, "name": vanity})
-
-    candidates = unique_by_steam64(candidates)
-
-    included = []
-    if seed64 and check_library_access(seed64):
-        included.append(seed64)
-
-    # choose up to 5 first accessible friends
-    for c in candidates:
-        if len(included) >= (1 + 5):
-            break
-        s64 = c['steam64']
-        if check_library_access(s64):
-            included.append(s64)
-
-    if not included:
-        print("CLI: no accessible profiles.")
-        return
-
-    games_by_user = {}
-    for uid in included:
-        try:
-            games_by_user[uid] = fetch_library(uid)
-        except Exception as e:
-            logger.warning("CLI: library fetch failed for %s: %s", uid, e)
-
-    agg_rows = aggregate(games_by_user)
-
-    os.makedirs('output', exist_ok=True)
-    seed_slug = slugify(seed or (seed64 or "unknown"))
-    ts = datetime.now().strftime('%Y-%m-%d_%H-%M')
-    csv_path = os.path.join('output', f'libraries_{ts}_seed-{seed_slug}.csv')
-    headers = ["appid", "name", "family_playtime_forever_h", "family_playtime_recent_h", "owners_count"]
-    with open(csv_path, 'w', newline='', encoding='utf-8') as f:
-        w = csv.DictWriter(f, fieldnames=headers)
-        w.writeheader()
-        for row in agg_rows:
-            w.writerow(row)
-    print(f"Wrote {len(agg_rows)} rows to {csv_path}")
+        job.message("info", f"Run complete: {len(included_users)} included, {len(excluded_users)} excluded (private/inaccessible).")
+
+    # sort orders and the search index are built once, here, not per request
+    with stage("index"):
+        job.data["results_index"] = ResultsIndex(agg_rows)
+    write_json(job.data["metrics"], metrics_path(csv_path))
+    return {"rows": agg_rows, "csv_path": csv_path}
+
+
+@app.post("/runs/<run_id>/resume")
+def resume_run(run_id: str):
+    """Re-submit an interrupted web run; libraries already in its journal are not fetched again."""
+    run = run_summary(run_id)
+    meta = run["meta"] if run is not None else None
+    if meta is None or meta.get("mode") != "web":
+        abort(404)
+    job = JOBS.submit(
+        "run", _run_pass1_job,
+        seed64=meta.get("seed64"),
+        seed_access=meta.get("seed_access"),
+        seed_label=meta.get("seed_label") or "unknown",
+        selected=meta.get("selected") or [],
+        access_checked={},
+        run_id=run_id,
+    )
+    if request.accept_mimetypes.best == 'application/json':
+        return jsonify({"job_id": job.id, "status_url": url_for('job_status', job_id=job.id)}), 202
+    return redirect(url_for('job_page', job_id=job.id), code=303)
+
+
+@app.post("/runs/<run_id>/dismiss")
+def dismiss_interrupted_run(run_id: str):
+    """Drop an interrupted run from the start page; its journal is pruned with the finished ones."""
+    if not dismiss_run(run_id):
+        abort(404)
+    return redirect(url_for('index'), code=303)
+
+
+@app.get("/debug/limiter")
+def limiter_stats():
+    return jsonify(GATE.stats())
+
+
+@app.get("/metrics")
+def metrics():
+    """Process-wide request, gate, parse and stage metrics; Prometheus text, or ?format=json."""
+    if request.args.get('format') == 'json':
+        return jsonify(dict(METRICS.snapshot(), limiter=GATE.stats()))
+    return METRICS.to_prometheus(), 200, {"Content-Type": "text/plain; version=0.0.4"}
+
+
+@app.get("/debug/run/<run_id>")
+def run_metrics_page(run_id: str):
+    """One run's metrics, by job id or journal run id."""
+    job = JOBS.get(run_id) or next((j for j in JOBS.jobs("run") if j.data.get("run_id") == run_id), None)
+    rm = job.data.get("metrics") if job is not None else None
+    if rm is None:
+        abort(404)
+    return jsonify(dict(rm.snapshot(), job_id=job.id, run_id=job.data.get("run_id"), status=job.status))
+
+
+def _job_or_404(job_id: str) -> Job:
+    job = JOBS.get(job_id)
+    if job is None:
+        abort(404)
+    return job
+
+
+@app.get("/jobs/<job_id>")
+def job_page(job_id: str):
+    job = _job_or_404(job_id)
+    if job.done:
+        return redirect(url_for('job_results', job_id=job.id))
+    return render_template("job.html", job=job, **_progress_context(job))
+
+
+@app.get("/jobs/<job_id>/progress")
+def job_progress(job_id: str):
+    job = _job_or_404(job_id)
+    if job.done:
+        # htmx follows this header with a full page load
+        return "", 200, {"HX-Redirect": url_for('job_results', job_id=job.id)}
+    return render_template("_job_progress.html", job=job, **_progress_context(job))
+
+
+@app.get("/jobs/<job_id>/status")
+def job_status(job_id: str):
+    job = _job_or_404(job_id)
+    ctx = _progress_context(job)
+    return jsonify(dict(job.to_dict(), counts=ctx["counts"], games_so_far=ctx["games_so_far"]))
+
+
+@app.get("/jobs/<job_id>/results")
+def job_results(job_id: str):
+    job = _job_or_404(job_id)
+    if not job.done:
+        return redirect(url_for('job_page', job_id=job.id))
+    for category, message in job.messages:
+        flash(message, category)
+    if job.status == "failed":
+        flash(job.error or "Run failed.", "error")
+        return redirect(url_for('index'))
+    return render_template("results.html", job=job, total=len(job.result["rows"]), csv_path=job.result["csv_path"])
+
+
+@app.get("/api/results")
+def api_results():
+    """One page of a run's rows: ?job=<id> (default: the latest finished run), sort, order, q, offset, limit."""
+    job_id = request.args.get('job')
+    job = _job_or_404(job_id) if job_id else JOBS.latest("run", status="done")
+    index = job.data.get("results_index") if job is not None else None
+    if index is None:
+        abort(404)
+    sort = request.args.get('sort', DEFAULT_SORT[0])
+    order = request.args.get('order', DEFAULT_SORT[1])
+    q = request.args.get('q', '')
+    offset = request.args.get('offset', 0, type=int)
+    limit = min(request.args.get('limit', 100, type=int), MAX_PAGE_ROWS)
+    matched, rows = index.page(sort, order, q, offset, limit)
+    return jsonify({"job_id": job.id, "total": len(index), "matched": matched, "sort": sort, "order": order,
+                    "q": q, "offset": offset, "limit": limit, "rows": rows})
+
+
+def _progress_context(job: Job) -> dict:
+    agg = job.data.get("aggregator")
+    return {
+        "users": list(job.to_dict()["users"].items()),
+        "counts": job.counts(),
+        "games_so_far": len(agg) if agg is not None else 0,
+    }
 
 
 if __name__ == "__main__":
+    if '--no-ui' in sys.argv[1:]:
+        # CLI mode lives in steam.cli; Flask and the app above are already loaded, so
+        # `python -m steam.cli` starts faster
+        cli_main([a for a in sys.argv[1:] if a != '--no-ui'])
+        sys.exit(0)
     parser = argparse.ArgumentParser(description="Steam Family Library Aggregator – Pass 1")
-    parser.add_argument('--seed', help='Seed vanity or steam64 (CLI mode)')
-    parser.add_argument('--input-csv', help='Optional CSV with vanity,steam64_id (CLI mode)')
-    parser.add_argument('--no-ui', action='store_true', help='Run CLI mode (no web UI)')
+    parser.add_argument('--no-ui', action='store_true', help='Run CLI mode (no web UI); see python -m steam.cli --help')
+    add_network_args(parser)
     args = parser.parse_args()
 
-    if args.no_ui:
-        run_cli(args.seed, args.input_csv)
-    else:
-        app.run(host=APP_HOST, port=APP_PORT, debug=False)
+    ENRICH = args.enrich
+    EXPORT_FORMATS[:] = configure(args)
+    app.run(host=APP_HOST, port=APP_PORT, debug=False)
@@ -0,0 +1,60 @@
+"""Compare steam.aggregate.aggregate with the NumPy path from 10^3 to 10^6 rows.
+
+    python -m bench.bench_aggregate [--max-exp 6] [--top-k 100]
+"""
+from __future__ import annotations
+import argparse
+import random
+import time
+
+from steam.aggregate import aggregate
+from steam.records import Library
+from steam.vectorized import aggregate_np
+
+
+def synthetic_runs(total_rows: int, users: int, seed: int = 0) -> dict:
+    rnd = random.Random(seed)
+    catalog = max(100, total_rows // 4)
+    per_user = total_rows // users
+    out = {}
+    for u in range(users):
+        lib = Library()
+        for appid in rnd.sample(range(10, 10 + catalog * 10, 10), min(per_user, catalog)):
+            lib.append(appid, f"Game {appid}", round(rnd.random() * 500, 1),
+                       round(rnd.random() * 10, 1) if rnd.random() < 0.1 else 0.0)
+        out[f"user{u}"] = lib
+    return out
+
+
+def best_of(fn, repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--max-exp', type=int, default=6)
+    ap.add_argument('--top-k', type=int, default=100)
+    ap.add_argument('--repeat', type=int, default=3)
+    args = ap.parse_args()
+
+    print(f"{'rows':>9} {'python':>10} {'numpy':>10} {'numpy top-k':>12} {'speedup':>8}")
+    for exp in range(3, args.max_exp + 1):
+        rows = 10 ** exp
+        runs = synthetic_runs(rows, users=max(6, rows // 5000))
+        expected = aggregate(runs)
+        assert aggregate_np(runs) == expected, f"mismatch at {rows} rows"
+        assert aggregate_np(runs, top_k=args.top_k) == expected[:args.top_k], f"top-k mismatch at {rows} rows"
+        repeat = args.repeat if rows < 10 ** 6 else 1
+        t_py = best_of(lambda: aggregate(runs), repeat)
+        t_np = best_of(lambda: aggregate_np(runs), repeat)
+        t_k = best_of(lambda: aggregate_np(runs, top_k=args.top_k), repeat)
+        print(f"{rows:>9} {t_py * 1000:>8.1f}ms {t_np * 1000:>8.1f}ms {t_k * 1000:>10.1f}ms {t_py / t_k:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+"""Fetch a family's libraries through the threaded and the asyncio clients against the stub server.
+
+    python -m bench.bench_clients [--users 12] [--games 2000] [--delay 0.05]
+
+Both clients resolve a vanity, walk the seed's friends and download every library, so this
+doubles as an end-to-end check of ``steam.aio`` without touching steamcommunity.com.
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import time
+
+from bench.stub_server import StubServer, StubSteam
+from steam import clients
+from steam.aggregate import aggregate
+from steam.rate_limit import HostGate
+
+
+def run_sync(base: str, ids):
+    clients.BASE = base
+    clients.RESPONSE_CACHE.clear()
+    seed64, err = clients.resolve_steam64("user0")
+    friends = clients.fetch_friends(seed64)
+    libs = {uid: rows for uid, rows, err in clients.fetch_libraries(ids) if err is None}
+    return seed64, friends, libs
+
+
+async def run_async(base: str, ids, delay: float):
+    from steam.aio import AsyncSteamClient, AsyncTokenBucket
+
+    async with AsyncSteamClient(base=base, gate=AsyncTokenBucket(rate=1 / delay if delay else 1e9)) as client:
+        seed64, err = await client.resolve_steam64("user0")
+        friends = await client.fetch_friends(seed64)
+        libs = {uid: rows async for uid, rows, err in client.fetch_libraries(ids) if err is None}
+    return seed64, friends, libs
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--users', type=int, default=12)
+    ap.add_argument('--games', type=int, default=2000)
+    ap.add_argument('--delay', type=float, default=0.05, help='per-host pacing delay for both clients')
+    args = ap.parse_args()
+
+    world = StubSteam(users=args.users, games_per_user=args.games, private={args.users - 1})
+    clients.GATE = HostGate(base_delay=args.delay)
+    with StubServer(world) as srv:
+        ids = world.ids
+        t0 = time.perf_counter()
+        s_seed, s_friends, s_libs = run_sync(srv.url, ids)
+        t_sync = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        a_seed, a_friends, a_libs = asyncio.run(run_async(srv.url, ids, args.delay))
+        t_async = time.perf_counter() - t0
+
+    assert s_seed == a_seed and s_friends == a_friends, "resolve/friends differ between clients"
+    assert aggregate({u: s_libs[u] for u in ids if u in s_libs}) == aggregate({u: a_libs[u] for u in ids if u in a_libs})
+    print(f"{len(ids)} users x {args.games} games, {len(s_friends)} friends, identical results")
+    print(f"  threads: {t_sync:6.2f}s")
+    print(f"  asyncio: {t_async:6.2f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+"""Write and read back a synthetic run in every export format.
+
+    python -m bench.bench_export [--rows 100000]
+
+Reports write time, full read-back time and on-disk size per format, and checks that
+every format reads back the rows that went in.
+"""
+from __future__ import annotations
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from steam.export import WRITERS, export_results, have_pyarrow, read_results
+
+
+def synthetic_results(n: int, seed: int = 0):
+    rnd = random.Random(seed)
+    for i in range(n):
+        yield {
+            "appid": 10 + i * 10,
+            "name": f"Game {i} – {rnd.choice(('Remastered', 'GOTY', 'Deluxe', ''))}".strip(),
+            "family_playtime_forever_h": round(rnd.random() * 2000, 1),
+            "family_playtime_recent_h": round(rnd.random() * 20, 1) if rnd.random() < 0.1 else 0.0,
+            "owners_count": rnd.randint(1, 6),
+        }
+
+
+def size_of(path: str) -> int:
+    if os.path.isdir(path):
+        return sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path))
+    return os.path.getsize(path)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--rows', type=int, default=100_000)
+    args = ap.parse_args()
+
+    expected = list(synthetic_results(args.rows))
+    formats = [f for f in WRITERS if f != 'parquet' or have_pyarrow()]
+    print(f"{args.rows} rows")
+    print(f"{'format':>10} {'write s':>9} {'read s':>9} {'size MB':>9}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for fmt in formats:
+            t0 = time.perf_counter()
+            path = export_results(synthetic_results(args.rows), "bench", formats=[fmt], directory=tmp)[fmt]
+            t_write = time.perf_counter() - t0
+            t0 = time.perf_counter()
+            got = list(read_results(path))
+            t_read = time.perf_counter() - t0
+            assert got == expected, f"{fmt}: rows differ after a round trip"
+            print(f"{fmt:>10} {t_write:9.3f} {t_read:9.3f} {size_of(path) / 1e6:9.2f}")
+    if not have_pyarrow():
+        print("(parquet skipped: pyarrow not installed)")
+
+
+if __name__ == '__main__':
+    main()
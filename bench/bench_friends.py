@@ -0,0 +1,124 @@
+"""Check the friends extraction against the lxml.html version it replaced, then time both.
+
+    python -m bench.bench_friends [--repeat 200] [--rounds 7]
+
+The corpus covers ajax pages of several sizes, a full page with a pager, awkward names
+(entities, nested markup, comments, blanks), nested and empty ``data-steamid`` attributes,
+link-only pages for the fallback, and broken markup.
+"""
+from __future__ import annotations
+import argparse
+import re
+import time
+
+from lxml import html
+
+from bench.fixtures import friends_html, steam64_for
+from steam.parsers import PAGE_PARAM_RE, parse_friends_page
+
+
+def parse_friends_page_xpath(html_bytes: bytes):
+    # the previous implementation, kept as the reference for output and cost
+    doc = html.fromstring(html_bytes)
+    last = None
+    for href in doc.xpath('//a[contains(@href, "p=")]/@href'):
+        m = PAGE_PARAM_RE.search(href)
+        if m:
+            last = max(last or 0, int(m.group(1)))
+    out = []
+    for el in doc.xpath('//*[@data-steamid]'):
+        s64 = el.get('data-steamid')
+        if not s64:
+            continue
+        text = (el.text or '').strip()
+        if not text:
+            texts = [t.strip() for t in el.xpath('.//text()') if t.strip()]
+            text = texts[0] if texts else s64
+        out.append({"steam64": s64, "name": text})
+    if not out:
+        for a in doc.xpath('//a[contains(@href, "/profiles/") or contains(@href, "/id/")]'):
+            s64 = a.get('data-steamid') or ''
+            if not s64:
+                m = re.search(r"/profiles/([0-9]{17})", a.get('href') or '')
+                if m:
+                    s64 = m.group(1)
+            if s64:
+                out.append({"steam64": s64, "name": (a.text_content() or '').strip() or s64})
+    return out, last
+
+
+def _ajax(n: int, offset: int = 0) -> bytes:
+    return friends_html([(steam64_for(offset + i), f"Player {offset + i}") for i in range(n)])
+
+
+S = [steam64_for(i) for i in range(10)]
+
+CORPUS = {
+    "ajax-0": _ajax(0),
+    "ajax-1": _ajax(1),
+    "ajax-20": _ajax(20),
+    "ajax-200": _ajax(200),
+    "full-page-pager": (
+        '<html><head><title>Friends</title><script>var g_steamID = "x";</script></head><body>'
+        '<div class="pagebtn"><a href="?p=1">1</a> <a href="?p=2">2</a> <a href="https://x/friends/?p=7">7</a></div>'
+        + ''.join(f'<div class="friend_block_v2" data-steamid="{s}">  Friend {i}  </div>' for i, s in enumerate(S))
+        + '</body></html>').encode(),
+    "awkward-names": (
+        f'<div data-steamid="{S[0]}">Tom &amp; Jerry &lt;3</div>'
+        f'<div data-steamid="{S[1]}"><span> </span><b><i>  Deep\tName </i></b> tail</div>'
+        f'<div data-steamid="{S[2]}">   <!-- note -->Split<!-- x -->Name</div>'
+        f'<div data-steamid="{S[3]}"><img src="a.png"></div>'
+        f'<div data-steamid="{S[4]}">☃ snöw \U0001F600</div>'
+        f'<div data-steamid="{S[5]}"><script>var a = 1;</script>Scripted</div>'
+    ).encode(),
+    "nested-and-empty-ids": (
+        f'<div data-steamid="{S[0]}"><div data-steamid="{S[1]}">Inner</div>Outer tail</div>'
+        f'<div data-steamid="">ignored</div>'
+        f'<a data-steamid="{S[2]}" href="/profiles/{S[2]}">Linked</a>'
+        f'<div data-steamid="{S[3]}">before<div data-steamid="{S[4]}"></div></div>'
+    ).encode(),
+    "links-only": (
+        f'<ul><li><a href="https://steamcommunity.com/profiles/{S[0]}"><span>Link</span> One</a></li>'
+        f'<li><a href="https://steamcommunity.com/id/vanityonly">Vanity</a></li>'
+        f'<li><a data-steamid="" href="/profiles/{S[1]}/friends?p=3">  </a></li>'
+        f'<li><a href="/profiles/123">short id</a></li></ul>'
+    ).encode(),
+    "broken-markup": (
+        f'<div data-steamid="{S[0]}"><span>Unclosed <b>bold</div>'
+        f'<div data-steamid="{S[1]}">Amp & raw <p>para</div><a href="?p=x">bad</a>'
+    ).encode(),
+    "no-friends": b'<html><body><div class="emptyfriends">No friends</div></body></html>',
+    "unicode-blanks": (
+        f'<div data-steamid="{S[0]}"><span>\u00a0</span><span>After nbsp</span></div>'
+        f'<div data-steamid="{S[1]}"><span>\u3000 </span></div>'
+    ).encode(),
+}
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--repeat', type=int, default=200)
+    ap.add_argument('--rounds', type=int, default=7, help='alternating rounds; the fastest of each side counts')
+    args = ap.parse_args()
+
+    for name, body in CORPUS.items():
+        got, want = parse_friends_page(body), parse_friends_page_xpath(body)
+        assert got == want, f"{name}: {got} != {want}"
+    print(f"{len(CORPUS)} fixtures, outputs identical")
+
+    for name in ("ajax-20", "ajax-200", "full-page-pager"):
+        body = CORPUS[name]
+        times = [float('inf'), float('inf')]
+        # interleaved best-of-rounds, so a noisy neighbour hits both sides alike
+        for _ in range(args.rounds):
+            for i, fn in enumerate((parse_friends_page_xpath, parse_friends_page)):
+                t0 = time.perf_counter()
+                for _ in range(args.repeat):
+                    fn(body)
+                times[i] = min(times[i], (time.perf_counter() - t0) / args.repeat)
+        print(f"{name:>16}: lxml.html {times[0] * 1000:7.3f} ms  current {times[1] * 1000:7.3f} ms  "
+              f"({times[0] / times[1]:.2f}x)")
+
+
+if __name__ == '__main__':
+    main()
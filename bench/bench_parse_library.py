@@ -0,0 +1,99 @@
+"""Compare the DOM games XML parser with the streaming one on a synthetic library.
+
+    python -m bench.bench_parse_library [--games 10000] [--repeat 5]
+
+Each mode runs in a fresh process so peak RSS is not shared between them.
+"""
+from __future__ import annotations
+import argparse
+import multiprocessing as mp
+import os
+import tempfile
+import time
+
+from bench.fixtures import games_xml
+
+
+def parse_library_xml_dom(xml_bytes: bytes) -> list[dict]:
+    # the pre-streaming implementation, kept as the reference for output and cost
+    from lxml import etree
+    from steam.parsers import parse_hours
+
+    out = []
+    root = etree.fromstring(xml_bytes)
+    for g in root.findall('.//game'):
+        appid = (g.findtext('appID') or '').strip()
+        name = (g.findtext('name') or '').strip()
+        hours_all = parse_hours(g.findtext('hoursOnRecord'))
+        hours_recent = parse_hours(g.findtext('hoursLast2Weeks'))
+        if appid:
+            out.append({"appid": appid, "name": name, "hoursOnRecord": hours_all, "hoursLast2Weeks": hours_recent})
+    return out
+
+
+def peak_rss_kb() -> int:
+    # VmHWM resets on exec, unlike ru_maxrss which a spawned child inherits from its parent
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def _read_chunks(path: str, size: int = 64 * 1024):
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(size)
+            if not chunk:
+                return
+            yield chunk
+
+
+def _run(mode: str, path: str, repeat: int, q) -> None:
+    from steam.parsers import iter_library_xml
+
+    base_kb = peak_rss_kb()
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        if mode == 'dom':
+            with open(path, 'rb') as f:
+                n = len(parse_library_xml_dom(f.read()))
+        else:
+            n = sum(1 for _ in iter_library_xml(_read_chunks(path)))
+    elapsed = time.perf_counter() - t0
+    peak_kb = peak_rss_kb()
+    q.put((n, elapsed / repeat, peak_kb - base_kb))
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--games', type=int, default=10000)
+    ap.add_argument('--repeat', type=int, default=5)
+    args = ap.parse_args()
+
+    doc = games_xml(args.games)
+    from steam.parsers import parse_library_xml
+    assert parse_library_xml(doc) == parse_library_xml_dom(doc), "streaming output differs from DOM parser"
+
+    with tempfile.NamedTemporaryFile(suffix='.xml', delete=False) as tmp:
+        tmp.write(doc)
+    try:
+        ctx = mp.get_context('spawn')
+        print(f"{args.games} games, {len(doc) / 1e6:.1f} MB, outputs identical")
+        for mode in ('dom', 'stream'):
+            q = ctx.Queue()
+            p = ctx.Process(target=_run, args=(mode, tmp.name, args.repeat, q))
+            p.start()
+            n, per_run, peak_kb = q.get()
+            p.join()
+            print(f"{mode:>6}: {per_run * 1000:8.1f} ms/doc  {n / per_run:10.0f} games/s  peak +{peak_kb / 1024:.1f} MB")
+    finally:
+        os.unlink(tmp.name)
+
+
+if __name__ == '__main__':
+    main()
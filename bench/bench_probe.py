@@ -0,0 +1,78 @@
+"""Check that the streaming access probe agrees with a full library parse, and how much it reads.
+
+    python -m bench.bench_probe
+
+Runs a fixture corpus (public, empty, private, unknown-profile, HTML and malformed
+responses) through both checks, then repeats the comparison end to end against the stub server.
+"""
+from __future__ import annotations
+import time
+
+from bench.fixtures import games_xml, private_games_xml
+from bench.stub_server import NOT_FOUND_XML, StubServer, StubSteam
+from steam import clients
+from steam.parsers import parse_library_columns, probe_library_xml
+from steam.rate_limit import HostGate
+
+CHUNK = 16 * 1024
+
+CORPUS = {
+    "public-5000": games_xml(5000, seed=1),
+    "public-100": games_xml(100, seed=2),
+    "public-1": games_xml(1, seed=3),
+    "public-empty": games_xml(0, seed=4),
+    "private": private_games_xml(),
+    "unknown-profile": NOT_FOUND_XML,
+    "html-error-page": b"<!DOCTYPE html><html><head><title>Error</title></head><body><h2>Sorry!</h2><br></body></html>",
+    "malformed": b"<gamesList><games><game><appID>10</appID>",
+    "header-only": games_xml(3, seed=5)[:120],
+    "empty-body": b"",
+}
+
+
+def full_check(body: bytes) -> bool:
+    try:
+        parse_library_columns(body)
+        return True
+    except Exception:
+        return False
+
+
+def chunks(body: bytes, counter: list):
+    for i in range(0, len(body), CHUNK):
+        counter[0] += min(CHUNK, len(body) - i)
+        yield body[i:i + CHUNK]
+
+
+def main() -> None:
+    print(f"{'fixture':<16} {'full':>6} {'probe':>6} {'bytes read':>12} {'of':>10}")
+    for name, body in CORPUS.items():
+        read = [0]
+        full, probe = full_check(body), probe_library_xml(chunks(body, read))
+        assert full == probe, f"{name}: probe={probe} full={full}"
+        print(f"{name:<16} {str(full):>6} {str(probe):>6} {read[0]:>12} {len(body):>10}")
+
+    world = StubSteam(users=8, games_per_user=5000, private={2, 5})
+    clients.GATE = HostGate(base_delay=0.0)
+    for uid in world.ids:
+        world.games_body(uid)  # pre-render so neither side pays fixture generation
+    with StubServer(world) as srv:
+        clients.BASE = srv.url
+        t0 = time.perf_counter()
+        probed = {uid: clients.check_library_access(uid) for uid in world.ids}
+        t_probe = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        full = {}
+        for uid in world.ids:
+            try:
+                clients.fetch_library(uid)
+                full[uid] = True
+            except Exception:
+                full[uid] = False
+        t_full = time.perf_counter() - t0
+    assert probed == full, "probe and full fetch disagree against the stub server"
+    print(f"stub server, {len(world.ids)} users x 5000 games: probe {t_probe * 1000:.0f} ms, full fetch {t_full * 1000:.0f} ms, answers identical")
+
+
+if __name__ == '__main__':
+    main()
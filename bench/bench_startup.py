@@ -0,0 +1,69 @@
+"""Cold start of the CLI: ``app.py`` (Flask, requests and the web app) against ``steam.cli``.
+
+    python -m bench.bench_startup [--repeat 10] [--top 8]
+
+Each command runs ``--repeat`` times in a fresh interpreter; the median and fastest wall
+times are shown, then the costliest imports of ``steam.cli`` from ``python -X importtime``.
+"""
+from __future__ import annotations
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+COMMANDS = {
+    "import app": [sys.executable, "-c", "import app"],
+    "import steam.cli": [sys.executable, "-c", "import steam.cli"],
+    "app.py --no-ui --help": [sys.executable, "app.py", "--no-ui", "--help"],
+    "python -m steam.cli --help": [sys.executable, "-m", "steam.cli", "--help"],
+}
+
+
+def wall(cmd, repeat: int):
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        subprocess.run(cmd, cwd=ROOT, check=True, stdout=subprocess.DEVNULL)
+        times.append(time.perf_counter() - t0)
+    return statistics.median(times), min(times)
+
+
+def import_costs(module: str):
+    err = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"], cwd=ROOT,
+                         capture_output=True, text=True, check=True).stderr
+    rows = []
+    for line in err.splitlines():
+        parts = line.split('|')
+        if line.startswith('import time:') and parts[1].strip().isdigit():
+            if parts[2].strip() == 'site':
+                rows.clear()  # interpreter startup (site, .pth hooks), not ours
+                continue
+            rows.append((int(parts[1]), parts[2].rstrip()))
+    return sorted(rows, reverse=True)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--repeat', type=int, default=10)
+    ap.add_argument('--top', type=int, default=8)
+    args = ap.parse_args()
+
+    loaded = subprocess.run([sys.executable, "-c", "import sys, steam.cli; "
+                             "print(*[m for m in ('flask', 'requests', 'lxml.html', 'jinja2') if m in sys.modules])"],
+                            cwd=ROOT, capture_output=True, text=True, check=True).stdout.strip()
+    assert not loaded, f"steam.cli imports {loaded} at startup"
+
+    for name, cmd in COMMANDS.items():
+        med, best = wall(cmd, args.repeat)
+        print(f"{name:>28}: median {med * 1000:7.1f} ms  best {best * 1000:7.1f} ms")
+    print("\nslowest imports under steam.cli (cumulative):")
+    for us, mod in import_costs("steam.cli")[:args.top]:
+        print(f"  {us / 1000:7.1f} ms {mod}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+"""Synthetic Steam Community and store documents for benchmarks (deterministic for a given seed)."""
+from __future__ import annotations
+import json
+import random
+from typing import List
+
+
+def steam64_for(i: int) -> str:
+    return str(76561197960265728 + 100000 + i)
+
+
+def games_xml(n_games: int, seed: int = 0, steam64: str = "76561198000000000") -> bytes:
+    rnd = random.Random(seed)
+    parts: List[str] = [
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n<gamesList>\n',
+        f'\t<steamID64>{steam64}</steamID64>\n\t<steamID><![CDATA[user{seed}]]></steamID>\n\t<games>\n',
+    ]
+    for i in range(n_games):
+        appid = 10 + i * 10
+        hours = rnd.random() * 2000
+        recent = rnd.random() * 20 if rnd.random() < 0.1 else None
+        parts.append(
+            '\t\t<game>\n'
+            f'\t\t\t<appID>{appid}</appID>\n'
+            f'\t\t\t<name><![CDATA[Synthetic Game {appid} & Friends]]></name>\n'
+            f'\t\t\t<logo><![CDATA[https://cdn.example/steam/apps/{appid}/capsule_184x69.jpg]]></logo>\n'
+            f'\t\t\t<storeLink><![CDATA[https://steamcommunity.com/app/{appid}]]></storeLink>\n'
+            + (f'\t\t\t<hoursLast2Weeks>{recent:.1f}</hoursLast2Weeks>\n' if recent is not None else '')
+            + f'\t\t\t<hoursOnRecord>{hours:,.1f}</hoursOnRecord>\n'
+            f'\t\t\t<statsLink><![CDATA[https://steamcommunity.com/profiles/{steam64}/stats/{appid}]]></statsLink>\n'
+            '\t\t</game>\n'
+        )
+    parts.append('\t</games>\n</gamesList>\n')
+    return ''.join(parts).encode('utf-8')
+
+
+def vanity_xml(steam64: str, vanity: str) -> bytes:
+    return (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n<profile>\n'
+        f'\t<steamID64>{steam64}</steamID64>\n\t<steamID><![CDATA[{vanity}]]></steamID>\n'
+        '\t<privacyState>public</privacyState>\n\t<visibilityState>3</visibilityState>\n</profile>\n'
+    ).encode('utf-8')
+
+
+def private_games_xml() -> bytes:
+    return (b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            b'<gamesList><error><![CDATA[This profile is private.]]></error></gamesList>\n')
+
+
+def friends_html(friends: List[tuple]) -> bytes:
+    """The ajax friends-page shape: one ``friend_block_v2`` div per (steam64, name)."""
+    parts = ['<div class="profile_friends search_results" id="search_results">\n']
+    for steam64, name in friends:
+        parts.append(
+            f'<div class="selectable friend_block_v2 persona offline " data-steamid="{steam64}" '
+            f'data-miniprofile="{int(steam64) - 76561197960265728}">\n'
+            f'\t<a class="selectable_overlay" data-container="#fr_{steam64}" '
+            f'href="https://steamcommunity.com/profiles/{steam64}"></a>\n'
+            '\t<div class="player_avatar friend_block_link_overlay offline">'
+            '<img src="https://avatars.example/avatar.jpg"></div>\n'
+            f'\t<div class="friend_block_content">{name}<br>'
+            '<span class="friend_small_text">Last Online 3 days ago</span></div>\n'
+            '</div>\n'
+        )
+    parts.append('</div>\n')
+    return ''.join(parts).encode('utf-8')
+
+
+def appdetails_json(appid: int) -> bytes:
+    """``store.steampowered.com/api/appdetails`` for one appid; appids divisible by 500 are delisted."""
+    if appid % 500 == 0:
+        return json.dumps({str(appid): {"success": False}}).encode('utf-8')
+    rnd = random.Random(appid)
+    genres = rnd.sample(["Action", "Adventure", "RPG", "Strategy", "Indie", "Simulation", "Casual"], 2)
+    data = {
+        "type": "game",
+        "name": f"Synthetic Game {appid} & Friends",
+        "steam_appid": appid,
+        "is_free": appid % 7 == 0,
+        "release_date": {"coming_soon": False, "date": f"{rnd.randint(1, 28)} Mar, {rnd.randint(2005, 2024)}"},
+        "genres": [{"id": str(i), "description": g} for i, g in enumerate(genres)],
+        "categories": [{"id": 2, "description": "Single-player"}, {"id": 1, "description": "Multi-player"}],
+        "pc_requirements": {"minimum": f"<strong>Minimum:</strong><br><ul class=\"bb_ul\"><li><strong>Storage:</strong> "
+                                      f"{rnd.randint(1, 80)} GB available space</li></ul>"},
+    }
+    return json.dumps({str(appid): {"success": True, "data": data}}).encode('utf-8')
+
+
+def appreviews_json(appid: int) -> bytes:
+    rnd = random.Random(-appid)
+    total = rnd.randint(10, 50000)
+    positive = int(total * rnd.uniform(0.3, 0.98))
+    return json.dumps({"success": 1, "query_summary": {
+        "num_reviews": 0, "review_score": 8, "review_score_desc": "Very Positive",
+        "total_positive": positive, "total_negative": total - positive, "total_reviews": total,
+    }}).encode('utf-8')
+
+
+def news_json(appid: int) -> bytes:
+    rnd = random.Random(appid * 3)
+    return json.dumps({"appnews": {"appid": appid, "newsitems": [
+        {"gid": str(appid), "title": "Patch notes", "date": 1_600_000_000 + rnd.randint(0, 10 ** 8)},
+    ]}}).encode('utf-8')
@@ -0,0 +1,188 @@
+"""A local stand-in for the steamcommunity.com endpoints the clients use.
+
+    with StubServer(StubSteam(users=20)) as srv:
+        clients.BASE = srv.url
+        ...
+
+Serves vanity XML, ajax friends pages and games XML generated by ``bench.fixtures``, plus the
+store ``appdetails``/``appreviews`` and ``GetNewsForApp`` JSON that ``steam.store`` reads.
+
+Faults can be injected to exercise the gate and backoff: a fixed per-request ``latency``
+and a share of responses answered 429 (``rate_429``, with ``retry_after`` when set) or 503
+(``rate_5xx``). The fault sequence is seeded, so two runs see the same one.
+"""
+from __future__ import annotations
+import random
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Set, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from bench.fixtures import (appdetails_json, appreviews_json, friends_html, games_xml, news_json,
+                            private_games_xml, steam64_for, vanity_xml)
+
+PROFILE_RE = re.compile(r"^/profiles/([0-9]{17})(/friends|/games)?/?$")
+VANITY_RE = re.compile(r"^/id/([^/]+)/?$")
+REVIEWS_RE = re.compile(r"^/appreviews/([0-9]+)/?$")
+
+NOT_FOUND_XML = (b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                 b'<response><error><![CDATA[The specified profile could not be found.]]></error></response>')
+
+
+class StubSteam:
+    """A deterministic little Steam community: users, their friends and their libraries."""
+
+    def __init__(self, users: int = 20, friends_per_user: int = 45, games_per_user: int = 300,
+                 page_size: int = 20, private: Optional[Set[int]] = None):
+        self.page_size = page_size
+        self.ids: List[str] = [steam64_for(i) for i in range(users)]
+        self.vanity: Dict[str, str] = {f"user{i}": s for i, s in enumerate(self.ids)}
+        self.names: Dict[str, str] = {s: f"Player {i}" for i, s in enumerate(self.ids)}
+        self.private: Set[str] = {self.ids[i] for i in (private or set())}
+        self.games_per_user = games_per_user
+        self.friends: Dict[str, List[str]] = {}
+        for i, s in enumerate(self.ids):
+            k = min(friends_per_user, users - 1)
+            self.friends[s] = [self.ids[(i + d) % users] for d in range(1, k + 1)]
+        self._games: Dict[str, bytes] = {}
+        self._lock = threading.Lock()
+
+    def games_body(self, steam64: str) -> bytes:
+        with self._lock:
+            body = self._games.get(steam64)
+            if body is None:
+                i = self.ids.index(steam64)
+                body = self._games[steam64] = games_xml(self.games_per_user, seed=i, steam64=steam64)
+            return body
+
+    def route(self, path: str, query: Dict[str, List[str]]) -> Tuple[int, str, bytes]:
+        xml, html_, json_ = "text/xml; charset=utf-8", "text/html; charset=utf-8", "application/json"
+        # store and Web API endpoints, so one stub can stand in for every host
+        if path == "/api/appdetails":
+            return 200, json_, appdetails_json(int((query.get("appids") or ["0"])[0]))
+        m = REVIEWS_RE.match(path)
+        if m:
+            return 200, json_, appreviews_json(int(m.group(1)))
+        if path.startswith("/ISteamNews/GetNewsForApp/"):
+            return 200, json_, news_json(int((query.get("appid") or ["0"])[0]))
+        m = VANITY_RE.match(path)
+        if m:
+            s64 = self.vanity.get(m.group(1))
+            return (200, xml, vanity_xml(s64, m.group(1)) if s64 else NOT_FOUND_XML)
+        m = PROFILE_RE.match(path)
+        if not m or m.group(1) not in self.names:
+            return 404, html_, b"not found"
+        s64, section = m.group(1), m.group(2)
+        if section is None:
+            state = "private" if s64 in self.private else "public"
+            body = (f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?><profile><steamID64>{s64}</steamID64>'
+                    f'<privacyState>{state}</privacyState></profile>').encode()
+            return 200, xml, body
+        if section == "/games":
+            return 200, xml, (private_games_xml() if s64 in self.private else self.games_body(s64))
+        # friends: ajax pages are 1-based slices; the plain page is the first slice
+        page = int((query.get("p") or ["1"])[0] or 1)
+        start = (page - 1) * self.page_size
+        chunk = self.friends[s64][start:start + self.page_size]
+        return 200, html_, friends_html([(f, self.names[f]) for f in chunk])
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real site
+    # headers and body go out in separate writes; with Nagle on, a small body waits ~40 ms for an ACK
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        srv = self.server
+        if srv.latency:
+            time.sleep(srv.latency)
+        fault = srv.fault()
+        if fault is not None:
+            self.send_response(fault)
+            if fault == 429 and srv.retry_after is not None:
+                self.send_header("Retry-After", f"{srv.retry_after:g}")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        parts = urlsplit(self.path)
+        status, ctype, body = srv.world.route(parts.path, parse_qs(parts.query))
+        srv.requests += 1
+        self.send_response(status)
+        self.send_header("Content-Type", ctype)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, fmt, *args):
+        pass
+
+
+class _HTTPServer(ThreadingHTTPServer):
+    latency = 0.0
+    rate_429 = 0.0
+    rate_5xx = 0.0
+    retry_after: Optional[float] = None
+
+    def fault(self) -> Optional[int]:
+        if not (self.rate_429 or self.rate_5xx):
+            return None
+        with self.fault_lock:
+            x = self.rng.random()
+            if x < self.rate_429:
+                self.injected[429] += 1
+                return 429
+            if x < self.rate_429 + self.rate_5xx:
+                self.injected[503] += 1
+                return 503
+        return None
+
+    def handle_error(self, request, client_address):
+        # clients that hang up early (access probes) are expected, not errors
+        if isinstance(sys.exc_info()[1], (ConnectionResetError, BrokenPipeError)):
+            return
+        super().handle_error(request, client_address)
+
+
+class StubServer:
+    def __init__(self, world: StubSteam, host: str = "127.0.0.1", port: int = 0, latency: float = 0.0,
+                 rate_429: float = 0.0, rate_5xx: float = 0.0, retry_after: Optional[float] = None,
+                 seed: int = 0):
+        self.world = world
+        self._httpd = _HTTPServer((host, port), _Handler)
+        self._httpd.daemon_threads = True
+        self._httpd.world = world
+        self._httpd.requests = 0
+        self._httpd.latency = latency
+        self._httpd.rate_429 = rate_429
+        self._httpd.rate_5xx = rate_5xx
+        self._httpd.retry_after = retry_after
+        self._httpd.rng = random.Random(seed)
+        self._httpd.fault_lock = threading.Lock()
+        self._httpd.injected = {429: 0, 503: 0}
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def requests(self) -> int:
+        return self._httpd.requests
+
+    @property
+    def injected(self) -> Dict[int, int]:
+        """Faults served so far, by status code."""
+        return dict(self._httpd.injected)
+
+    def __enter__(self) -> "StubServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
@@ -0,0 +1,309 @@
+"""The hot paths end to end against synthetic fixtures and the stub server, comparable across commits.
+
+    python -m bench.suite                              # run every case, save bench/results/<commit>.json
+    python -m bench.suite --quick --only fetch_library
+    python -m bench.suite --compare bench/results/1a2b3c4.json            # run now, compare with a baseline
+    python -m bench.suite --compare OLD.json NEW.json [--threshold 0.15]  # compare two saved results
+
+Cases: ``parse_library_xml`` and ``aggregate`` on in-memory fixtures; ``fetch_friends``,
+``fetch_library`` and a full ``run_cli`` through the stub server (``--latency`` per request);
+``fetch_library_faults`` adds injected 429s and 503s; ``enrich_store`` fetches store data for
+``users * 20`` appids into a fresh store cache, then checks a rerun makes no requests. Each case runs in a fresh process and
+reports throughput, per-operation latency percentiles and peak RSS (VmHWM), plus how much of
+that peak the case itself added. The gate is opened up and backoff shrunk, so the numbers track
+our own code rather than the production pacing. ``--compare`` exits 1 when a case's p50 or
+throughput moved the wrong way by more than ``--threshold``.
+"""
+from __future__ import annotations
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing as mp
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
+
+from bench.bench_parse_library import peak_rss_kb
+from bench.fixtures import games_xml
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+PARAMS = {"games": 5000, "users": 8, "friends": 200, "repeat": 5, "latency": 0.002,
+          "rate_429": 0.1, "rate_5xx": 0.1}
+QUICK = {"games": 1000, "users": 4, "friends": 60, "repeat": 2}
+
+
+def _stub(params: dict, faults: bool = False, users: Optional[int] = None):
+    from bench.stub_server import StubServer, StubSteam
+
+    world = StubSteam(users=users or params["users"], friends_per_user=params["friends"],
+                      games_per_user=params["games"], private=set())
+    if users is None:
+        for s64 in world.ids:
+            world.games_body(s64)  # generate every library before the memory baseline
+    extra = dict(rate_429=params["rate_429"], rate_5xx=params["rate_5xx"], retry_after=0) if faults else {}
+    return world, StubServer(world, latency=params["latency"], **extra)
+
+
+def _open_gate() -> None:
+    from steam import clients, rate_limit
+    from steam.rate_limit import AdaptiveGate
+
+    clients.GATE = AdaptiveGate(base_delay=1e-4, max_rate=1e6, jitter=(0.0, 0.0))
+    rate_limit.BACKOFF_BASE = 0.01
+    clients.RESPONSE_CACHE.clear()
+    clients.ACCESS_CACHE.clear()
+
+
+def _timed(op: Callable[[], int], repeat: int, setup: Optional[Callable[[], None]] = None):
+    """Run ``op`` ``repeat`` times; returns (per-op seconds, units handled)."""
+    lat, units = [], 0
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        t0 = time.perf_counter()
+        units += op()
+        lat.append(time.perf_counter() - t0)
+    return lat, units
+
+
+def case_parse_library_xml(params: dict, ready: Callable[[], None]) -> dict:
+    from steam.parsers import parse_library_xml
+
+    doc = games_xml(params["games"])
+    ready()
+    lat, units = _timed(lambda: len(parse_library_xml(doc)), params["repeat"] * 2)
+    return {"latencies": lat, "units": units, "unit": "games"}
+
+
+def case_aggregate(params: dict, ready: Callable[[], None]) -> dict:
+    from steam.aggregate import aggregate
+    from steam.parsers import parse_library_columns
+
+    libs = {str(i): parse_library_columns(games_xml(params["games"], seed=i)) for i in range(params["users"])}
+    ready()
+    lat, units = _timed(lambda: (aggregate(libs), sum(len(l) for l in libs.values()))[1], params["repeat"] * 2)
+    return {"latencies": lat, "units": units, "unit": "game rows"}
+
+
+def case_fetch_friends(params: dict, ready: Callable[[], None]) -> dict:
+    from steam import clients
+
+    # enough profiles that everyone has the full ``friends`` count, spread over ajax pages
+    world, srv = _stub(params, users=params["friends"] + 1)
+    with srv:
+        clients.BASE = srv.url
+        _open_gate()
+        ready()
+        ids = iter(world.ids[:params["users"]] * params["repeat"])
+        lat, units = _timed(lambda: len(clients.fetch_friends(next(ids))), params["users"] * params["repeat"])
+        return {"latencies": lat, "units": units, "unit": "friends", "requests": srv.requests}
+
+
+def _fetch_libraries_case(params: dict, ready: Callable[[], None], faults: bool) -> dict:
+    from steam import clients
+
+    world, srv = _stub(params, faults=faults)
+    with srv:
+        clients.BASE = srv.url
+        _open_gate()
+        ready()
+        ids = iter(world.ids * params["repeat"])
+        lat, units = _timed(lambda: len(clients.fetch_library(next(ids))), params["users"] * params["repeat"],
+                            setup=clients.RESPONSE_CACHE.clear)
+        return {"latencies": lat, "units": units, "unit": "games", "requests": srv.requests,
+                "injected": {str(k): v for k, v in srv.injected.items()}}
+
+
+def case_fetch_library(params: dict, ready: Callable[[], None]) -> dict:
+    return _fetch_libraries_case(params, ready, faults=False)
+
+
+def case_fetch_library_faults(params: dict, ready: Callable[[], None]) -> dict:
+    return _fetch_libraries_case(params, ready, faults=True)
+
+
+def case_run_cli(params: dict, ready: Callable[[], None]) -> dict:
+    from steam import cli, clients
+
+    world, srv = _stub(params)
+    with srv, tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)  # journals and results land under ./output
+        clients.BASE = srv.url
+        ready()
+
+        def one() -> int:
+            with contextlib.redirect_stdout(io.StringIO()):
+                cli.run_cli("user0", None)
+            return min(6, params["users"])  # libraries per run: the seed and up to 5 friends
+        lat, units = _timed(one, params["repeat"], setup=_open_gate)
+        return {"latencies": lat, "units": units, "unit": "libraries", "requests": srv.requests}
+
+
+def case_enrich_store(params: dict, ready: Callable[[], None]) -> dict:
+    from steam import clients, store
+
+    world, srv = _stub(params, users=1)
+    appids = list(range(10, 10 + params["users"] * 20))  # a few delisted (every 500th) among them
+    rows = [{"appid": a, "name": f"Game {a}"} for a in appids]
+    with srv, tempfile.TemporaryDirectory() as tmp:
+        clients.BASE = store.STORE_BASE = store.API_BASE = srv.url
+        _open_gate()
+        ready()
+        caches = iter(range(params["repeat"]))
+
+        def one() -> int:
+            # a cold fetch, then a rerun that must come entirely from store.sqlite
+            store.configure_store_cache(os.path.join(tmp, str(next(caches))))
+            info = store.enrich_appids(appids)
+            before = srv.requests
+            if store.enrich_appids(appids) != info or srv.requests != before:
+                raise RuntimeError("store cache was not reused")
+            return len(store.merge_store_info(rows, info))
+        lat, units = _timed(one, params["repeat"])
+        return {"latencies": lat, "units": units, "unit": "appids", "requests": srv.requests}
+
+
+CASES: Dict[str, Callable[[dict, Callable[[], None]], dict]] = {
+    "parse_library_xml": case_parse_library_xml,
+    "aggregate": case_aggregate,
+    "fetch_friends": case_fetch_friends,
+    "fetch_library": case_fetch_library,
+    "fetch_library_faults": case_fetch_library_faults,
+    "run_cli": case_run_cli,
+    "enrich_store": case_enrich_store,
+}
+
+
+def _pct(sorted_vals: List[float], p: float) -> float:
+    if not sorted_vals:
+        return 0.0
+    return sorted_vals[min(len(sorted_vals) - 1, max(0, round(p / 100 * len(sorted_vals)) - 1))]
+
+
+def _child(name: str, params: dict, q) -> None:
+    import logging
+    logging.disable(logging.CRITICAL)
+    base = {}
+
+    def ready() -> None:
+        base["kb"] = peak_rss_kb()
+        base["t"] = time.perf_counter()
+
+    out = CASES[name](params, ready)
+    total = time.perf_counter() - base["t"]
+    peak = peak_rss_kb()
+    lat = sorted(out.pop("latencies"))
+    busy = sum(lat)
+    out.update({
+        "ops": len(lat),
+        "seconds": round(total, 4),
+        "ops_per_s": round(len(lat) / busy, 2) if busy else 0.0,
+        "units_per_s": round(out["units"] / busy, 1) if busy else 0.0,
+        "p50_ms": round(_pct(lat, 50) * 1000, 3),
+        "p90_ms": round(_pct(lat, 90) * 1000, 3),
+        "p99_ms": round(_pct(lat, 99) * 1000, 3),
+        "max_ms": round(lat[-1] * 1000, 3) if lat else 0.0,
+        "peak_rss_mb": round(peak / 1024, 1),
+        "peak_added_mb": round((peak - base["kb"]) / 1024, 1),
+    })
+    q.put(out)
+
+
+def run_case(name: str, params: dict) -> dict:
+    ctx = mp.get_context('spawn')
+    q = ctx.Queue()
+    p = ctx.Process(target=_child, args=(name, params, q))
+    p.start()
+    try:
+        return q.get(timeout=600)
+    finally:
+        p.join()
+
+
+def git_commit() -> Dict[str, object]:
+    def git(*args: str) -> str:
+        return subprocess.run(["git", *args], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    try:
+        return {"commit": git("rev-parse", "--short", "HEAD") or "unknown",
+                "dirty": bool(git("status", "--porcelain", "--untracked-files=no"))}
+    except OSError:
+        return {"commit": "unknown", "dirty": False}
+
+
+def run_suite(names: List[str], params: dict) -> dict:
+    result = dict(git_commit(), created=datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                  python=platform.python_version(), machine=platform.platform(), params=params, cases={})
+    for name in names:
+        r = result["cases"][name] = run_case(name, params)
+        print(f"{name:>22}: {r['units_per_s']:>12,.0f} {r['unit']}/s  p50 {r['p50_ms']:9.2f} ms  "
+              f"p90 {r['p90_ms']:9.2f} ms  p99 {r['p99_ms']:9.2f} ms  peak {r['peak_rss_mb']:6.1f} MB "
+              f"(+{r['peak_added_mb']:.1f})")
+    return result
+
+
+def compare(old: dict, new: dict, threshold: float) -> int:
+    """Print per-case changes; returns the number of regressions beyond ``threshold``."""
+    print(f"{old.get('commit')} -> {new.get('commit')}{' (dirty)' if new.get('dirty') else ''}")
+    if old.get("params") != new.get("params"):
+        print("  note: the two runs used different parameters")
+    regressions = 0
+    for name, n in new["cases"].items():
+        o = old["cases"].get(name)
+        if o is None:
+            print(f"{name:>22}: new case")
+            continue
+        cells, bad = [], False
+        # (metric, higher is better)
+        for key, up_good in (("units_per_s", True), ("p50_ms", False), ("p99_ms", False), ("peak_added_mb", False)):
+            a, b = o.get(key) or 0.0, n.get(key) or 0.0
+            change = (b - a) / a if a else 0.0
+            worse = -change if up_good else change
+            flag = ""
+            # p99 and memory are reported but too noisy on short runs to fail on
+            if worse > threshold and key in ("units_per_s", "p50_ms"):
+                flag, bad = " !", True
+            cells.append(f"{key} {a:g} -> {b:g} ({change:+.0%}){flag}")
+        regressions += bad
+        print(f"{name:>22}: " + "  ".join(cells))
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    ap = argparse.ArgumentParser(description="Offline benchmarks for the fetch/parse/aggregate paths")
+    ap.add_argument('--only', action='append', choices=list(CASES), help='run just this case; repeatable')
+    ap.add_argument('--quick', action='store_true', help='smaller fixtures and fewer repeats')
+    ap.add_argument('--out', help='results file (default: bench/results/<commit>.json)')
+    ap.add_argument('--compare', nargs='+', metavar='RESULTS',
+                    help='compare with a saved result, or compare two saved results without running')
+    ap.add_argument('--threshold', type=float, default=0.15, help='relative change counted as a regression')
+    for key, default in PARAMS.items():
+        ap.add_argument(f"--{key.replace('_', '-')}", type=type(default), dest=key)
+    args = ap.parse_args(argv)
+
+    if args.compare and len(args.compare) == 2:
+        with open(args.compare[0]) as f, open(args.compare[1]) as g:
+            sys.exit(1 if compare(json.load(f), json.load(g), args.threshold) else 0)
+
+    params = dict(PARAMS, **(QUICK if args.quick else {}))
+    params.update({k: getattr(args, k) for k in PARAMS if getattr(args, k) is not None})
+    result = run_suite(args.only or list(CASES), params)
+    out = args.out or os.path.join(RESULTS_DIR, f"{result['commit']}{'-dirty' if result['dirty'] else ''}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, 'w') as f:
+        json.dump(result, f, indent=2)
+    print(f"Saved {out}")
+    if args.compare:
+        with open(args.compare[0]) as f:
+            sys.exit(1 if compare(json.load(f), result, args.threshold) else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -23,39 +23,89 @@ document.addEventListener('click', (e) => {
   if (e.target === modal) modal.classList.add('hidden');
 });
 
-// Simple client-side table sort + filter
-let sortState = { key: 'family_playtime_forever_h', dir: 'desc' };
+// Results grid: server-side sort/filter/paging with virtual scrolling
+const ROW_H = 28;      // keep in sync with .grid-viewport tr.grid-row in app.css
+const PAGE_ROWS = 200;
+const OVERSCAN = 10;
+let grid = null;
+
+function initResultsGrid() {
+  const vp = document.getElementById('results-viewport');
+  if (!vp) return;
+  grid = { vp, api: vp.dataset.api, key: 'family_playtime_forever_h', dir: 'desc', q: '',
+           matched: 0, pages: new Map(), pending: new Set(), gen: 0 };
+  vp.addEventListener('scroll', () => requestAnimationFrame(renderGrid));
+  loadPage(0);
+}
+
+async function loadPage(p) {
+  if (grid.pages.has(p) || grid.pending.has(p)) return;
+  const gen = grid.gen;
+  grid.pending.add(p);
+  const params = new URLSearchParams({ sort: grid.key, order: grid.dir, q: grid.q,
+                                       offset: p * PAGE_ROWS, limit: PAGE_ROWS });
+  try {
+    const resp = await fetch(`${grid.api}${grid.api.includes('?') ? '&' : '?'}${params}`);
+    const data = await resp.json();
+    if (gen !== grid.gen) return;  // sort or filter changed while this was in flight
+    grid.pages.set(p, data.rows);
+    grid.matched = data.matched;
+    const count = document.getElementById('results-count');
+    if (count) count.textContent = data.q ? `${data.matched} of ${data.total} games` : `${data.total} games`;
+    renderGrid();
+  } finally {
+    if (gen === grid.gen) grid.pending.delete(p);
+  }
+}
+
+function escapeHtml(s) {
+  return String(s).replace(/[&<>"']/g, c => ({ '&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;' }[c]));
+}
+
+function renderGrid() {
+  if (!grid) return;
+  const { vp } = grid;
+  const first = Math.max(0, Math.floor(vp.scrollTop / ROW_H) - OVERSCAN);
+  const last = Math.min(grid.matched, first + Math.ceil(vp.clientHeight / ROW_H) + 2 * OVERSCAN);
+  const html = [`<tr class="spacer" style="height:${first * ROW_H}px"></tr>`];
+  for (let i = first; i < last; i++) {
+    const page = grid.pages.get(Math.floor(i / PAGE_ROWS));
+    if (!page) { loadPage(Math.floor(i / PAGE_ROWS)); html.push('<tr class="grid-row"><td colspan="5">…</td></tr>'); continue; }
+    const r = page[i % PAGE_ROWS];
+    html.push(`<tr class="grid-row"><td>${r.appid}</td><td>${escapeHtml(r.name)}</td>` +
+              `<td class="num">${Number(r.family_playtime_forever_h).toFixed(1)}</td>` +
+              `<td class="num">${Number(r.family_playtime_recent_h).toFixed(1)}</td>` +
+              `<td class="num">${r.owners_count}</td></tr>`);
+  }
+  html.push(`<tr class="spacer" style="height:${(grid.matched - last) * ROW_H}px"></tr>`);
+  document.querySelector('#results tbody').innerHTML = html.join('');
+}
+
+function resetGrid() {
+  grid.gen += 1;
+  grid.pages.clear();
+  grid.pending.clear();
+  grid.vp.scrollTop = 0;
+  loadPage(0);
+}
 
 function sortTable(th) {
   const table = document.getElementById('results');
-  const key = th.getAttribute('data-key');
-  const type = th.getAttribute('data-type') || 'str';
   const dir = (th.classList.contains('sorted') && th.classList.contains('asc')) ? 'desc' : 'asc';
-  sortState = { key, dir };
   table.querySelectorAll('th').forEach(h => h.classList.remove('sorted', 'asc', 'desc'));
   th.classList.add('sorted', dir);
-
-  const rows = Array.from(table.querySelectorAll('tbody tr'));
-  const idx = Array.from(table.querySelectorAll('thead th')).indexOf(th);
-  rows.sort((a, b) => {
-    let va = a.children[idx].innerText.trim();
-    let vb = b.children[idx].innerText.trim();
-    if (type === 'num') { va = parseFloat(va) || 0; vb = parseFloat(vb) || 0; }
-    else { va = va.toLowerCase(); vb = vb.toLowerCase(); }
-    if (va < vb) return dir === 'asc' ? -1 : 1;
-    if (va > vb) return dir === 'asc' ? 1 : -1;
-    return 0;
-  });
-  const tbody = table.querySelector('tbody');
-  rows.forEach(r => tbody.appendChild(r));
+  grid.key = th.getAttribute('data-key');
+  grid.dir = dir;
+  resetGrid();
 }
 
+let filterTimer = null;
 function filterTable() {
-  const q = (document.getElementById('filter').value || '').toLowerCase();
-  const rows = Array.from(document.querySelectorAll('#results tbody tr'));
-  rows.forEach(tr => {
-    const appid = tr.children[0].innerText.toLowerCase();
-    const name = tr.children[1].innerText.toLowerCase();
-    tr.style.display = (appid.includes(q) || name.includes(q)) ? '' : 'none';
-  });
-}
\ No newline at end of file
+  clearTimeout(filterTimer);
+  filterTimer = setTimeout(() => {
+    grid.q = (document.getElementById('filter').value || '').trim();
+    resetGrid();
+  }, 150);
+}
+
+document.addEventListener('DOMContentLoaded', initResultsGrid);
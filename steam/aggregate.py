@@ -1,38 +1,120 @@
 from __future__ import annotations
-from typing import Dict, List
+import threading
+from typing import Dict, Iterable, Iterator, List, Tuple, Union
 
+from . import metrics
+from .records import Library
 
-def aggregate(games_by_user: Dict[str, List[dict]]) -> List[dict]:
-    bucket: Dict[str, dict] = {}
-    owners: Dict[str, set] = {}
+Rows = Union[Library, Iterable[dict]]
 
-    for uid, rows in games_by_user.items():
-        for g in rows:
-            appid = g['appid']
-            name = g.get('name') or ''
-            all_h = float(g.get('hoursOnRecord') or 0.0)
-            rec_h = float(g.get('hoursLast2Weeks') or 0.0)
-
-            if appid not in bucket:
-                bucket[appid] = {
+
+def iter_game_rows(rows: Rows) -> Iterator[Tuple[str, str, float, float]]:
+    """(appid, name, forever_h, recent_h) from a Library or legacy row dicts."""
+    if isinstance(rows, Library):
+        for appid, name, all_h, rec_h in rows.columns():
+            yield str(appid), name, all_h, rec_h
+        return
+    for g in rows:
+        yield (g['appid'], g.get('name') or '',
+               float(g.get('hoursOnRecord') or 0.0), float(g.get('hoursLast2Weeks') or 0.0))
+
+
+class IncrementalAggregator:
+    """Family totals maintained in place as libraries arrive one user at a time.
+
+    ``add_user`` folds one user's rows into the running sums, ``remove_user`` subtracts
+    them again, and ``snapshot()`` returns the rows ``aggregate()`` would produce for the
+    users currently included. Safe to feed from one thread while another snapshots.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._users: Dict[str, Rows] = {}
+        # appid -> [name, forever_h, recent_h, owners, uid the name came from]
+        self._games: Dict[str, list] = {}
+
+    @property
+    def users(self) -> List[str]:
+        return list(self._users)
+
+    def __contains__(self, uid: str) -> bool:
+        return uid in self._users
+
+    def __len__(self) -> int:
+        return len(self._games)
+
+    @metrics.timed_fn("aggregate.add_user_s")
+    def add_user(self, uid: str, rows: Rows) -> None:
+        with self._lock:
+            if uid in self._users:
+                self._remove(uid)
+            self._users[uid] = rows
+            games = self._games
+            seen = set()
+            for appid, name, all_h, rec_h in iter_game_rows(rows):
+                g = games.get(appid)
+                if g is None:
+                    g = games[appid] = [name, 0.0, 0.0, 0, uid]
+                g[1] += all_h
+                g[2] += rec_h
+                if appid not in seen:
+                    seen.add(appid)
+                    g[3] += 1
+
+    def remove_user(self, uid: str) -> bool:
+        with self._lock:
+            if uid not in self._users:
+                return False
+            self._remove(uid)
+            return True
+
+    def _remove(self, uid: str) -> None:
+        games = self._games
+        seen = set()
+        renamed = set()
+        for appid, _name, all_h, rec_h in iter_game_rows(self._users.pop(uid)):
+            g = games.get(appid)
+            if g is None:
+                continue  # duplicate row of an appid this user already emptied
+            g[1] -= all_h
+            g[2] -= rec_h
+            if appid not in seen:
+                seen.add(appid)
+                g[3] -= 1
+                if g[3] == 0:
+                    del games[appid]  # also drops any float residue from the subtraction
+                elif g[4] == uid:
+                    renamed.add(appid)
+        # the name comes from the first remaining user that has the game, as in aggregate()
+        for other, rows in self._users.items():
+            if not renamed:
+                break
+            for appid, name, _all_h, _rec_h in iter_game_rows(rows):
+                if appid in renamed:
+                    renamed.discard(appid)
+                    games[appid][0] = name
+                    games[appid][4] = other
+
+    @metrics.timed_fn("aggregate.snapshot_s")
+    def snapshot(self) -> List[dict]:
+        with self._lock:
+            out = [
+                {
                     'appid': appid,
                     'name': name,
-                    'family_playtime_forever_h': 0.0,
-                    'family_playtime_recent_h': 0.0,
+                    'family_playtime_forever_h': round(all_h, 1),
+                    'family_playtime_recent_h': round(rec_h, 1),
+                    'owners_count': owners,
                 }
-                owners[appid] = set()
-            bucket[appid]['family_playtime_forever_h'] += all_h
-            bucket[appid]['family_playtime_recent_h'] += rec_h
-            owners[appid].add(uid)
-
-    # finalize rounding and owners_count
-    out = []
-    for appid, row in bucket.items():
-        row['family_playtime_forever_h'] = round(row['family_playtime_forever_h'], 1)
-        row['family_playtime_recent_h'] = round(row['family_playtime_recent_h'], 1)
-        row['owners_count'] = len(owners.get(appid, set()))
-        out.append(row)
-
-    # default sort: forever desc
-    out.sort(key=lambda r: (-r['family_playtime_forever_h'], r['name'].lower()))
-    return out
\ No newline at end of file
+                for appid, (name, all_h, rec_h, owners, _src) in self._games.items()
+            ]
+        # default sort: forever desc
+        out.sort(key=lambda r: (-r['family_playtime_forever_h'], r['name'].lower()))
+        return out
+
+
+def aggregate(games_by_user: Dict[str, Rows]) -> List[dict]:
+    agg = IncrementalAggregator()
+    for uid, rows in games_by_user.items():
+        agg.add_user(uid, rows)
+    return agg.snapshot()
@@ -0,0 +1,214 @@
+"""asyncio variant of the Steam Community client (requires the optional aiohttp dependency).
+
+    async with AsyncSteamClient() as client:
+        steam64, err = await client.resolve_steam64("gaben")
+        async for uid, rows, err in client.fetch_libraries(ids):
+            ...
+
+One pooled keep-alive session per client, an async token bucket in place of HostGate,
+and the same retry rules as ``backoff_request`` (429/5xx retried honoring Retry-After, 404
+returned, the pause from ``rate_limit.retry_pause``). Access checks read the games XML only
+as far as ``LibraryProbe`` needs, and only Steam's own answers are remembered.
+"""
+from __future__ import annotations
+import asyncio
+import random
+import time
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import aiohttp
+
+from .clients import BASE, HEADERS, MAX_WORKERS
+from . import rate_limit
+from .parsers import LibraryProbe, LibraryUnavailable, parse_friends, parse_library_columns, parse_steam64_from_vanity_xml
+from .rate_limit import RETRY_STATUSES, retry_pause
+from .records import Library
+from .util import is_steam64, unique_by_steam64
+
+@dataclass
+class AsyncResponse:
+    """The parts of a response the parsers need, read fully before the connection is released."""
+    status_code: int
+    content: bytes
+    headers: Dict[str, str] = field(default_factory=dict)
+    url: str = ""
+
+
+class AsyncTokenBucket:
+    """Async per-host pacing: ``rate`` requests per second to each host, with bursts of up
+    to ``burst``.
+
+    Every host (the netloc of the URL passed to ``wait``) has its own bucket, as with
+    AdaptiveGate's host budget. Callers reserve a token under a short lock and sleep
+    outside it, so waiting coroutines never block each other the way HostGate's locked
+    sleep does.
+    """
+
+    def __init__(self, rate: float = 1 / 0.8, burst: int = 1, jitter: Tuple[float, float] = (0.05, 0.2)):
+        self.rate = rate
+        self.burst = burst
+        self.jitter = jitter
+        self._buckets: Dict[str, List[float]] = {}  # host -> [tokens, last refill]
+        self._lock = asyncio.Lock()
+
+    async def wait(self, url: Optional[str] = None) -> None:
+        host = urlsplit(url or '').netloc
+        async with self._lock:
+            now = time.monotonic()
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                bucket = self._buckets[host] = [float(self.burst), now]
+            tokens = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+            tokens -= 1  # negative balance = a reservation further in the future
+            bucket[:] = [tokens, now]
+            delay = 0.0 if tokens >= 0 else -tokens / self.rate + random.uniform(*self.jitter)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+async def async_backoff_request(fn: Callable[[], Awaitable[AsyncResponse]], max_retries: int = 5) -> AsyncResponse:
+    delay = rate_limit.BACKOFF_BASE
+    for attempt in range(max_retries):
+        resp = await fn()
+        if resp.status_code < 400 or resp.status_code == 404:
+            return resp
+        if resp.status_code in RETRY_STATUSES:
+            await asyncio.sleep(retry_pause(resp.headers, delay))
+            delay = min(delay * 2, 60)
+            continue
+        return resp
+    return resp
+
+
+class AsyncSteamClient:
+    def __init__(self, base: str = BASE, gate: Optional[AsyncTokenBucket] = None,
+                 max_connections: int = MAX_WORKERS, timeout: float = 15.0):
+        self.base = base.rstrip('/')
+        self.gate = gate or AsyncTokenBucket()
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self.access: Dict[str, bool] = {}  # definitive answers only, as clients.ACCESS_CACHE
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    async def __aenter__(self) -> "AsyncSteamClient":
+        connector = aiohttp.TCPConnector(limit=self.max_connections, keepalive_timeout=30)
+        timeout = aiohttp.ClientTimeout(sock_connect=self.timeout, sock_read=self.timeout)
+        self._session = aiohttp.ClientSession(headers=HEADERS, connector=connector, timeout=timeout)
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def _get(self, url: str) -> AsyncResponse:
+        if self._session is None:
+            raise RuntimeError("AsyncSteamClient used outside 'async with'")
+        await self.gate.wait(url)
+
+        async def do() -> AsyncResponse:
+            async with self._session.get(url) as r:
+                # a case-insensitive copy, so Retry-After is found however the server spells it
+                return AsyncResponse(r.status, await r.read(), r.headers.copy(), str(r.url))
+        return await async_backoff_request(do)
+
+    async def resolve_steam64(self, seed_str: str) -> Tuple[Optional[str], Optional[str]]:
+        seed_str = (seed_str or '').strip()
+        if not seed_str:
+            return None, "empty seed"
+        if is_steam64(seed_str):
+            return seed_str, None
+        resp = await self._get(f"{self.base}/id/{seed_str}?xml=1")
+        if resp.status_code != 200:
+            return None, f"status {resp.status_code}"
+        return parse_steam64_from_vanity_xml(resp.content)
+
+    async def fetch_friends(self, steam64: str, max_pages: int = 50) -> List[Dict]:
+        results: List[Dict] = []
+        for page in range(1, max_pages + 1):
+            resp = await self._get(f"{self.base}/profiles/{steam64}/friends?ajax=1&p={page}")
+            if resp.status_code != 200:
+                break
+            chunk = parse_friends(resp.content)
+            if not chunk and page == 1:
+                # if ajax returns minimal markup, fall back to the non-ajax page once
+                resp2 = await self._get(f"{self.base}/profiles/{steam64}/friends")
+                if resp2.status_code == 200:
+                    chunk = parse_friends(resp2.content)
+            if not chunk:
+                break
+            results.extend(chunk)
+            # Heuristic: if fewer than ~20 entries, likely last page
+            if len(chunk) < 20:
+                break
+        return unique_by_steam64(results)
+
+    async def fetch_library(self, user_id: str) -> Library:
+        resp = await self._get(f"{self.base}/profiles/{user_id}/games?tab=all&xml=1")
+        if resp.status_code != 200:
+            raise RuntimeError(f"HTTP {resp.status_code}")
+        # parsing a large library is CPU-bound; keep it off the event loop
+        try:
+            rows = await asyncio.to_thread(parse_library_columns, resp.content)
+        except LibraryUnavailable:
+            self.access[user_id] = False
+            raise
+        self.access[user_id] = True
+        return rows
+
+    async def _probe_library(self, url: str) -> Tuple[int, Optional[bool]]:
+        if self._session is None:
+            raise RuntimeError("AsyncSteamClient used outside 'async with'")
+        await self.gate.wait(url)
+        answer: Optional[bool] = None
+
+        async def do() -> AsyncResponse:
+            nonlocal answer
+            async with self._session.get(url) as r:
+                if r.status == 200:
+                    # stop reading at the first <game> or error document; leaving the block drops the rest
+                    probe = LibraryProbe()
+                    async for chunk in r.content.iter_chunked(16 * 1024):
+                        answer = probe.feed(chunk)
+                        if answer is not None:
+                            break
+                    else:
+                        answer = probe.close()
+                return AsyncResponse(r.status, b'', r.headers.copy(), str(r.url))
+        resp = await async_backoff_request(do)
+        return resp.status_code, answer
+
+    async def check_library_access(self, user_id: str) -> bool:
+        """Same contract as clients.check_library_access: transport errors and 429/5xx
+        propagate and are not remembered; a 4xx or an error document is a definitive False."""
+        ok = self.access.get(user_id)
+        if ok is not None:
+            return ok
+        status, ok = await self._probe_library(f"{self.base}/profiles/{user_id}/games?tab=all&xml=1")
+        if status == 429 or status >= 500:
+            raise RuntimeError(f"HTTP {status}")
+        ok = bool(ok) if status == 200 else False
+        self.access[user_id] = ok
+        return ok
+
+    async def fetch_libraries(self, user_ids: Iterable[str]
+                              ) -> AsyncIterator[Tuple[str, Optional[Library], Optional[Exception]]]:
+        """Yield (user_id, rows, error) as each library finishes; the connector caps concurrency."""
+        async def one(uid: str):
+            try:
+                return uid, await self.fetch_library(uid), None
+            except Exception as e:
+                return uid, None, e
+
+        tasks = [asyncio.ensure_future(one(uid)) for uid in dict.fromkeys(u for u in user_ids if u)]
+        try:
+            for fut in asyncio.as_completed(tasks):
+                yield await fut
+        finally:
+            for t in tasks:
+                t.cancel()
@@ -0,0 +1,228 @@
+"""Many families in one run, sharing the session, gate, caches and worker pool.
+
+    python -m steam.cli --manifest families.csv [--format parquet] [--enrich] [--max-friends 5]
+
+The manifest is a CSV with a ``seed`` and/or ``input_csv`` column (a ``vanity,steam64_id``
+file as in CLI mode; relative paths are taken from the manifest's folder), plus optional
+``family`` (label for the output files) and ``max_friends`` columns.
+
+Every stage runs across all families at once: seeds and CSV vanities are resolved in one
+``resolve_many``; friends lists are crawled concurrently; access checks go out in rounds
+that take the next candidates of every family still short of members; and each library
+is fetched once however many families include it. Per-family results are written as in
+CLI mode, plus ``batch_<ts>_summary.csv`` with one line per family.
+"""
+from __future__ import annotations
+import concurrent.futures as cf
+import csv
+import logging
+import os
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence
+
+from . import clients, metrics
+from .aggregate import IncrementalAggregator
+from .clients import MAX_WORKERS, check_access_many, crawl_friends, fetch_libraries
+from .export import export_results
+from .resolver import resolve_entries, resolve_many
+from .util import iter_id_csv, unique_by_steam64
+
+logger = logging.getLogger("steamagg.batch")
+
+MAX_FRIENDS = 5  # accessible friends included per family besides the seed
+ACCESS_ATTEMPTS = 2  # access checks per profile before it is reported as unchecked
+SUMMARY_COLUMNS = ["family", "seed", "seed64", "candidates", "members", "unchecked", "failed", "games", "output", "error"]
+
+
+@dataclass
+class Family:
+    label: str
+    seed: Optional[str] = None
+    input_csv: Optional[str] = None
+    max_friends: int = MAX_FRIENDS
+    seed64: Optional[str] = None
+    candidates: List[Dict] = field(default_factory=list)
+    members: List[str] = field(default_factory=list)
+    unchecked: List[str] = field(default_factory=list)  # access check kept failing; not known private
+    failed: List[str] = field(default_factory=list)
+    rows: List[dict] = field(default_factory=list)
+    output: Optional[str] = None
+    error: Optional[str] = None
+
+
+def read_manifest(path: str, max_friends: int = MAX_FRIENDS) -> List[Family]:
+    base = os.path.dirname(os.path.abspath(path))
+    families: List[Family] = []
+    labels: Dict[str, int] = {}
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        for n, row in enumerate(csv.DictReader(f), 1):
+            seed = (row.get('seed') or '').strip() or None
+            input_csv = (row.get('input_csv') or '').strip() or None
+            if not seed and not input_csv:
+                continue
+            if input_csv and not os.path.isabs(input_csv):
+                input_csv = os.path.join(base, input_csv)
+            label = (row.get('family') or '').strip() or seed or f"family{n}"
+            # two rows with one label would overwrite each other's output
+            labels[label] = labels.get(label, 0) + 1
+            if labels[label] > 1:
+                label = f"{label}-{labels[label]}"
+            limit = (row.get('max_friends') or '').strip()
+            families.append(Family(label, seed, input_csv, int(limit) if limit else max_friends))
+    return families
+
+
+def _resolve(families: List[Family], max_workers: int) -> None:
+    entries = {}
+    for fam in families:
+        if fam.input_csv:
+            try:
+                with open(fam.input_csv, 'r', encoding='utf-8', newline='') as f:
+                    entries[fam.label] = list(iter_id_csv(f))
+            except OSError as e:
+                logger.warning("%s: cannot read %s: %s", fam.label, fam.input_csv, e)
+    # one lookup for every seed and CSV vanity in the manifest
+    lookups = resolve_many([f.seed for f in families if f.seed] +
+                           [v for rows in entries.values() for v, _ in rows if v], max_workers=max_workers)
+    for fam in families:
+        if fam.seed:
+            fam.seed64, err = lookups.get(fam.seed, (None, "not resolved"))
+            if not fam.seed64:
+                fam.error = f"seed not resolved: {err}"
+        if fam.label in entries:
+            resolved, failures = resolve_entries(entries[fam.label], lookups)
+            fam.candidates.extend({"steam64": s64, "name": label} for label, s64 in resolved)
+            for vanity, err in failures:
+                logger.warning("%s: could not resolve %s: %s", fam.label, vanity, err)
+
+
+def _crawl(families: List[Family], max_workers: int) -> None:
+    seeds = list(dict.fromkeys(f.seed64 for f in families if f.seed64))
+    friends: Dict[str, List[Dict]] = {}
+    if seeds:
+        with cf.ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(seeds)))) as pool:
+            futures = {pool.submit(metrics.propagate(crawl_friends), s64): s64 for s64 in seeds}
+            for fut in cf.as_completed(futures):
+                try:
+                    friends[futures[fut]] = fut.result().friends
+                except Exception as e:
+                    logger.warning("Could not fetch friends of %s: %s", futures[fut], e)
+    for fam in families:
+        # friends first, then the family's CSV, as in CLI mode
+        fam.candidates = [c for c in unique_by_steam64(friends.get(fam.seed64, []) + fam.candidates)
+                          if c["steam64"] != fam.seed64]
+
+
+def _select(families: List[Family], max_workers: int) -> None:
+    access: Dict[str, bool] = {}      # definitive answers only
+    failures: Dict[str, int] = {}     # failed checks so far; retried in the next round
+
+    def unknown(uid: str) -> bool:
+        return uid not in access and failures.get(uid, 0) < ACCESS_ATTEMPTS
+
+    def next_unchecked(fam: Family) -> List[str]:
+        # the fewest unknown candidates that could still complete this family, in order
+        ok, pending = 0, []
+        for c in fam.candidates:
+            if ok + len(pending) >= fam.max_friends:
+                break
+            uid = c["steam64"]
+            if access.get(uid):
+                ok += 1
+            elif unknown(uid):
+                pending.append(uid)
+        return pending
+
+    while True:
+        wanted = [f.seed64 for f in families if f.seed64 and unknown(f.seed64)]
+        for fam in families:
+            wanted.extend(next_unchecked(fam))
+        if not wanted:
+            break
+        # one round for all families; a profile shared by several is checked once
+        for uid, ok in check_access_many(wanted, max_workers=max_workers):
+            if ok is None:
+                failures[uid] = failures.get(uid, 0) + 1  # a failed check is not a private profile
+            else:
+                access[uid] = ok
+
+    for fam in families:
+        if fam.seed64 and access.get(fam.seed64):
+            fam.members.append(fam.seed64)
+        fam.members.extend([c["steam64"] for c in fam.candidates if access.get(c["steam64"])][:fam.max_friends])
+        fam.unchecked = [uid for uid in [fam.seed64, *(c["steam64"] for c in fam.candidates)]
+                         if uid and uid not in access and uid in failures]
+        if fam.unchecked:
+            logger.warning("%s: access could not be checked for %d profile(s): %s",
+                           fam.label, len(fam.unchecked), ", ".join(fam.unchecked))
+
+
+def _fetch(families: List[Family], max_workers: int) -> int:
+    by_member: Dict[str, List[Family]] = {}
+    for fam in families:
+        for uid in fam.members:
+            by_member.setdefault(uid, []).append(fam)
+    aggs = {fam.label: IncrementalAggregator() for fam in families}
+    for uid, rows, err in fetch_libraries(list(by_member), max_workers=max_workers):
+        for fam in by_member[uid]:
+            if err is not None:
+                fam.failed.append(uid)
+            else:
+                aggs[fam.label].add_user(uid, rows)
+        if err is not None:
+            logger.warning("Library fetch failed for %s: %s", uid, err)
+    for fam in families:
+        fam.rows = aggs[fam.label].snapshot()
+    return len(by_member)
+
+
+def write_summary(families: Sequence[Family], path: str) -> str:
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        w = csv.writer(f)
+        w.writerow(SUMMARY_COLUMNS)
+        for fam in families:
+            w.writerow([fam.label, fam.seed or '', fam.seed64 or '', len(fam.candidates), len(fam.members),
+                        len(fam.unchecked), len(fam.failed), len(fam.rows), fam.output or '', fam.error or ''])
+    return path
+
+
+def run_batch(families: List[Family], formats: Sequence[str] = ("csv",), directory: str = 'output',
+              max_workers: int = MAX_WORKERS, enrich: bool = False) -> str:
+    """Run every family of a manifest; returns the summary CSV path."""
+    run_ts = datetime.now()
+    with metrics.run_metrics() as rm:
+        with metrics.stage("resolve"):
+            _resolve(families, max_workers)
+        with metrics.stage("friends"):
+            _crawl(families, max_workers)
+        with metrics.stage("access"):
+            _select(families, max_workers)
+        with metrics.stage("fetch_libraries"):
+            fetched = _fetch(families, max_workers)
+        shared = sum(len(f.members) for f in families) - fetched
+        logger.info("Batch: %d families, %d libraries fetched (%d memberships shared)",
+                    len(families), fetched, shared)
+
+        with metrics.stage("write"):
+            for fam in families:
+                if not fam.rows:
+                    fam.error = fam.error or "no accessible libraries"
+                    continue
+                paths = export_results(fam.rows, fam.label, formats=["csv", *formats],
+                                       directory=directory, run_ts=run_ts)
+                fam.output = paths["csv"]
+        if enrich:
+            from .store import appids_of, enrich_appids, enriched_path, merge_store_info, write_enriched_csv
+            with metrics.stage("enrich"):
+                # one fetch per appid across every family
+                info = enrich_appids(appids_of(*(f.rows for f in families)))
+                for fam in families:
+                    if fam.output:
+                        write_enriched_csv(merge_store_info(fam.rows, info), enriched_path(fam.output))
+        logger.info("Rate limiter: %s", clients.GATE.stats())
+        os.makedirs(directory, exist_ok=True)
+        summary = write_summary(families, os.path.join(directory, f"batch_{run_ts.strftime('%Y-%m-%d_%H-%M-%S')}_summary.csv"))
+    metrics.write_json(rm, metrics.metrics_path(summary))
+    return summary
+
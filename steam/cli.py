@@ -0,0 +1,221 @@
+"""Command-line runs: one family, a resumed run, or a manifest of families. No Flask.
+
+    python -m steam.cli --seed <vanity|steam64> [--input-csv path] [--format parquet] [--enrich]
+    python -m steam.cli --resume <run_id>
+    python -m steam.cli --manifest families.csv
+
+Only the ``steam`` package is loaded: requests is imported with the first request
+(``clients.session()``) and the store module only for ``--enrich``, so ``--help`` or a
+fully cached run starts in a fraction of the time ``app.py`` takes. ``app.py --no-ui``
+forwards here.
+"""
+from __future__ import annotations
+import argparse
+import logging
+import os
+from typing import List, Optional, Sequence
+
+from . import clients
+from .aggregate import IncrementalAggregator
+from .batch import MAX_FRIENDS, read_manifest, run_batch
+from .clients import check_library_access, configure_disk_cache, fetch_friends, fetch_libraries, resolve_steam64
+from .export import WRITERS, export_results, resolve_format
+from .journal import RunJournal, RunState, open_journal
+from .metrics import metrics_path, run_metrics, stage, write_json
+from .resolver import configure_vanity_table, resolve_entries
+from .util import iter_id_csv, unique_by_steam64
+
+logger = logging.getLogger("steamagg")
+
+DEFAULT_CACHE_DIR = "cache"
+
+
+def write_results(agg_rows: List[dict], seed_label: str, formats: Sequence[str] = ()) -> str:
+    """Write the run's CSV plus any extra formats (see steam.export); returns the CSV path."""
+    paths = export_results(agg_rows, seed_label, formats=["csv", *formats])
+    for fmt, path in paths.items():
+        if fmt != "csv":
+            logger.info("Wrote %s results to %s", fmt, path)
+    return paths["csv"]
+
+
+def write_store_csv(agg_rows: List[dict], csv_path: str) -> str:
+    from .store import appids_of, enrich_appids, enriched_path, merge_store_info, write_enriched_csv
+
+    info = enrich_appids(appids_of(agg_rows))
+    return write_enriched_csv(merge_store_info(agg_rows, info), enriched_path(csv_path))
+
+
+def add_network_args(parser: argparse.ArgumentParser) -> None:
+    """Cache, rate and output options shared by the CLI and the web UI."""
+    parser.add_argument('--cache-dir', default=os.environ.get("STEAMAGG_CACHE_DIR"),
+                        help='Enable the persistent HTTP cache in this directory (env: STEAMAGG_CACHE_DIR)')
+    parser.add_argument('--no-cache', action='store_true', help='Bypass the persistent HTTP cache for this run')
+    parser.add_argument('--purge-cache', action='store_true', help='Delete all cached responses before starting')
+    parser.add_argument('--max-rate', type=float,
+                        help='Ceiling in requests/second per host, shared by all its endpoint classes (default 2)')
+    parser.add_argument('--format', action='append', default=[], metavar='FMT',
+                        choices=[*WRITERS, 'columnar'],
+                        help='Also write results as FMT (jsonl.gz, parquet, sqlite or columnar); repeatable')
+    parser.add_argument('--enrich', action='store_true',
+                        help='Also fetch store data (reviews, release date, size, genres) for every game')
+
+
+def configure(args: argparse.Namespace) -> List[str]:
+    """Apply add_network_args options to the shared gate and caches; returns the export formats."""
+    if args.max_rate is not None:
+        clients.GATE.max_rate = args.max_rate
+    if args.purge_cache:
+        configure_disk_cache(args.cache_dir or DEFAULT_CACHE_DIR, purge=True)
+    configure_disk_cache(None if args.no_cache else args.cache_dir)
+    # vanity -> steam64 mappings are stable, so they persist even without --cache-dir
+    configure_vanity_table(None if args.no_cache else (args.cache_dir or DEFAULT_CACHE_DIR))
+    if args.enrich:
+        from .store import configure_store_cache
+        # store data changes slowly and is the bulk of an enriched run's requests
+        configure_store_cache(None if args.no_cache else (args.cache_dir or DEFAULT_CACHE_DIR))
+    return [resolve_format(f) for f in args.format]
+
+
+def run_cli(seed: Optional[str], input_csv: Optional[str], resume: Optional[str] = None,
+            max_friends: int = MAX_FRIENDS, formats: Sequence[str] = (), enrich: bool = False):
+    if not seed and not input_csv and not resume:
+        print("Provide --seed, --input-csv or --manifest for CLI mode.")
+        return
+
+    try:
+        journal, done = open_journal(resume, mode="cli", seed=seed, input_csv=input_csv)
+    except FileNotFoundError as e:
+        print(f"Cannot resume: {e}")
+        return
+    # a resumed run keeps the inputs it was started with unless new ones are given
+    seed = seed or done.meta.get("seed")
+    input_csv = input_csv or done.meta.get("input_csv")
+    print(f"Run {journal.run_id} (journal: {journal.path})")
+    with journal, run_metrics() as rm:
+        csv_path = _run_cli(journal, done, seed, input_csv, max_friends, formats, enrich)
+    if csv_path:
+        print(f"Metrics: {write_json(rm, metrics_path(csv_path))}")
+
+
+def _run_cli(journal: RunJournal, done: RunState, seed: Optional[str], input_csv: Optional[str],
+             max_friends: int, formats: Sequence[str], enrich: bool) -> Optional[str]:
+    seed64 = done.resolved.get(seed) if seed else None
+    if seed and not seed64:
+        with stage("resolve"):
+            seed64, err = resolve_steam64(seed)
+        if not seed64:
+            print(f"Seed could not be resolved: {err}")
+        else:
+            journal.resolved(seed, seed64)
+
+    candidates = done.candidates
+    if candidates is None:
+        candidates = []
+        if seed64:
+            try:
+                with stage("friends"):
+                    candidates = fetch_friends(seed64)
+            except Exception as e:
+                logger.warning("CLI: could not fetch friends: %s", e)
+
+        # ingest CSV
+        if input_csv and os.path.exists(input_csv):
+            with open(input_csv, 'r', encoding='utf-8', newline='') as f, stage("resolve"):
+                resolved, failures = resolve_entries(iter_id_csv(f))
+            candidates.extend({"steam64": s64, "name": label} for label, s64 in resolved)
+            for vanity, err in failures:
+                print(f"CSV: could not resolve {vanity}: {err}")
+
+        candidates = unique_by_steam64(candidates)
+        journal.candidates(candidates)
+
+    def accessible(s64: str) -> bool:
+        ok = done.access.get(s64)
+        if ok is None:
+            try:
+                with stage("access"):
+                    ok = check_library_access(s64)
+            except Exception as e:
+                # not journalled, so --resume checks it again
+                print(f"Could not check library access for {s64}: {e}")
+                return False
+            journal.access(s64, ok)
+        return ok
+
+    included = []
+    if seed64 and accessible(seed64):
+        included.append(seed64)
+
+    # choose the first max_friends accessible friends
+    friends = 0
+    for c in candidates:
+        if friends >= max_friends:
+            break
+        s64 = c['steam64']
+        if s64 not in included and accessible(s64):
+            included.append(s64)
+            friends += 1
+
+    if not included:
+        print("CLI: no accessible profiles.")
+        return None
+
+    agg = IncrementalAggregator()
+    for uid in included:
+        if uid in done.libraries:
+            agg.add_user(uid, done.libraries[uid])
+            print(f"{uid}: {len(done.libraries[uid])} games (from journal)")
+    with stage("fetch_libraries"):
+        for uid, rows, err in fetch_libraries([u for u in included if u not in done.libraries]):
+            if err is not None:
+                logger.warning("CLI: library fetch failed for %s: %s", uid, err)
+                journal.failed(uid, str(err) or type(err).__name__)
+            else:
+                journal.library(uid, rows)
+                agg.add_user(uid, rows)
+                print(f"{uid}: {len(rows)} games (family so far: {len(agg)} games, {len(agg.users)}/{len(included)} users)")
+
+    with stage("aggregate"):
+        agg_rows = agg.snapshot()
+    logger.info("Response cache: %s", clients.RESPONSE_CACHE.stats())
+    logger.info("Rate limiter: %s", clients.GATE.stats())
+
+    with stage("write"):
+        csv_path = write_results(agg_rows, seed or (seed64 or "unknown"), formats)
+    journal.done(csv_path)
+    print(f"Wrote {len(agg_rows)} rows to {csv_path}")
+    if enrich:
+        with stage("enrich"):
+            print(f"Wrote store data to {write_store_csv(agg_rows, csv_path)}")
+    return csv_path
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Steam Family Library Aggregator – CLI")
+    parser.add_argument('--seed', help='Seed vanity or steam64')
+    parser.add_argument('--input-csv', help='Optional CSV with vanity,steam64_id')
+    parser.add_argument('--manifest', help='CSV of many families (seed, input_csv, family, max_friends) to run in one batch')
+    parser.add_argument('--max-friends', type=int, default=MAX_FRIENDS, help='Accessible friends included per family')
+    parser.add_argument('--resume', metavar='RUN',
+                        help='Continue an interrupted CLI run (ID or path of its journal under output/runs)')
+    add_network_args(parser)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='[%(asctime)s] %(levelname)s: %(message)s')
+    formats = configure(args)
+    if args.manifest:
+        families = read_manifest(args.manifest, max_friends=args.max_friends)
+        summary = run_batch(families, formats=formats, enrich=args.enrich)
+        for fam in families:
+            print(f"{fam.label}: {len(fam.members)} members, {len(fam.rows)} games"
+                  + (f", {len(fam.unchecked)} unchecked" if fam.unchecked else "")
+                  + (f" -> {fam.output}" if fam.output else f" ({fam.error})"))
+        print(f"Summary: {summary}")
+    else:
+        run_cli(args.seed, args.input_csv, resume=args.resume, max_friends=args.max_friends,
+                formats=formats, enrich=args.enrich)
+
+
+if __name__ == '__main__':
+    main()
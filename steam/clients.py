@@ -1,43 +1,136 @@
 from __future__ import annotations
 import concurrent.futures as cf
 import logging
-from typing import List, Tuple, Dict
-
-import requests
-from lxml import html
+import threading
+import time
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, TypeVar
 
 from .parsers import (
     parse_steam64_from_vanity_xml,
-    parse_friends,
-    parse_library_xml,
+    parse_friends_page,
+    parse_library_columns,
+    probe_library_xml,
+    LibraryUnavailable,
 )
-from .rate_limit import HostGate, backoff_request
-from .util import is_steam64
+from . import metrics
+from .cache import TTLCache
+from .http_cache import DiskCache
+from .rate_limit import AdaptiveGate, backoff_request, endpoint_class, parse_retry_after
+from .records import FriendPage, FriendsCrawl, Library
+from .util import is_steam64, unique_by_steam64
+
+if TYPE_CHECKING:
+    import requests
 
 logger = logging.getLogger("steamagg.clients")
 
+T = TypeVar("T")
+
 HEADERS = {
     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
 }
 
-SESSION = requests.Session()
-SESSION.headers.update(HEADERS)
-SESSION.timeout = (15, 15)  # connect, read
+# Created by session() on the first request, so importing this module doesn't load requests.
+SESSION: Optional["requests.Session"] = None
+_SESSION_LOCK = threading.Lock()
 
-GATE = HostGate(base_delay=0.8)
+# Starts at the old fixed 0.8s spacing and adapts per host/endpoint class from there.
+GATE = AdaptiveGate(base_delay=0.8)
 
 MAX_WORKERS = 3
+FRIENDS_PAGE_SIZE = 20  # a full ajax friends page; a shorter one is the last
+FRIENDS_MAX_PAGES = 50
 BASE = "https://steamcommunity.com"
 
+# Parsed games XML keyed by URL, so a run downloads each library once and an access
+# check after a fetch is free. Short-lived: playtime changes.
+RESPONSE_CACHE = TTLCache(maxsize=32, ttl=600)
+
+# steam64 -> accessible? from the probe; privacy settings rarely flip mid-session.
+ACCESS_CACHE = TTLCache(maxsize=4096, ttl=900)
+
+# Opt-in persistent HTTP cache (see configure_disk_cache); None means always go to the network.
+DISK_CACHE: Optional[DiskCache] = None
+
+
+def session() -> "requests.Session":
+    global SESSION
+    if SESSION is None:
+        with _SESSION_LOCK:
+            if SESSION is None:
+                import requests
+                s = requests.Session()
+                s.headers.update(HEADERS)
+                s.timeout = (15, 15)  # connect, read
+                SESSION = s
+    return SESSION
 
-def _get(url: str) -> requests.Response:
-    GATE.wait()
+
+def configure_disk_cache(directory: Optional[str], purge: bool = False) -> Optional[DiskCache]:
+    global DISK_CACHE
+    DISK_CACHE = DiskCache(directory) if directory else None
+    if DISK_CACHE is not None and purge:
+        n = DISK_CACHE.purge()
+        logger.info("Purged %d cached responses from %s", n, DISK_CACHE.path)
+    return DISK_CACHE
+
+
+def _get(url: str, stream: bool = False) -> requests.Response:
+    """GET through the disk cache, gate and backoff. With ``stream=True`` the body is
+    left unread for ``iter_content`` (unless the disk cache needs it)."""
+    cache = DISK_CACHE
+    klass = endpoint_class(url)
+    entry = cache.get(url) if cache is not None else None
+    if entry is not None and entry.is_fresh():
+        # served locally: no gate slot, no delay
+        cache.hits += 1
+        metrics.incr("http.cache_hits")
+        return entry.to_response()
+
+    headers = {}
+    if entry is not None:
+        if entry.etag:
+            headers['If-None-Match'] = entry.etag
+        if entry.last_modified:
+            headers['If-Modified-Since'] = entry.last_modified
+
+    streamed = stream and cache is None
+    GATE.wait(url)
     def do():
-        return SESSION.get(url, timeout=(15, 15))
-    resp = backoff_request(do)
+        t0 = time.perf_counter()
+        r = session().get(url, timeout=(15, 15), headers=headers, stream=streamed)
+        # time to headers for streamed responses, the whole body otherwise
+        metrics.observe(f"http.latency_s.{klass}", time.perf_counter() - t0)
+        metrics.incr(f"http.status.{r.status_code}")
+        GATE.feedback(url, r.status_code, parse_retry_after(r.headers.get('Retry-After')))
+        return r
+    resp = backoff_request(do, on_sleep=lambda s: GATE.record_backoff(url, s))
+    metrics.incr(f"http.requests.{klass}")
+    if not streamed:
+        metrics.observe(f"http.bytes.{klass}", len(resp.content), metrics.BYTE_BOUNDS)
+
+    if cache is not None:
+        if resp.status_code == 304 and entry is not None:
+            cache.revalidated += 1
+            cache.touch(url)
+            return entry.to_response()
+        cache.misses += 1
+        if resp.status_code == 200:
+            cache.put(url, resp)
     return resp
 
 
+def _iter_body(resp: requests.Response, chunk_size: int) -> Iterator[bytes]:
+    """``resp.iter_content`` that records the bytes actually read, even if the reader stops early."""
+    n = 0
+    try:
+        for chunk in resp.iter_content(chunk_size=chunk_size):
+            n += len(chunk)
+            yield chunk
+    finally:
+        metrics.observe(f"http.bytes.{endpoint_class(resp.url)}", n, metrics.BYTE_BOUNDS)
+
+
 def resolve_steam64(seed_str: str) -> Tuple[str|None, str|None]:
     seed_str = (seed_str or '').strip()
     if not seed_str:
@@ -53,63 +146,181 @@ def resolve_steam64(seed_str: str) -> Tuple[str|None, str|None]:
     return steam64, err
 
 
+def _friends_page(steam64: str, page: int, ajax: bool = True
+                  ) -> Tuple[Optional[List[Dict]], Optional[int], Optional[FriendPage]]:
+    """Fetch and parse one friends page: (friends or None on a non-200, pager hint, stats)."""
+    url = f"{BASE}/profiles/{steam64}/friends" + (f"?ajax=1&p={page}" if ajax else "")
+    resp = _get(url)
+    if resp.status_code != 200:
+        return None, None, None
+    body = resp.content
+    t0 = time.perf_counter()
+    chunk, hint = parse_friends_page(body)
+    return chunk, hint, FriendPage(page, len(body), time.perf_counter() - t0, len(chunk))
+
+
+def crawl_friends(steam64: str, max_pages: int = FRIENDS_MAX_PAGES,
+                  max_workers: int = MAX_WORKERS) -> FriendsCrawl:
+    """Walk a profile's ajax friends pages, fetching everything after page 1 concurrently.
+
+    Page 1 fixes the page size and may announce the last page through a pager; if it
+    does, pages 2..N are fetched at once. Otherwise pages go out in waves of
+    ``max_workers`` until one comes back short or empty. Every request still passes GATE.
+    """
+    crawl = FriendsCrawl()
+    first, hint, stat = _friends_page(steam64, 1)
+    if first is None:
+        return crawl
+    crawl.pages.append(stat)
+    if not first:
+        # if ajax returns minimal markup, fall back to the non-ajax first page once
+        first, hint, stat = _friends_page(steam64, 1, ajax=False)
+        if stat is not None:
+            crawl.pages.append(stat)
+        crawl.friends = unique_by_steam64(first or [])
+        return crawl
+
+    crawl.page_hint = hint
+    by_page: Dict[int, List[Dict]] = {1: first}
+    page_size = len(first)
+    last = min(hint or max_pages, max_pages) if page_size >= FRIENDS_PAGE_SIZE else 1
+    workers = max(1, max_workers)
+    with cf.ThreadPoolExecutor(max_workers=workers) as pool:
+        nxt = 2
+        while nxt <= last:
+            wave = range(nxt, last + 1) if hint else range(nxt, min(nxt + workers, last + 1))
+            futures = {pool.submit(metrics.propagate(_friends_page), steam64, p): p for p in wave}
+            for fut in cf.as_completed(futures):
+                chunk, _, stat = fut.result()
+                by_page[futures[fut]] = chunk or []
+                if stat is not None:
+                    crawl.pages.append(stat)
+            nxt = wave[-1] + 1
+            # stop at the first short page; anything fetched past it is discarded
+            for p in wave:
+                if len(by_page[p]) < page_size:
+                    last = p
+                    break
+
+    crawl.pages.sort(key=lambda s: s.page)
+    # page order, first name wins, exactly as a sequential walk would have it
+    crawl.friends = unique_by_steam64(f for p in sorted(by_page) if p <= last for f in by_page[p])
+    logger.info("Friends of %s: %d across %d page(s), %d bytes, %.3fs parsing",
+                steam64, len(crawl.friends), crawl.page_count, crawl.bytes, crawl.parse_s)
+    return crawl
+
+
 def fetch_friends(steam64: str) -> List[Dict]:
-    results: List[Dict] = []
-    # Try AJAX paginated endpoint if available
-    page = 1
-    while True:
-        url = f"{BASE}/profiles/{steam64}/friends?ajax=1&p={page}"
-        resp = _get(url)
+    return crawl_friends(steam64).friends
+
+
+def _library_rows(user_id: str) -> Library:
+    url = f"{BASE}/profiles/{user_id}/games?tab=all&xml=1"
+    rows = RESPONSE_CACHE.get(url)
+    if rows is not None:
+        metrics.incr("cache.library_hits")
+        return rows
+    resp = _get(url, stream=True)
+    with resp:
+        if resp.status_code != 200:
+            raise RuntimeError(f"HTTP {resp.status_code}")
+        # parse while the body arrives instead of holding the full document and DOM
+        try:
+            rows = parse_library_columns(_iter_body(resp, 64 * 1024))
+        except LibraryUnavailable:
+            ACCESS_CACHE.set(user_id, False)
+            raise
+    RESPONSE_CACHE.set(url, rows)
+    ACCESS_CACHE.set(user_id, True)
+    return rows
+
+
+def probe_library_access(user_id: str) -> bool:
+    """Decide access from the start of the games XML stream and drop the connection once
+    the first <game> (or an error document) shows up, instead of downloading it all."""
+    url = f"{BASE}/profiles/{user_id}/games?tab=all&xml=1"
+    if url in RESPONSE_CACHE:  # a peek, so probing does not show up as cache misses
+        return True  # only accessible libraries are ever cached
+    resp = _get(url, stream=True)
+    with resp:
+        if resp.status_code == 429 or resp.status_code >= 500:
+            # a 429/5xx left after backoff says nothing about the library
+            raise RuntimeError(f"HTTP {resp.status_code}")
         if resp.status_code != 200:
-            break
-        doc = html.fromstring(resp.text)
-        chunk = parse_friends(resp.content)
-        if not chunk:
-            # if ajax returns minimal markup, fall back to non-ajax first page once
-            if page == 1:
-                url2 = f"{BASE}/profiles/{steam64}/friends"
-                resp2 = _get(url2)
-                if resp2.status_code == 200:
-                    chunk = parse_friends(resp2.content)
-            if not chunk:
-                break
-        results.extend(chunk)
-        # Heuristic: if fewer than ~20 entries, likely last page
-        if len(chunk) < 20:
-            break
-        page += 1
-        if page > 50:
-            break
-    # Deduplicate by steam64 while preserving first name
-    seen = set()
-    deduped = []
-    for r in results:
-        s64 = r.get('steam64')
-        if not s64 or s64 in seen:
-            continue
-        seen.add(s64)
-        deduped.append(r)
-    return deduped
+            return False  # 404 and other 4xx: Steam's answer, cached like a private profile
+        return probe_library_xml(_iter_body(resp, 16 * 1024))
 
 
 def check_library_access(user_id: str) -> bool:
+    """Probe (or recall) whether a library is readable.
+
+    Only answers Steam actually gave are cached (a library, an error document, a 4xx);
+    transport errors and 429/5xx propagate uncached, so a blip is reported as a failure
+    rather than a private profile.
+    """
     # we always use /profiles/<steam64> form since we resolve upfront
-    url = f"{BASE}/profiles/{user_id}/games?tab=all&xml=1"
-    resp = _get(url)
-    if resp.status_code != 200:
-        return False
-    try:
-        rows = parse_library_xml(resp.content)
-        # If it parsed without exception, consider accessible (even if empty)
-        _ = len(rows)
-        return True
-    except Exception:
-        return False
+    ok = ACCESS_CACHE.get(user_id)
+    if ok is None:
+        ok = probe_library_access(user_id)
+        ACCESS_CACHE.set(user_id, ok)
+    return ok
 
 
-def fetch_library(user_id: str) -> List[Dict]:
-    url = f"{BASE}/profiles/{user_id}/games?tab=all&xml=1"
-    resp = _get(url)
-    if resp.status_code != 200:
-        raise RuntimeError(f"HTTP {resp.status_code}")
-    return parse_library_xml(resp.content)
\ No newline at end of file
+def fetch_library(user_id: str) -> Library:
+    return _library_rows(user_id)
+
+def _map_as_completed(fn: Callable[[str], T], user_ids: Iterable[str], max_workers: int,
+                      on_start: Optional[Callable[[str], None]] = None,
+                      ) -> Iterator[Tuple[str, Optional[T], Optional[Exception]]]:
+    ids = list(dict.fromkeys(u for u in user_ids if u))
+    if not ids:
+        return
+
+    def work(uid: str) -> T:
+        if on_start is not None:
+            on_start(uid)
+        return fn(uid)
+
+    with cf.ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(ids)))) as pool:
+        futures = {pool.submit(metrics.propagate(work), uid): uid for uid in ids}
+        for fut in cf.as_completed(futures):
+            uid = futures[fut]
+            try:
+                yield uid, fut.result(), None
+            except Exception as e:
+                yield uid, None, e
+
+
+def fetch_libraries(user_ids: Iterable[str], max_workers: int = MAX_WORKERS,
+                    on_start: Optional[Callable[[str], None]] = None,
+                    ) -> Iterator[Tuple[str, Optional[Library], Optional[Exception]]]:
+    """Fetch several libraries in a bounded pool, yielding (user_id, rows, error) as each finishes.
+
+    Every request still goes through GATE, so per-host pacing is unchanged; the
+    pool only overlaps the network round-trips and parsing. ``on_start(user_id)`` is
+    called from the worker just before a fetch begins.
+    """
+    return _map_as_completed(fetch_library, user_ids, max_workers, on_start)
+
+
+def check_access_many(user_ids: Iterable[str], max_workers: int = MAX_WORKERS,
+                      on_start: Optional[Callable[[str], None]] = None,
+                      ) -> Iterator[Tuple[str, Optional[bool]]]:
+    """Access-check many users concurrently, yielding (user_id, accessible) as each finishes.
+
+    Answers already in ACCESS_CACHE come back first without touching the pool. A check
+    that failed (network error, 429/5xx after backoff) is logged and yields None.
+    """
+    pending = []
+    for uid in dict.fromkeys(u for u in user_ids if u):
+        ok = ACCESS_CACHE.get(uid)
+        if ok is None:
+            pending.append(uid)
+        else:
+            yield uid, ok
+    for uid, ok, err in _map_as_completed(check_library_access, pending, max_workers, on_start):
+        if err is not None:
+            logger.warning("Access check failed for %s: %s", uid, err)
+            yield uid, None
+        else:
+            yield uid, bool(ok)
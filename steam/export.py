@@ -0,0 +1,223 @@
+"""Result writers behind one ``export_results`` call.
+
+    paths = export_results(agg_rows, "gaben", formats=("csv", "jsonl.gz", "columnar"))
+
+Formats:
+
+- ``csv``: ``output/libraries_<ts>_seed-<slug>.csv``, the default and what the UI links to
+- ``jsonl.gz``: the same rows as gzip-compressed JSON Lines, numbers kept as numbers
+- ``parquet``: one file per run in the ``output/results.parquet/`` dataset (needs pyarrow)
+- ``sqlite``: rows appended to ``output/results.sqlite``, one ``run_id`` per run
+- ``columnar``: ``parquet`` if pyarrow is installed, else ``sqlite``
+
+Rows are streamed to every writer in one pass; the Parquet writer buffers a row group
+(``BATCH_ROWS``) at a time. ``read_results`` reads any of them back with typed columns.
+"""
+from __future__ import annotations
+import csv
+import gzip
+import importlib.util
+import json
+import os
+import sqlite3
+from datetime import datetime
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from .util import slugify
+
+RESULT_COLUMNS: List[Tuple[str, type]] = [
+    ("appid", int),
+    ("name", str),
+    ("family_playtime_forever_h", float),
+    ("family_playtime_recent_h", float),
+    ("owners_count", int),
+]
+RESULT_HEADERS = [name for name, _ in RESULT_COLUMNS]
+BATCH_ROWS = 10_000
+SQLITE_STORE = 'results.sqlite'
+PARQUET_DATASET = 'results.parquet'
+
+
+def have_pyarrow() -> bool:
+    return importlib.util.find_spec("pyarrow") is not None
+
+
+def typed_row(row: Dict) -> Tuple:
+    """A result row as a tuple in RESULT_COLUMNS order, each value cast to its column type."""
+    out = []
+    for name, typ in RESULT_COLUMNS:
+        v = row.get(name)
+        out.append(typ() if v is None or v == '' else typ(v))
+    return tuple(out)
+
+
+class CsvWriter:
+    suffix = '.csv'
+
+    def __init__(self, path: str, **run):
+        self.path = path
+        self._f = open(path, 'w', newline='', encoding='utf-8')
+        self._w = csv.writer(self._f)
+        self._w.writerow(RESULT_HEADERS)
+
+    def write(self, row: Tuple) -> None:
+        self._w.writerow(row)
+
+    def close(self) -> None:
+        self._f.close()
+
+
+class JsonlGzWriter:
+    suffix = '.jsonl.gz'
+
+    def __init__(self, path: str, **run):
+        self.path = path
+        self._f = gzip.open(path, 'wt', encoding='utf-8', compresslevel=6)
+
+    def write(self, row: Tuple) -> None:
+        self._f.write(json.dumps(dict(zip(RESULT_HEADERS, row)), ensure_ascii=False, separators=(',', ':')))
+        self._f.write('\n')
+
+    def close(self) -> None:
+        self._f.close()
+
+
+class SqliteWriter:
+    """Appends each run to one SQLite store; ``runs`` holds the seed and timestamp per ``run_id``."""
+
+    def __init__(self, path: str, seed: str = '', run_ts: str = '', **run):
+        self.path = path
+        self._conn = sqlite3.connect(path)
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS runs (run_id INTEGER PRIMARY KEY, seed TEXT, run_ts TEXT);
+            CREATE TABLE IF NOT EXISTS results (
+                run_id INTEGER, appid INTEGER, name TEXT,
+                family_playtime_forever_h REAL, family_playtime_recent_h REAL, owners_count INTEGER);
+            CREATE INDEX IF NOT EXISTS results_run ON results(run_id);
+        """)
+        self.run_id = self._conn.execute("INSERT INTO runs (seed, run_ts) VALUES (?, ?)", (seed, run_ts)).lastrowid
+        self._batch: List[Tuple] = []
+
+    def write(self, row: Tuple) -> None:
+        self._batch.append((self.run_id,) + row)
+        if len(self._batch) >= BATCH_ROWS:
+            self._flush()
+
+    def _flush(self) -> None:
+        self._conn.executemany("INSERT INTO results VALUES (?, ?, ?, ?, ?, ?)", self._batch)
+        self._batch = []
+
+    def close(self) -> None:
+        self._flush()
+        self._conn.commit()
+        self._conn.close()
+
+
+class ParquetWriter:
+    suffix = '.parquet'
+
+    def __init__(self, path: str, **run):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        self.path = path
+        self._pa = pa
+        self._schema = pa.schema([("appid", pa.int64()), ("name", pa.string()),
+                                  ("family_playtime_forever_h", pa.float64()),
+                                  ("family_playtime_recent_h", pa.float64()), ("owners_count", pa.int64())])
+        self._w = pq.ParquetWriter(path, self._schema, compression='zstd')
+        self._batch: List[Tuple] = []
+
+    def write(self, row: Tuple) -> None:
+        self._batch.append(row)
+        if len(self._batch) >= BATCH_ROWS:
+            self._flush()
+
+    def _flush(self) -> None:
+        if self._batch:
+            cols = list(zip(*self._batch))
+            self._w.write_table(self._pa.Table.from_arrays([self._pa.array(c) for c in cols], schema=self._schema))
+            self._batch = []
+
+    def close(self) -> None:
+        self._flush()
+        self._w.close()
+
+
+def _file_path(cls):
+    return lambda directory, stem: os.path.join(directory, stem + cls.suffix)
+
+
+def _parquet_path(directory: str, stem: str) -> str:
+    os.makedirs(os.path.join(directory, PARQUET_DATASET), exist_ok=True)
+    return os.path.join(directory, PARQUET_DATASET, stem + ParquetWriter.suffix)
+
+
+# format -> (writer class, path for a run given the output directory and file stem)
+WRITERS: Dict[str, Tuple[type, Callable[[str, str], str]]] = {
+    "csv": (CsvWriter, _file_path(CsvWriter)),
+    "jsonl.gz": (JsonlGzWriter, _file_path(JsonlGzWriter)),
+    "parquet": (ParquetWriter, _parquet_path),
+    "sqlite": (SqliteWriter, lambda directory, stem: os.path.join(directory, SQLITE_STORE)),
+}
+
+
+def resolve_format(fmt: str) -> str:
+    fmt = fmt.strip().lower()
+    if fmt == 'columnar':
+        return 'parquet' if have_pyarrow() else 'sqlite'
+    if fmt not in WRITERS:
+        raise ValueError(f"unknown output format {fmt!r} (choose from {', '.join(sorted(WRITERS))}, columnar)")
+    return fmt
+
+
+def export_results(rows: Iterable[Dict], seed_label: str, formats: Sequence[str] = ("csv",),
+                   directory: str = 'output', run_ts: Optional[datetime] = None) -> Dict[str, str]:
+    """Write result rows in every requested format in one pass; returns ``{format: path}``."""
+    os.makedirs(directory, exist_ok=True)
+    run_ts = run_ts or datetime.now()
+    stem = f"libraries_{run_ts.strftime('%Y-%m-%d_%H-%M')}_seed-{slugify(seed_label)}"
+    run = {"seed": seed_label, "run_ts": run_ts.isoformat(timespec='seconds')}
+
+    writers = []
+    try:
+        for fmt in dict.fromkeys(resolve_format(f) for f in formats):
+            cls, path_for = WRITERS[fmt]
+            writers.append((fmt, cls(path_for(directory, stem), **run)))
+        for row in rows:
+            t = typed_row(row)
+            for _, w in writers:
+                w.write(t)
+    finally:
+        for _, w in writers:
+            w.close()
+    return {fmt: w.path for fmt, w in writers}
+
+
+def read_results(path: str, run_id: Optional[int] = None) -> Iterator[Dict]:
+    """Rows from any exported file as typed dicts; for the SQLite store, one run (default: the latest)."""
+    if path.endswith('.csv'):
+        with open(path, 'r', encoding='utf-8', newline='') as f:
+            for r in csv.DictReader(f):
+                yield dict(zip(RESULT_HEADERS, typed_row(r)))
+    elif path.endswith('.jsonl.gz'):
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            for line in f:
+                yield json.loads(line)
+    elif path.endswith('.parquet'):
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=BATCH_ROWS):
+            yield from batch.to_pylist()
+    elif path.endswith('.sqlite'):
+        conn = sqlite3.connect(path)
+        try:
+            if run_id is None:
+                run_id = conn.execute("SELECT MAX(run_id) FROM runs").fetchone()[0]
+            cur = conn.execute(f"SELECT {', '.join(RESULT_HEADERS)} FROM results WHERE run_id = ?", (run_id,))
+            for r in cur:
+                yield dict(zip(RESULT_HEADERS, r))
+        finally:
+            conn.close()
+    else:
+        raise ValueError(f"unrecognised results file: {path}")
@@ -0,0 +1,245 @@
+"""Bounded friend-of-friend crawl around one or more seeds.
+
+    graph = crawl_graph(["76561197960287930"], max_depth=2, max_nodes=500,
+                        checkpoint="output/crawl.json")
+    for s64, name, depth, mutual in graph.ranked():
+        ...
+
+Profiles are expanded (their friends list fetched) best-first: the frontier favours
+profiles that already appear in the most expanded friends lists, i.e. mutual friends
+of the people crawled so far, then shallower depth. The graph keeps steam64s as
+integers indexed once and friend lists as ``array('i')`` of those indices.
+
+    python -m steam.graph --seed gaben --depth 2 --max-nodes 300 --checkpoint output/crawl.json
+"""
+from __future__ import annotations
+import argparse
+import concurrent.futures as cf
+import csv
+import heapq
+import json
+import logging
+import os
+import sys
+from array import array
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from . import metrics
+from .clients import MAX_WORKERS, fetch_friends, resolve_steam64
+from .util import is_steam64, unique_by_steam64
+
+logger = logging.getLogger("steamagg.graph")
+
+CHECKPOINT_VERSION = 1
+UNSEEN = -1
+FETCH_ATTEMPTS = 2  # per profile and crawl; a profile that still fails stays unexpanded
+
+
+class FriendGraph:
+    """Profiles seen so far, their crawl depth and the friend lists of the expanded ones."""
+
+    def __init__(self):
+        self.ids = array('q')            # node -> steam64
+        self.depth = array('i')          # node -> hops from the nearest seed
+        self.mutual = array('i')         # node -> expanded profiles listing it as a friend
+        self.expanded = bytearray()      # node -> 1 once its friends list has been fetched
+        self.names: List[str] = []
+        self.adj: Dict[int, array] = {}  # expanded node -> friend nodes
+        self._index: Dict[int, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __contains__(self, steam64: str) -> bool:
+        return int(steam64) in self._index
+
+    def node(self, steam64: str, name: str = '', depth: int = 0) -> int:
+        """Index of ``steam64``, adding it if new; a shorter path lowers its depth."""
+        key = int(steam64)
+        i = self._index.get(key)
+        if i is None:
+            i = self._index[key] = len(self.ids)
+            self.ids.append(key)
+            self.depth.append(depth)
+            self.mutual.append(0)
+            self.expanded.append(0)
+            self.names.append(sys.intern(name or steam64))
+        elif depth < self.depth[i]:
+            self.depth[i] = depth
+        return i
+
+    def steam64(self, i: int) -> str:
+        return str(self.ids[i])
+
+    def friends_of(self, steam64: str) -> List[str]:
+        i = self._index.get(int(steam64), UNSEEN)
+        return [self.steam64(j) for j in self.adj.get(i, ())]
+
+    def ranked(self) -> Iterator[Tuple[str, str, int, int]]:
+        """(steam64, name, depth, mutual) for every node, most-connected first."""
+        order = sorted(range(len(self.ids)), key=lambda i: (-self.mutual[i], self.depth[i], i))
+        for i in order:
+            yield self.steam64(i), self.names[i], self.depth[i], self.mutual[i]
+
+    # -- checkpoints ---------------------------------------------------------
+
+    def to_dict(self) -> dict:
+        return {
+            "version": CHECKPOINT_VERSION,
+            "ids": [str(x) for x in self.ids],
+            "names": self.names,
+            "depth": self.depth.tolist(),
+            "adj": {str(i): nbrs.tolist() for i, nbrs in self.adj.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "FriendGraph":
+        if data.get("version") != CHECKPOINT_VERSION:
+            raise ValueError(f"unsupported checkpoint version: {data.get('version')!r}")
+        g = cls()
+        for s64, name, depth in zip(data["ids"], data["names"], data["depth"]):
+            g.node(s64, name, depth)
+        for i, nbrs in data["adj"].items():
+            g._set_friends(int(i), array('i', nbrs))
+        return g
+
+    def save(self, path: str) -> None:
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp = path + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, separators=(',', ':'))
+        os.replace(tmp, path)  # a crash mid-write leaves the previous checkpoint intact
+
+    @classmethod
+    def load(cls, path: str) -> "FriendGraph":
+        with open(path, encoding='utf-8') as f:
+            return cls.from_dict(json.load(f))
+
+    def _set_friends(self, i: int, nbrs: array) -> None:
+        self.adj[i] = nbrs
+        self.expanded[i] = 1
+        for j in nbrs:
+            self.mutual[j] += 1
+
+
+def _priority(g: FriendGraph, i: int) -> Tuple[int, int, int]:
+    return (-g.mutual[i], g.depth[i], i)
+
+
+def crawl_graph(seeds: Iterable[str], max_depth: int = 2, max_nodes: int = 500,
+                checkpoint: Optional[str] = None, checkpoint_every: int = 25,
+                max_workers: int = MAX_WORKERS,
+                fetch: Callable[[str], List[Dict]] = fetch_friends,
+                on_expand: Optional[Callable[[str, int], None]] = None) -> FriendGraph:
+    """Expand up to ``max_nodes`` profiles within ``max_depth`` hops of the seeds.
+
+    With ``checkpoint``, an existing file is resumed (its expanded profiles are not
+    fetched again and count towards ``max_nodes``) and progress is saved every
+    ``checkpoint_every`` expansions and at the end. ``on_expand(steam64, n_friends)``
+    is called as each friends list lands. A profile whose fetch fails is put back on the
+    frontier, up to ``FETCH_ATTEMPTS`` tries; it is never marked expanded, so resuming
+    from the checkpoint tries it again.
+    """
+    if checkpoint and os.path.exists(checkpoint):
+        g = FriendGraph.load(checkpoint)
+        logger.info("Resuming crawl from %s: %d profiles, %d expanded", checkpoint, len(g), len(g.adj))
+    else:
+        g = FriendGraph()
+    for s64 in seeds:
+        if is_steam64(s64):
+            g.node(s64, depth=0)
+
+    # lazy heap: a node is re-pushed when its mutual count rises; stale entries are skipped
+    heap = [_priority(g, i) for i in range(len(g)) if not g.expanded[i] and g.depth[i] <= max_depth]
+    heapq.heapify(heap)
+    since_save = 0
+    attempts: Dict[int, int] = {}
+
+    def pop_batch(n: int) -> List[int]:
+        batch: List[int] = []
+        while heap and len(batch) < n:
+            entry = heapq.heappop(heap)
+            i = entry[2]
+            if g.expanded[i] or entry != _priority(g, i) or i in batch:
+                continue
+            batch.append(i)
+        return batch
+
+    workers = max(1, max_workers)
+    with cf.ThreadPoolExecutor(max_workers=workers) as pool:
+        while len(g.adj) < max_nodes:
+            batch = pop_batch(min(workers, max_nodes - len(g.adj)))
+            if not batch:
+                break
+            futures = {pool.submit(metrics.propagate(fetch), g.steam64(i)): i for i in batch}
+            for fut in cf.as_completed(futures):
+                i = futures[fut]
+                try:
+                    friends = unique_by_steam64(fut.result())
+                except Exception as e:
+                    # not a reason to stop the crawl, nor proof of an empty friends list
+                    attempts[i] = attempts.get(i, 0) + 1
+                    if attempts[i] < FETCH_ATTEMPTS:
+                        logger.warning("Friends fetch failed for %s, will retry: %s", g.steam64(i), e)
+                        heapq.heappush(heap, _priority(g, i))
+                    else:
+                        logger.warning("Friends fetch failed for %s, skipped for this crawl: %s", g.steam64(i), e)
+                    continue
+                d = g.depth[i] + 1
+                nbrs = array('i', (g.node(f['steam64'], f.get('name') or '', d)
+                                   for f in friends if is_steam64(f.get('steam64') or '')))
+                g._set_friends(i, nbrs)
+                # every listed node's priority just changed, so re-push the ones still in range
+                for j in nbrs:
+                    if not g.expanded[j] and g.depth[j] <= max_depth:
+                        heapq.heappush(heap, _priority(g, j))
+                if on_expand is not None:
+                    on_expand(g.steam64(i), len(nbrs))
+                since_save += 1
+            if checkpoint and since_save >= checkpoint_every:
+                g.save(checkpoint)
+                since_save = 0
+
+    if checkpoint:
+        g.save(checkpoint)
+    logger.info("Crawl finished: %d profiles seen, %d expanded", len(g), len(g.adj))
+    return g
+
+
+def write_graph_csv(g: FriendGraph, path: str) -> str:
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        w = csv.writer(f)
+        w.writerow(["steam64", "name", "depth", "mutual_count", "expanded"])
+        expanded = {str(g.ids[i]) for i in g.adj}
+        for s64, name, depth, mutual in g.ranked():
+            w.writerow([s64, name, depth, mutual, int(s64 in expanded)])
+    return path
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    ap = argparse.ArgumentParser(description="Crawl friends-of-friends around a seed")
+    ap.add_argument('--seed', action='append', required=True, help='vanity or steam64; repeat for several seeds')
+    ap.add_argument('--depth', type=int, default=2)
+    ap.add_argument('--max-nodes', type=int, default=500, help='friends lists to fetch at most')
+    ap.add_argument('--checkpoint', help='JSON file to resume from and save progress to')
+    ap.add_argument('--out', default=os.path.join('output', 'friend_graph.csv'))
+    args = ap.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='[%(asctime)s] %(levelname)s: %(message)s')
+    seeds = []
+    for s in args.seed:
+        s64, err = resolve_steam64(s)
+        if not s64:
+            print(f"Could not resolve seed {s}: {err}")
+            continue
+        seeds.append(s64)
+    if not seeds:
+        return
+    g = crawl_graph(seeds, max_depth=args.depth, max_nodes=args.max_nodes, checkpoint=args.checkpoint,
+                    on_expand=lambda s64, n: print(f"  expanded {s64}: {n} friends"))
+    print(f"{len(g)} profiles, {len(g.adj)} expanded -> {write_graph_csv(g, args.out)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,188 @@
+"""Every saved run in one indexed SQLite database, for questions across runs.
+
+    python -m steam.history ingest
+    python -m steam.history appid 730 [--seed gaben]
+    python -m steam.history growth [--seed gaben] [--runs 5] [--limit 20]
+
+``ingest`` loads the run files under ``output/`` (``libraries_<ts>_seed-<slug>.csv`` /
+``.jsonl.gz`` and the Parquet dataset) into ``output/history.sqlite``, skipping files
+already imported unchanged; the query commands ingest first, so they are always current.
+Snapshots are keyed by (seed, run_ts, appid), with a second index on (appid, seed, run_ts)
+for per-game time series.
+"""
+from __future__ import annotations
+import argparse
+import logging
+import os
+import re
+import sqlite3
+import time
+from typing import Iterator, List, Optional, Tuple
+
+from .export import PARQUET_DATASET, read_results
+
+logger = logging.getLogger("steamagg.history")
+
+HISTORY_DB = os.path.join('output', 'history.sqlite')
+RUN_FILE_RE = re.compile(r"^libraries_(\d{4}-\d{2}-\d{2})_(\d{2})-(\d{2})_seed-(.+?)\.(csv|jsonl\.gz|parquet)$")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (path TEXT PRIMARY KEY, size INTEGER, mtime REAL);
+CREATE TABLE IF NOT EXISTS runs (
+    seed TEXT, run_ts TEXT, source TEXT, games INTEGER,
+    PRIMARY KEY (seed, run_ts)) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS apps (appid INTEGER PRIMARY KEY, name TEXT);
+CREATE TABLE IF NOT EXISTS snapshots (
+    seed TEXT, run_ts TEXT, appid INTEGER,
+    forever_h REAL, recent_h REAL, owners INTEGER,
+    PRIMARY KEY (seed, run_ts, appid)) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS snapshots_by_app ON snapshots (appid, seed, run_ts);
+"""
+
+
+def run_key(filename: str) -> Optional[Tuple[str, str]]:
+    """(seed slug, 'YYYY-MM-DD HH:MM') from a run file name, or None for anything else."""
+    m = RUN_FILE_RE.match(filename)
+    if not m:
+        return None
+    day, hh, mm, seed, _ = m.groups()
+    return seed, f"{day} {hh}:{mm}"
+
+
+def iter_run_files(directory: str) -> Iterator[str]:
+    for d in (directory, os.path.join(directory, PARQUET_DATASET)):
+        if os.path.isdir(d):
+            for name in sorted(os.listdir(d)):
+                if RUN_FILE_RE.match(name):
+                    yield os.path.join(d, name)
+
+
+class HistoryStore:
+    def __init__(self, path: str = HISTORY_DB):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.path = path
+        self._conn = sqlite3.connect(path)
+        self._conn.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __enter__(self) -> "HistoryStore":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def ingest(self, directory: str = 'output') -> int:
+        """Import run files that are new or changed since the last ingest; returns how many."""
+        seen = {p: (size, mtime) for p, size, mtime in self._conn.execute("SELECT path, size, mtime FROM files")}
+        imported = 0
+        for path in iter_run_files(directory):
+            st = os.stat(path)
+            if seen.get(path) == (st.st_size, st.st_mtime):
+                continue
+            seed, run_ts = run_key(os.path.basename(path))
+            with self._conn:  # one transaction per file
+                exists = self._conn.execute("SELECT source FROM runs WHERE seed = ? AND run_ts = ?",
+                                            (seed, run_ts)).fetchone()
+                # the same run saved in several formats is imported once, from whichever came first
+                if exists is None or exists[0] == path:
+                    self._import(path, seed, run_ts)
+                    imported += 1
+                self._conn.execute("INSERT OR REPLACE INTO files VALUES (?, ?, ?)", (path, st.st_size, st.st_mtime))
+        if imported:
+            logger.info("History: imported %d run file(s) into %s", imported, self.path)
+        return imported
+
+    def _import(self, path: str, seed: str, run_ts: str) -> None:
+        rows = list(read_results(path))
+        self._conn.execute("DELETE FROM snapshots WHERE seed = ? AND run_ts = ?", (seed, run_ts))
+        self._conn.executemany("INSERT OR REPLACE INTO apps VALUES (?, ?)",
+                               ((r["appid"], r["name"]) for r in rows))
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO snapshots VALUES (?, ?, ?, ?, ?, ?)",
+            ((seed, run_ts, r["appid"], r["family_playtime_forever_h"], r["family_playtime_recent_h"],
+              r["owners_count"]) for r in rows))
+        self._conn.execute("INSERT OR REPLACE INTO runs VALUES (?, ?, ?, ?)", (seed, run_ts, path, len(rows)))
+
+    def runs(self, seed: Optional[str] = None) -> List[Tuple[str, str, int]]:
+        q = "SELECT seed, run_ts, games FROM runs" + (" WHERE seed = ?" if seed else "") + " ORDER BY seed, run_ts"
+        return self._conn.execute(q, (seed,) if seed else ()).fetchall()
+
+    def appid_history(self, appid: int, seed: Optional[str] = None) -> List[Tuple]:
+        """(seed, run_ts, forever_h, recent_h, owners, delta_h) per run that has ``appid``;
+        ``delta_h`` is the change in family playtime since that seed's previous run with it."""
+        q = """
+            SELECT seed, run_ts, forever_h, recent_h, owners,
+                   ROUND(forever_h - LAG(forever_h) OVER (PARTITION BY seed ORDER BY run_ts), 1)
+            FROM snapshots WHERE appid = ?""" + (" AND seed = ?" if seed else "") + " ORDER BY seed, run_ts"
+        return self._conn.execute(q, (appid, seed) if seed else (appid,)).fetchall()
+
+    def top_growth(self, seed: Optional[str] = None, last_runs: int = 5, limit: int = 20) -> List[Tuple]:
+        """(seed, appid, name, growth_h, latest_h) for the games whose family playtime grew most
+        between the first and last of each seed's ``last_runs`` most recent runs. Seeds with a
+        single run in that window have nothing to compare and are left out."""
+        q = """
+            WITH ranked AS (
+                SELECT seed, run_ts, ROW_NUMBER() OVER (PARTITION BY seed ORDER BY run_ts DESC) AS k
+                FROM runs {where}
+            ), win AS (
+                SELECT seed, MIN(run_ts) AS first_ts, MAX(run_ts) AS last_ts FROM ranked WHERE k <= ?
+                GROUP BY seed HAVING COUNT(DISTINCT run_ts) > 1
+            )
+            SELECT s.seed, s.appid, a.name,
+                   ROUND(SUM(CASE WHEN s.run_ts = w.last_ts THEN s.forever_h ELSE 0 END)
+                       - SUM(CASE WHEN s.run_ts = w.first_ts THEN s.forever_h ELSE 0 END), 1) AS growth,
+                   SUM(CASE WHEN s.run_ts = w.last_ts THEN s.forever_h END) AS latest
+            FROM win w
+            JOIN snapshots s ON s.seed = w.seed AND s.run_ts IN (w.first_ts, w.last_ts)
+            LEFT JOIN apps a ON a.appid = s.appid
+            GROUP BY s.seed, s.appid
+            ORDER BY growth DESC, s.appid
+            LIMIT ?""".format(where="WHERE seed = ?" if seed else "")
+        params = ((seed,) if seed else ()) + (max(1, last_runs), limit)
+        return self._conn.execute(q, params).fetchall()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    ap = argparse.ArgumentParser(description="Query playtime history across saved runs")
+    ap.add_argument('--db', default=HISTORY_DB)
+    ap.add_argument('--output-dir', default='output', help='where run files are ingested from')
+    ap.add_argument('--no-ingest', action='store_true', help='query without importing new run files first')
+    sub = ap.add_subparsers(dest='command', required=True)
+    sub.add_parser('ingest', help='import new run files')
+    p = sub.add_parser('runs', help='list imported runs')
+    p.add_argument('--seed')
+    p = sub.add_parser('appid', help='family playtime of one game over time')
+    p.add_argument('appid', type=int)
+    p.add_argument('--seed')
+    p = sub.add_parser('growth', help='games with the most playtime growth over recent runs')
+    p.add_argument('--seed')
+    p.add_argument('--runs', type=int, default=5)
+    p.add_argument('--limit', type=int, default=20)
+    args = ap.parse_args(argv)
+
+    with HistoryStore(args.db) as store:
+        if args.command == 'ingest' or not args.no_ingest:
+            n = store.ingest(args.output_dir)
+            if args.command == 'ingest':
+                print(f"Imported {n} run file(s); {len(store.runs())} runs in {args.db}")
+                return
+        t0 = time.perf_counter()
+        if args.command == 'runs':
+            rows, header = store.runs(args.seed), ("seed", "run_ts", "games")
+        elif args.command == 'appid':
+            rows, header = store.appid_history(args.appid, args.seed), \
+                ("seed", "run_ts", "forever_h", "recent_h", "owners", "delta_h")
+        else:
+            rows, header = store.top_growth(args.seed, args.runs, args.limit), \
+                ("seed", "appid", "name", "growth_h", "latest_h")
+        elapsed = (time.perf_counter() - t0) * 1000
+    print("\t".join(header))
+    for r in rows:
+        print("\t".join("" if v is None else str(v) for v in r))
+    print(f"({len(rows)} rows, {elapsed:.1f} ms)")
+
+
+if __name__ == '__main__':
+    main()
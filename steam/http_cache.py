@@ -0,0 +1,110 @@
+from __future__ import annotations
+import json
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+# Per-endpoint freshness windows (seconds). Vanity -> steam64 mappings almost never
+# change, friends lists change occasionally, playtime in games XML changes often.
+TTL_VANITY = 30 * 24 * 3600
+TTL_FRIENDS = 6 * 3600
+TTL_GAMES = 30 * 60
+TTL_DEFAULT = 3600
+
+
+def ttl_for(url: str) -> float:
+    path = url.split('?', 1)[0]
+    if '/games' in path:
+        return TTL_GAMES
+    if '/friends' in path:
+        return TTL_FRIENDS
+    if '/id/' in path and 'xml=1' in url:
+        return TTL_VANITY
+    return TTL_DEFAULT
+
+
+@dataclass
+class CachedResponse:
+    url: str
+    status: int
+    body: bytes
+    headers: Dict[str, str]
+    etag: Optional[str]
+    last_modified: Optional[str]
+    fetched_at: float
+
+    def is_fresh(self, now: Optional[float] = None) -> bool:
+        return ((now or time.time()) - self.fetched_at) < ttl_for(self.url)
+
+    def to_response(self):
+        import requests
+        from requests.structures import CaseInsensitiveDict
+        from requests.utils import get_encoding_from_headers
+
+        resp = requests.Response()
+        resp.url = self.url
+        resp.status_code = self.status
+        resp._content = self.body
+        resp._content_consumed = True
+        resp.headers = CaseInsensitiveDict(self.headers)
+        resp.encoding = get_encoding_from_headers(resp.headers)
+        return resp
+
+
+class DiskCache:
+    """URL-keyed response store in SQLite, with ETag/Last-Modified for revalidation."""
+
+    def __init__(self, directory: str):
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, 'http.sqlite')
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " url TEXT PRIMARY KEY, status INTEGER, body BLOB, headers TEXT,"
+            " etag TEXT, last_modified TEXT, fetched_at REAL)"
+        )
+        self._conn.commit()
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+
+    def get(self, url: str) -> Optional[CachedResponse]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT status, body, headers, etag, last_modified, fetched_at FROM responses WHERE url = ?",
+                (url,),
+            ).fetchone()
+        if row is None:
+            return None
+        status, body, headers, etag, last_modified, fetched_at = row
+        return CachedResponse(url, status, body, json.loads(headers or '{}'), etag, last_modified, fetched_at)
+
+    def put(self, url: str, resp) -> None:
+        # keyed by the requested URL, not the post-redirect one
+        headers = {k: v for k, v in resp.headers.items() if k.lower() in ('content-type', 'etag', 'last-modified')}
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (url, resp.status_code, resp.content, json.dumps(headers),
+                 resp.headers.get('ETag'), resp.headers.get('Last-Modified'), time.time()),
+            )
+            self._conn.commit()
+
+    def touch(self, url: str) -> None:
+        with self._lock:
+            self._conn.execute("UPDATE responses SET fetched_at = ? WHERE url = ?", (time.time(), url))
+            self._conn.commit()
+
+    def purge(self) -> int:
+        with self._lock:
+            n = self._conn.execute("DELETE FROM responses").rowcount
+            self._conn.commit()
+            self._conn.execute("VACUUM")
+        return n
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "revalidated": self.revalidated, "misses": self.misses}
@@ -0,0 +1,117 @@
+from __future__ import annotations
+import concurrent.futures as cf
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger("steamagg.jobs")
+
+# per-user progress states
+QUEUED = "queued"
+CHECKING = "checking"
+FETCHING = "fetching"
+PARSED = "parsed"
+FAILED = "failed"
+EXCLUDED = "excluded"
+
+
+class Job:
+    """A background unit of work with per-user progress that request handlers can poll."""
+
+    def __init__(self, kind: str):
+        self.id = uuid.uuid4().hex[:12]
+        self.kind = kind
+        self.created = time.time()
+        self.finished: Optional[float] = None
+        self.status = "queued"  # queued -> running -> done | failed
+        self.error: Optional[str] = None
+        self.result: Any = None
+        self.users: "OrderedDict[str, str]" = OrderedDict()
+        self.messages: List[Tuple[str, str]] = []
+        self.data: Dict[str, Any] = {}  # free-form extras, e.g. a live aggregator
+        self._lock = threading.Lock()
+
+    @property
+    def done(self) -> bool:
+        return self.status in ("done", "failed")
+
+    def set_user(self, uid: str, state: str) -> None:
+        with self._lock:
+            self.users[uid] = state
+
+    def message(self, category: str, text: str) -> None:
+        with self._lock:
+            self.messages.append((category, text))
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            out: Dict[str, int] = {}
+            for state in self.users.values():
+                out[state] = out.get(state, 0) + 1
+            return out
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "id": self.id,
+                "kind": self.kind,
+                "status": self.status,
+                "error": self.error,
+                "created": self.created,
+                "finished": self.finished,
+                "users": dict(self.users),
+                "messages": list(self.messages),
+            }
+
+
+class JobManager:
+    """Runs jobs on a small thread pool and remembers the most recent ones."""
+
+    def __init__(self, max_workers: int = 4, keep: int = 50):
+        self._pool = cf.ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._keep = keep
+        self._lock = threading.Lock()
+
+    def submit(self, kind: str, fn: Callable[..., Any], *args, **kwargs) -> Job:
+        """Run ``fn(job, *args, **kwargs)`` in the background; its return value becomes ``job.result``."""
+        job = Job(kind)
+        with self._lock:
+            self._jobs[job.id] = job
+            while len(self._jobs) > self._keep:
+                self._jobs.popitem(last=False)
+        self._pool.submit(self._run, job, fn, args, kwargs)
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def jobs(self, kind: Optional[str] = None) -> List[Job]:
+        """Jobs still held, oldest first, optionally of one kind."""
+        with self._lock:
+            return [j for j in self._jobs.values() if kind is None or j.kind == kind]
+
+    def latest(self, kind: Optional[str] = None, status: Optional[str] = None) -> Optional[Job]:
+        """Most recently submitted job, optionally of one kind and/or status."""
+        with self._lock:
+            jobs = list(self._jobs.values())
+        for job in reversed(jobs):
+            if (kind is None or job.kind == kind) and (status is None or job.status == status):
+                return job
+        return None
+
+    def _run(self, job: Job, fn, args, kwargs) -> None:
+        job.status = "running"
+        try:
+            job.result = fn(job, *args, **kwargs)
+            job.status = "done"
+        except Exception as e:
+            logger.exception("Job %s (%s) failed: %s", job.id, job.kind, e)
+            job.error = str(e) or type(e).__name__
+            job.status = "failed"
+        finally:
+            job.finished = time.time()
@@ -0,0 +1,301 @@
+"""Append-only run journals, so an interrupted run can pick up where it stopped.
+
+Each run writes ``output/runs/<run_id>.jsonl``: a ``meta`` line first, then one line per
+completed step (resolved vanity, candidate list, access result, parsed library, failure)
+and a ``done`` line with the CSV path. Lines are flushed as they are written, so a
+killed process loses at most the step in flight; a torn last line is ignored on load.
+
+Next to each journal, ``<run_id>.summary.json`` holds its meta, counts and status, kept
+current as the run goes, so listing runs never reads the journals themselves. Only the
+newest ``KEEP_RUNS`` finished or dismissed runs are kept; older ones are pruned when a
+new run starts.
+"""
+from __future__ import annotations
+import json
+import logging
+import os
+import threading
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional, Set, Tuple
+
+from .records import Library
+
+logger = logging.getLogger("steamagg.journal")
+
+JOURNAL_DIR = os.path.join('output', 'runs')
+LIBRARY_PREFIX = '{"t":"library","steam64":"'
+SUMMARY_SUFFIX = '.summary.json'
+KEEP_RUNS = 50  # finished/dismissed runs kept; interrupted ones stay until resumed or dismissed
+
+
+@dataclass
+class RunState:
+    """Everything a journal says was already done."""
+    run_id: str
+    meta: Dict = field(default_factory=dict)
+    resolved: Dict[str, str] = field(default_factory=dict)   # input name -> steam64
+    candidates: Optional[List[Dict]] = None
+    access: Dict[str, bool] = field(default_factory=dict)
+    libraries: Dict[str, Library] = field(default_factory=dict)
+    failed: Dict[str, str] = field(default_factory=dict)
+    csv_path: Optional[str] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.csv_path is not None
+
+
+class _Summary:
+    """Running status of one journal, as written to its summary file."""
+
+    def __init__(self):
+        self.meta: Dict = {}
+        self.libraries: Set[str] = set()
+        self.failed: Set[str] = set()
+        self.done = False
+        self.dismissed = False
+
+    def add_line(self, line: str) -> bool:
+        """Account for one journal line; False when it changes nothing in the summary."""
+        # records start with their kind and steam64, so library lines need no decoding
+        if line.startswith(LIBRARY_PREFIX):
+            s64 = line[len(LIBRARY_PREFIX):].split('"', 1)[0]
+            self.libraries.add(s64)
+            self.failed.discard(s64)
+        elif line.startswith('{"t":"failed"'):
+            self.failed.add(json.loads(line)['steam64'])
+        elif line.startswith('{"t":"meta"'):
+            self.meta = {k: v for k, v in json.loads(line).items() if k != 't'}
+        elif line.startswith('{"t":"done"'):
+            self.done = True
+        else:
+            return False
+        return True
+
+    def to_dict(self, run_id: str) -> Dict:
+        return {"run_id": run_id, "meta": self.meta, "libraries": len(self.libraries),
+                "failed": len(self.failed), "finished": self.done and not self.failed,
+                "dismissed": self.dismissed}
+
+
+def _scan(path: str) -> _Summary:
+    summary = _Summary()
+    with open(path, encoding='utf-8') as f:
+        for n, line in enumerate(f, 1):
+            try:
+                summary.add_line(line)
+            except (ValueError, KeyError):
+                logger.warning("%s:%d: skipping unreadable journal line", path, n)
+    return summary
+
+
+def summary_path(path: str) -> str:
+    return os.path.splitext(path)[0] + SUMMARY_SUFFIX
+
+
+def _write_summary(path: str, data: Dict) -> None:
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(tmp, path)  # readers see the old summary or the new one, never half of it
+
+
+class RunJournal:
+    def __init__(self, path: str):
+        self.path = path
+        self.run_id = os.path.splitext(os.path.basename(path))[0]
+        self._lock = threading.Lock()
+        torn = False
+        self._summary = _Summary()
+        if os.path.exists(path) and os.path.getsize(path):
+            with open(path, 'rb') as f:
+                f.seek(-1, os.SEEK_END)
+                torn = f.read(1) != b'\n'
+            self._summary = _scan(path)  # resuming: the counts need the steam64s seen so far
+        self._f = open(path, 'a', encoding='utf-8')
+        if torn:
+            self._f.write('\n')  # don't glue new records onto a killed run's half-written line
+
+    def record(self, kind: str, **fields) -> None:
+        line = json.dumps(dict(t=kind, **fields), separators=(',', ':'), ensure_ascii=False)
+        with self._lock:
+            self._f.write(line + '\n')
+            self._f.flush()
+            if self._summary.add_line(line):
+                _write_summary(summary_path(self.path), self._summary.to_dict(self.run_id))
+
+    def resolved(self, name: str, steam64: str) -> None:
+        self.record('resolved', name=name, steam64=steam64)
+
+    def candidates(self, rows: List[Dict]) -> None:
+        self.record('candidates', rows=rows)
+
+    def access(self, steam64: str, ok: bool) -> None:
+        self.record('access', steam64=steam64, ok=bool(ok))
+
+    def library(self, steam64: str, lib: Library) -> None:
+        self.record('library', steam64=steam64, appids=lib.appids.tolist(), names=lib.names,
+                    forever=lib.forever.tolist(), recent=lib.recent.tolist())
+
+    def failed(self, steam64: str, error: str) -> None:
+        self.record('failed', steam64=steam64, error=error)
+
+    def done(self, csv_path: str) -> None:
+        self.record('done', csv_path=csv_path)
+
+    def close(self) -> None:
+        with self._lock:
+            self._f.close()
+
+    def __enter__(self) -> "RunJournal":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def new_run_id() -> str:
+    return f"{datetime.now().strftime('%Y-%m-%d_%H-%M-%S')}_{uuid.uuid4().hex[:6]}"
+
+
+def journal_path(run: str, directory: str = JOURNAL_DIR) -> str:
+    """Path of a journal given its run ID or a path to it."""
+    if run.endswith('.jsonl') or os.sep in run:
+        return run
+    return os.path.join(directory, f"{run}.jsonl")
+
+
+def load_journal(path: str) -> RunState:
+    state = RunState(run_id=os.path.splitext(os.path.basename(path))[0])
+    with open(path, encoding='utf-8') as f:
+        for n, line in enumerate(f, 1):
+            try:
+                rec = json.loads(line)
+            except ValueError:
+                logger.warning("%s:%d: skipping unreadable journal line", path, n)
+                continue
+            kind = rec.get('t')
+            if kind == 'meta':
+                state.meta = {k: v for k, v in rec.items() if k != 't'}
+            elif kind == 'resolved':
+                state.resolved[rec['name']] = rec['steam64']
+            elif kind == 'candidates':
+                state.candidates = rec['rows']
+            elif kind == 'access':
+                state.access[rec['steam64']] = rec['ok']
+            elif kind == 'library':
+                lib = Library()
+                for row in zip(rec['appids'], rec['names'], rec['forever'], rec['recent']):
+                    lib.append(*row)
+                state.libraries[rec['steam64']] = lib
+                state.failed.pop(rec['steam64'], None)
+            elif kind == 'failed':
+                state.failed[rec['steam64']] = rec['error']
+            elif kind == 'done':
+                state.csv_path = rec['csv_path']
+    return state
+
+
+def open_journal(run: Optional[str] = None, directory: str = JOURNAL_DIR, **meta) -> Tuple[RunJournal, RunState]:
+    """Resume ``run`` (an ID or path) or, without one, start a new journal recording ``meta``."""
+    if run:
+        path = journal_path(run, directory)
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"no run journal at {path}")
+        state = load_journal(path)
+        logger.info("Resuming run %s: %d libraries, %d access results already done",
+                    state.run_id, len(state.libraries), len(state.access))
+        return RunJournal(path), state
+    os.makedirs(directory, exist_ok=True)
+    try:
+        prune_runs(directory)
+    except OSError as e:
+        logger.warning("Could not prune old journals: %s", e)
+    journal = RunJournal(journal_path(new_run_id(), directory))
+    journal.record('meta', **meta)
+    return journal, RunState(run_id=journal.run_id, meta=meta)
+
+
+def _read_summary(path: str) -> Dict:
+    """The summary of the journal at ``path``, building it once for journals that have none."""
+    side = summary_path(path)
+    try:
+        with open(side, encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        pass
+    except ValueError as e:
+        logger.warning("Rebuilding unreadable summary %s: %s", side, e)
+    data = _scan(path).to_dict(os.path.splitext(os.path.basename(path))[0])
+    _write_summary(side, data)
+    return data
+
+
+def _id_path(run_id: str, directory: str) -> Optional[str]:
+    # run IDs come from URLs; never let one point outside ``directory``
+    if not run_id or os.path.basename(run_id) != run_id or run_id.startswith('.'):
+        return None
+    return os.path.join(directory, f"{run_id}.jsonl")
+
+
+def run_summary(run_id: str, directory: str = JOURNAL_DIR) -> Optional[Dict]:
+    path = _id_path(run_id, directory)
+    if path is None or not os.path.exists(path):
+        return None
+    try:
+        return _read_summary(path)
+    except OSError as e:
+        logger.warning("Could not read journal %s: %s", path, e)
+        return None
+
+
+def list_runs(directory: str = JOURNAL_DIR, finished: Optional[bool] = None,
+              limit: Optional[int] = None) -> List[Dict]:
+    """Summaries of the journals in ``directory``, newest first, from their summary files.
+
+    A run counts as finished once it wrote its CSV with no library still failed. With
+    ``finished=False`` only interrupted runs that were not dismissed are listed; with
+    ``finished=True``, the finished and dismissed ones.
+    """
+    if not os.path.isdir(directory):
+        return []
+    runs = []
+    for name in sorted(os.listdir(directory), reverse=True):
+        if not name.endswith('.jsonl'):
+            continue
+        try:
+            run = _read_summary(os.path.join(directory, name))
+        except OSError as e:
+            logger.warning("Could not read journal %s: %s", name, e)
+            continue
+        if finished is not None and (run["finished"] or run.get("dismissed")) != finished:
+            continue
+        runs.append(run)
+        if limit is not None and len(runs) >= limit:
+            break
+    return runs
+
+
+def dismiss_run(run_id: str, directory: str = JOURNAL_DIR) -> bool:
+    """Stop offering an interrupted run for resuming; it is pruned like a finished one."""
+    data = run_summary(run_id, directory)
+    if data is None:
+        return False
+    data["dismissed"] = True
+    _write_summary(summary_path(_id_path(run_id, directory)), data)
+    return True
+
+
+def prune_runs(directory: str = JOURNAL_DIR, keep: int = KEEP_RUNS) -> int:
+    """Delete finished and dismissed runs beyond the newest ``keep``; returns how many went."""
+    closed = list_runs(directory, finished=True)
+    for run in closed[keep:]:
+        path = os.path.join(directory, f"{run['run_id']}.jsonl")
+        for p in (path, summary_path(path)):
+            try:
+                os.remove(p)
+            except FileNotFoundError:
+                pass
+    return max(0, len(closed) - keep)
@@ -0,0 +1,208 @@
+"""Low-overhead counters, histograms and stage timers, process-wide and per run.
+
+    with run_metrics() as rm:          # everything recorded below also lands in rm
+        with stage("fetch_libraries"):
+            ...
+    rm.snapshot()                      # JSON-able dict; METRICS holds the process totals
+
+Recording is a dict lookup, a ``bisect`` into fixed bucket bounds and a few additions
+under one lock, so it stays on in production. The current run travels in a context
+variable; worker pools pick it up by submitting ``propagate(fn)`` instead of ``fn``.
+"""
+from __future__ import annotations
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, Optional, Tuple
+
+# seconds: 0.5 ms .. ~65 s; bytes: 1 KiB .. 64 MiB (both doubling)
+TIME_BOUNDS: Tuple[float, ...] = tuple(0.0005 * 2 ** i for i in range(18))
+BYTE_BOUNDS: Tuple[float, ...] = tuple(1024.0 * 2 ** i for i in range(17))
+
+
+class Histogram:
+    __slots__ = ('bounds', 'counts', 'count', 'total', 'min', 'max')
+
+    def __init__(self, bounds: Tuple[float, ...] = TIME_BOUNDS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # last bucket is +Inf
+        self.count = 0
+        self.total = 0.0
+        self.min = float('inf')
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, p: float) -> float:
+        """Upper bound of the bucket holding the p-th percentile (capped at the observed max)."""
+        if not self.count:
+            return 0.0
+        rank = p / 100.0 * self.count
+        seen = 0
+        for i, c in enumerate(self.counts):
+            seen += c
+            if seen >= rank and c:
+                return min(self.bounds[i], self.max) if i < len(self.bounds) else self.max
+        return self.max
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "sum": round(self.total, 6),
+            "min": round(self.min, 6) if self.count else 0.0,
+            "max": round(self.max, 6),
+            "mean": round(self.total / self.count, 6) if self.count else 0.0,
+            "p50": round(self.percentile(50), 6),
+            "p90": round(self.percentile(90), 6),
+            "p99": round(self.percentile(99), 6),
+            "buckets": {f"{b:g}": c for b, c in zip(self.bounds + (float('inf'),), self.counts) if c},
+        }
+
+
+class Metrics:
+    def __init__(self):
+        self.started = time.time()
+        self._lock = threading.Lock()
+        self.counters: Dict[str, float] = {}
+        self.histograms: Dict[str, Histogram] = {}
+        self.stages: Dict[str, float] = {}
+
+    def incr(self, name: str, n: float = 1) -> None:
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def observe(self, name: str, value: float, bounds: Tuple[float, ...] = TIME_BOUNDS) -> None:
+        with self._lock:
+            h = self.histograms.get(name)
+            if h is None:
+                h = self.histograms[name] = Histogram(bounds)
+            h.observe(value)
+
+    def add_stage(self, name: str, seconds: float) -> None:
+        with self._lock:
+            self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "started": self.started,
+                "elapsed_s": round(time.time() - self.started, 3),
+                "stages_s": {k: round(v, 4) for k, v in self.stages.items()},
+                "counters": dict(sorted(self.counters.items())),
+                "histograms": {k: h.to_dict() for k, h in sorted(self.histograms.items())},
+            }
+
+    def to_prometheus(self, prefix: str = "steamagg") -> str:
+        """Prometheus text exposition of the counters, stage totals and histograms."""
+        def metric(name: str) -> str:
+            return prefix + "_" + "".join(c if c.isalnum() else "_" for c in name)
+
+        lines = []
+        with self._lock:
+            for name, v in sorted(self.counters.items()):
+                lines.append(f"{metric(name)}_total {v:g}")
+            for name, v in sorted(self.stages.items()):
+                lines.append(f'{prefix}_stage_seconds_total{{stage="{name}"}} {v:.6f}')
+            for name, h in sorted(self.histograms.items()):
+                m, cumulative = metric(name), 0
+                lines.append(f"# TYPE {m} histogram")
+                for b, c in zip(h.bounds + (float('inf'),), h.counts):
+                    cumulative += c
+                    lines.append(f'{m}_bucket{{le="{"+Inf" if b == float("inf") else f"{b:g}"}"}} {cumulative}')
+                lines.append(f"{m}_sum {h.total:.6f}")
+                lines.append(f"{m}_count {h.count}")
+        return "\n".join(lines) + "\n"
+
+
+# Process-wide totals (served at /metrics) and the run being recorded in this context, if any.
+METRICS = Metrics()
+_current_run: contextvars.ContextVar[Optional[Metrics]] = contextvars.ContextVar('steamagg_run', default=None)
+
+
+def incr(name: str, n: float = 1) -> None:
+    METRICS.incr(name, n)
+    run = _current_run.get()
+    if run is not None:
+        run.incr(name, n)
+
+
+def observe(name: str, value: float, bounds: Tuple[float, ...] = TIME_BOUNDS) -> None:
+    METRICS.observe(name, value, bounds)
+    run = _current_run.get()
+    if run is not None:
+        run.observe(name, value, bounds)
+
+
+@contextmanager
+def timed(name: str) -> Iterator[None]:
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(name, time.perf_counter() - t0)
+
+
+def timed_fn(name: str) -> Callable:
+    """Decorator form of ``timed``."""
+    def wrap(fn):
+        @functools.wraps(fn)
+        def inner(*args, **kwargs):
+            with timed(name):
+                return fn(*args, **kwargs)
+        return inner
+    return wrap
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Time a run stage: its total goes to ``stages_s`` (the run's and the process-wide one)
+    and each pass to ``stage.<name>_s``."""
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        dt = time.perf_counter() - t0
+        observe(f"stage.{name}_s", dt)
+        METRICS.add_stage(name, dt)
+        run = _current_run.get()
+        if run is not None:
+            run.add_stage(name, dt)
+
+
+@contextmanager
+def run_metrics() -> Iterator[Metrics]:
+    m = Metrics()
+    token = _current_run.set(m)
+    try:
+        yield m
+    finally:
+        _current_run.reset(token)
+
+
+def propagate(fn: Callable) -> Callable:
+    """``fn`` bound to the caller's context, so a pool worker records into the caller's run."""
+    return functools.partial(contextvars.copy_context().run, fn)
+
+
+def metrics_path(csv_path: str) -> str:
+    """``<run>_metrics.json`` next to a run's CSV."""
+    root, _ = os.path.splitext(csv_path)
+    return f"{root}_metrics.json"
+
+
+def write_json(m: Metrics, path: str) -> str:
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(m.snapshot(), f, indent=2)
+    return path
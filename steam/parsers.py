@@ -1,11 +1,17 @@
 from __future__ import annotations
-from lxml import etree, html
-from typing import List, Tuple
+from lxml import etree
+from typing import Iterable, Iterator, Optional, Tuple, Union
 import re
 
+from . import metrics
+from .records import Library
+
 HOURS_RE = re.compile(r"([0-9]+(?:[\.,][0-9]+)?)")
+PAGE_PARAM_RE = re.compile(r"[?&]p=([0-9]+)")
+PROFILE_RE = re.compile(r"/profiles/([0-9]{17})")
 
 
+@metrics.timed_fn("parse.vanity_s")
 def parse_steam64_from_vanity_xml(xml_bytes: bytes) -> Tuple[str|None, str|None]:
     try:
         root = etree.fromstring(xml_bytes)
@@ -17,37 +23,68 @@ def parse_steam64_from_vanity_xml(xml_bytes: bytes) -> Tuple[str|None, str|None]
         return None, f"XML parse error: {e}"
 
 
+@metrics.timed_fn("parse.friends_s")
 def parse_friends(html_bytes: bytes) -> list[dict]:
-    from lxml import html
-    import re
+    return _parse_friends_html(html_bytes)[0]
+
+
+@metrics.timed_fn("parse.friends_s")
+def parse_friends_page(html_bytes: bytes) -> Tuple[list[dict], int|None]:
+    """Friends on one page plus the highest ``p=N`` pagination link, from a single parse.
+
+    The page hint is None when the markup has no pager (the ajax pages usually don't).
+    """
+    return _parse_friends_html(html_bytes)
+
+
+# compiled once; evaluated on a plain etree document rather than an lxml.html one
+_FRIEND_ELS = etree.XPath('//*[@data-steamid]')
+_FIRST_TEXT = etree.XPath('(.//text()[normalize-space()])[1]')
+_PAGER_HREFS = etree.XPath('//a[contains(@href, "p=")]/@href')
+_PROFILE_LINKS = etree.XPath('//a[contains(@href, "/profiles/") or contains(@href, "/id/")]')
+_STRING = etree.XPath('string()')
+
+
+def _friend_name(el) -> str:
+    text = (el.text or '').strip()
+    if text:
+        return text
+    # first non-blank text node below, found by libxml2 instead of walking text() in Python
+    found = _FIRST_TEXT(el)
+    text = found[0].strip() if found else ''
+    if text or not found:
+        return text
+    # XPath and str.strip() disagree on blanks such as U+00A0; settle it the slow way
+    return next((t.strip() for t in el.itertext() if t.strip()), '')
+
 
-    doc = html.fromstring(html_bytes)
-    out: list[dict] = []
+def _parse_friends_html(html_bytes: bytes) -> Tuple[list[dict], int|None]:
+    if not html_bytes or not html_bytes.strip():
+        raise etree.ParserError("Document is empty")
+    doc = etree.HTML(html_bytes)
+    last = None
+    for href in _PAGER_HREFS(doc):
+        m = PAGE_PARAM_RE.search(href)
+        if m:
+            last = max(last or 0, int(m.group(1)))
 
-    # Any element with data-steamid
-    for el in doc.xpath('//*[@data-steamid]'):
+    out = []
+    for el in _FRIEND_ELS(doc):
         s64 = el.get('data-steamid')
-        if not s64:
-            continue
-        text = (el.text or '').strip()
-        if not text:
-            texts = [t.strip() for t in el.xpath('.//text()') if t.strip()]
-            text = texts[0] if texts else s64
-        out.append({"steam64": s64, "name": text})
+        if s64:
+            out.append({"steam64": s64, "name": _friend_name(el) or s64})
 
-    # Fallback: links that look like profile URLs
+    # Fallback: links that look like profile URLs, only looked at when nothing carries data-steamid
     if not out:
-        for a in doc.xpath('//a[contains(@href, "/profiles/") or contains(@href, "/id/")]'):
+        for a in _PROFILE_LINKS(doc):
             s64 = a.get('data-steamid') or ''
             if not s64:
-                href = a.get('href') or ''
-                m = re.search(r"/profiles/([0-9]{17})", href)
+                m = PROFILE_RE.search(a.get('href') or '')
                 if m:
                     s64 = m.group(1)
             if s64:
-                name = (a.text_content() or '').strip() or s64
-                out.append({"steam64": s64, "name": name})
-    return out
+                out.append({"steam64": s64, "name": _STRING(a).strip() or s64})
+    return out, last
 
 
 def parse_hours(text: str|None) -> float:
@@ -66,20 +103,118 @@ def parse_hours(text: str|None) -> float:
         return 0.0
 
 
-def parse_library_xml(xml_bytes: bytes) -> list[dict]:
-    out = []
-    root = etree.fromstring(xml_bytes)
-    # Be flexible: some profiles nest differently; just find any <game> nodes
-    for g in root.findall('.//game'):
+class LibraryUnavailable(ValueError):
+    """The games XML is an error document (private profile, unknown user, ...)."""
+
+
+def _is_error_doc(el) -> bool:
+    # Steam answers private/unknown profiles with 200 and <gamesList><error>...</error>
+    parent = el.getparent()
+    return el.tag == 'error' and parent is not None and parent.getparent() is None
+
+
+def _iter_games(source: Union[bytes, Iterable[bytes]]) -> Iterator[Tuple[str, str, float, float]]:
+    parser = etree.XMLPullParser(events=('end',), tag=('game', 'error'))
+    chunks = (source,) if isinstance(source, (bytes, bytearray)) else source
+    for chunk in chunks:
+        if not chunk:
+            continue
+        parser.feed(chunk)
+        yield from _drain_games(parser)
+    parser.close()
+    yield from _drain_games(parser)
+
+
+def _drain_games(parser) -> Iterator[Tuple[str, str, float, float]]:
+    for _event, g in parser.read_events():
+        if g.tag == 'error':
+            if _is_error_doc(g):
+                raise LibraryUnavailable((g.text or '').strip() or "error document")
+            continue
+        parent = g.getparent()
+        if parent is None:
+            continue  # the root itself is never a match for './/game'
         appid = (g.findtext('appID') or '').strip()
         name = (g.findtext('name') or '').strip()
         hours_all = parse_hours(g.findtext('hoursOnRecord'))
         hours_recent = parse_hours(g.findtext('hoursLast2Weeks'))
+        # drop the finished element and the <game> siblings already processed
+        g.clear()
+        prev = g.getprevious()
+        while prev is not None and prev.tag == 'game':
+            parent.remove(prev)
+            prev = g.getprevious()
         if appid:
-            out.append({
-                "appid": appid,
-                "name": name,
-                "hoursOnRecord": hours_all,
-                "hoursLast2Weeks": hours_recent,
-            })
-    return out
\ No newline at end of file
+            yield appid, name, hours_all, hours_recent
+
+
+class LibraryProbe:
+    """Incremental form of ``probe_library_xml``, for bodies that arrive asynchronously:
+    ``feed()`` chunks until one returns an answer, or ``close()`` at the end of the body."""
+
+    def __init__(self):
+        self._parser = etree.XMLPullParser(events=('start', 'end'), tag=('game', 'error'))
+
+    def feed(self, chunk: bytes) -> Optional[bool]:
+        if not chunk:
+            return None
+        try:
+            self._parser.feed(chunk)
+            for event, el in self._parser.read_events():
+                if event == 'end' and el.tag == 'game' and el.getparent() is not None:
+                    return True
+                if event == 'start' and _is_error_doc(el):
+                    return False
+        except etree.XMLSyntaxError:
+            return False
+        return None
+
+    def close(self) -> bool:
+        try:
+            self._parser.close()
+            for _event, el in self._parser.read_events():
+                if _is_error_doc(el):
+                    return False
+        except etree.XMLSyntaxError:
+            return False
+        return True  # well-formed and no error: accessible even with zero games
+
+
+def probe_library_xml(source: Union[bytes, Iterable[bytes]]) -> bool:
+    """Decide library access with the same answer as fully parsing it, reading only
+    as far as needed: the first complete <game> means accessible, a top-level <error>
+    means not.
+
+    Consumes ``source`` lazily, so a chunk iterator stops early. Malformed XML is
+    inaccessible (a document that turns malformed after its first <game> is not detected).
+    """
+    probe = LibraryProbe()
+    for chunk in (source,) if isinstance(source, (bytes, bytearray)) else source:
+        answer = probe.feed(chunk)
+        if answer is not None:
+            return answer
+    return probe.close()
+
+
+def iter_library_xml(source: Union[bytes, Iterable[bytes]]) -> Iterator[dict]:
+    """Yield game rows incrementally from games XML bytes or an iterable of byte chunks
+    (e.g. ``resp.iter_content()``), clearing each <game> once it has been read."""
+    for appid, name, hours_all, hours_recent in _iter_games(source):
+        yield {
+            "appid": appid,
+            "name": name,
+            "hoursOnRecord": hours_all,
+            "hoursLast2Weeks": hours_recent,
+        }
+
+
+# streamed sources are parsed as they download, so this includes reading the body
+@metrics.timed_fn("parse.library_s")
+def parse_library_columns(source: Union[bytes, Iterable[bytes]]) -> Library:
+    return Library.from_rows(_iter_games(source))
+
+
+@metrics.timed_fn("parse.library_s")
+def parse_library_xml(xml_bytes: Union[bytes, Iterable[bytes]]) -> list[dict]:
+    # Be flexible: some profiles nest differently; just find any <game> nodes
+    return list(iter_library_xml(xml_bytes))
@@ -2,7 +2,16 @@ from __future__ import annotations
 import threading
 import time
 import random
-from typing import Callable
+from email.utils import parsedate_to_datetime
+from typing import Callable, Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+from . import metrics
+
+MAX_RETRY_AFTER = 300.0
+# first backoff pause in seconds, doubling per retry up to 60 (the benchmarks shrink it)
+BACKOFF_BASE = 1.0
+
 
 class HostGate:
     def __init__(self, base_delay: float = 0.8):
@@ -10,25 +19,208 @@ class HostGate:
         self._lock = threading.Lock()
         self._next_time = 0.0
 
-    def wait(self):
+    def wait(self, url: Optional[str] = None) -> float:
         with self._lock:
             now = time.time()
-            if now < self._next_time:
-                time.sleep(self._next_time - now)
+            delay = max(0.0, self._next_time - now)
+            if delay:
+                time.sleep(delay)
             # schedule next
             jitter = random.uniform(0.05, 0.2)
             self._next_time = time.time() + self.base_delay + jitter
+        metrics.observe(f"gate.wait_s.{endpoint_class(url)}", delay)
+        return delay
+
+    # fixed pacing: same interface as AdaptiveGate, nothing to adapt or report
+    def feedback(self, url: Optional[str], status: int, retry_after: Optional[float] = None):
+        pass
+
+    def record_backoff(self, url: Optional[str], seconds: float):
+        pass
+
+    def stats(self) -> Dict[str, dict]:
+        return {}
+
+
+def endpoint_class(url: Optional[str]) -> str:
+    """Group URLs whose throttling behaves alike: games XML, friends HTML, profile/vanity XML, store JSON."""
+    path = urlsplit(url or '').path
+    if path.startswith(('/api/appdetails', '/appreviews/', '/ISteamNews/')):
+        return 'store'
+    if '/games' in path:
+        return 'games'
+    if '/friends' in path:
+        return 'friends'
+    if path.startswith('/id/') or path.startswith('/profiles/'):
+        return 'profile'
+    return 'other'
+
+
+class _Lane:
+    __slots__ = ('rate', 'next_time', 'streak', 'requests', 'throttles', 'waited', 'backoff')
+
+    def __init__(self, rate: float):
+        self.rate = rate
+        self.next_time = 0.0
+        self.streak = 0
+        self.requests = 0
+        self.throttles = 0
+        self.waited = 0.0
+        self.backoff = 0.0
+
+
+class _Host(_Lane):
+    __slots__ = ('paused_until',)
+
+    def __init__(self, rate: float):
+        super().__init__(rate)
+        self.paused_until = 0.0
+
+
+class AdaptiveGate:
+    """AIMD request pacing per host, split further per endpoint class.
+
+    Every host has one budget that all of its endpoint classes draw from, so the
+    combined rate to a host never exceeds its own AIMD rate (at most ``max_rate``);
+    each (host, endpoint class) lane adapts as well, so a throttled class slows down
+    without waiting for the others. Both start at ``1 / base_delay`` requests per
+    second. Every ``healthy_after`` clean responses in a row add ``increase`` req/s (up
+    to ``max_rate``); a 429/503 multiplies the lane's and the host's rate by
+    ``decrease`` (down to ``min_rate``) and a ``Retry-After`` pauses the whole host until
+    it has passed. Slots are reserved under the lock and slept outside it.
+    """
+
+    def __init__(self, base_delay: float = 0.8, min_rate: float = 0.1, max_rate: float = 2.0,
+                 increase: float = 0.1, decrease: float = 0.5, healthy_after: int = 10,
+                 jitter: Tuple[float, float] = (0.05, 0.2)):
+        self.initial_rate = 1.0 / base_delay
+        self.min_rate = min_rate
+        self.max_rate = max(max_rate, min_rate)
+        self.increase = increase
+        self.decrease = decrease
+        self.healthy_after = healthy_after
+        self.jitter = jitter
+        self._lock = threading.Lock()
+        self._lanes: Dict[Tuple[str, str], _Lane] = {}
+        self._hosts: Dict[str, _Host] = {}
+
+    def _lane(self, url: Optional[str]) -> Tuple[_Host, _Lane]:
+        host = urlsplit(url or '').netloc
+        key = (host, endpoint_class(url))
+        lane = self._lanes.get(key)
+        if lane is None:
+            lane = self._lanes[key] = _Lane(min(self.initial_rate, self.max_rate))
+        budget = self._hosts.get(host)
+        if budget is None:
+            budget = self._hosts[host] = _Host(min(self.initial_rate, self.max_rate))
+        return budget, lane
+
+    def wait(self, url: Optional[str] = None) -> float:
+        with self._lock:
+            host, lane = self._lane(url)
+            now = time.monotonic()
+            start = max(now, lane.next_time, host.next_time, host.paused_until)
+            jitter = random.uniform(*self.jitter)
+            # max_rate may have been lowered since these rates were reached
+            lane.next_time = start + 1.0 / min(lane.rate, self.max_rate) + jitter
+            host.next_time = start + 1.0 / min(host.rate, self.max_rate) + jitter
+            delay = start - now
+            for budget in (lane, host):
+                budget.requests += 1
+                budget.waited += delay
+        metrics.observe(f"gate.wait_s.{endpoint_class(url)}", delay)
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+    def feedback(self, url: Optional[str], status: int, retry_after: Optional[float] = None) -> None:
+        with self._lock:
+            host, lane = self._lane(url)
+            if status in (429, 503):
+                metrics.incr(f"gate.throttles.{endpoint_class(url)}")
+                for budget in (lane, host):
+                    budget.throttles += 1
+                    budget.streak = 0
+                    budget.rate = max(self.min_rate, budget.rate * self.decrease)
+                if retry_after:
+                    until = time.monotonic() + min(retry_after, MAX_RETRY_AFTER)
+                    host.paused_until = max(host.paused_until, until)
+            elif status >= 500:
+                lane.streak = host.streak = 0
+            else:
+                for budget in (lane, host):
+                    budget.streak += 1
+                    if budget.streak >= self.healthy_after:
+                        budget.streak = 0
+                        budget.rate = min(self.max_rate, budget.rate + self.increase)
+
+    def record_backoff(self, url: Optional[str], seconds: float) -> None:
+        with self._lock:
+            for budget in self._lane(url):
+                budget.backoff += seconds
+
+    def stats(self) -> Dict[str, dict]:
+        """Per lane, plus one ``"<host> *"`` entry per host for the budget its lanes share."""
+        with self._lock:
+            budgets = [((host, klass), lane) for (host, klass), lane in self._lanes.items()]
+            budgets += [((host, '*'), budget) for host, budget in self._hosts.items()]
+            return {
+                f"{host or '-'} {klass}": {
+                    "rate_per_s": round(min(budget.rate, self.max_rate), 3),
+                    "requests": budget.requests,
+                    "throttle_events": budget.throttles,
+                    "gate_wait_s": round(budget.waited, 3),
+                    "backoff_wait_s": round(budget.backoff, 3),
+                }
+                for (host, klass), budget in budgets
+            }
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds from a Retry-After header (delta-seconds or HTTP date), or None."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+def retry_pause(headers, delay: float) -> float:
+    """Seconds to wait before retrying a 429/5xx answer carrying ``headers``, and record it.
+
+    The server's own Retry-After hint wins over our exponential guess ``delay``.
+    Shared by the threaded and the asyncio client so both back off alike.
+    """
+    retry_after = parse_retry_after(headers.get('Retry-After'))
+    pause = min(retry_after, MAX_RETRY_AFTER) if retry_after is not None else delay + random.uniform(0, BACKOFF_BASE / 2)
+    metrics.incr("http.retries")
+    metrics.observe("http.backoff_s", pause)
+    return pause
 
 
-def backoff_request(fn: Callable[[], 'requests.Response'], max_retries: int = 5):
-    delay = 1.0
+def backoff_request(fn: Callable[[], 'requests.Response'], max_retries: int = 5,
+                    on_sleep: Optional[Callable[[float], None]] = None):
+    delay = BACKOFF_BASE
     for attempt in range(max_retries):
         resp = fn()
         if resp.status_code < 400 or resp.status_code == 404:
             return resp
-        if resp.status_code in (429, 500, 502, 503, 504):
-            time.sleep(delay + random.uniform(0, 0.5))
+        if resp.status_code in RETRY_STATUSES:
+            pause = retry_pause(resp.headers, delay)
+            resp.close()  # release a streamed connection before retrying
+            if on_sleep is not None:
+                on_sleep(pause)
+            time.sleep(pause)
             delay = min(delay * 2, 60)
             continue
         return resp
-    return resp
\ No newline at end of file
+    return resp
@@ -0,0 +1,94 @@
+from __future__ import annotations
+import sys
+from array import array
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+
+class Library(Sequence):
+    """One user's games stored column-wise: int appids, interned names, float hours.
+
+    Indexing or iterating yields the legacy row dicts
+    (``{"appid", "name", "hoursOnRecord", "hoursLast2Weeks"}``) as a compatibility view;
+    hot paths read the columns directly via ``columns()``.
+    """
+
+    __slots__ = ('appids', 'names', 'forever', 'recent')
+
+    def __init__(self):
+        self.appids = array('q')
+        self.names: List[str] = []
+        self.forever = array('d')
+        self.recent = array('d')
+
+    def append(self, appid: int, name: str, hours_forever: float, hours_recent: float) -> None:
+        self.appids.append(appid)
+        # the same titles recur across a family's libraries
+        self.names.append(sys.intern(name))
+        self.forever.append(hours_forever)
+        self.recent.append(hours_recent)
+
+    def columns(self) -> Iterator[Tuple[int, str, float, float]]:
+        return zip(self.appids, self.names, self.forever, self.recent)
+
+    def __len__(self) -> int:
+        return len(self.appids)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        return {
+            "appid": str(self.appids[i]),
+            "name": self.names[i],
+            "hoursOnRecord": self.forever[i],
+            "hoursLast2Weeks": self.recent[i],
+        }
+
+    def as_dicts(self) -> List[Dict]:
+        return [self[i] for i in range(len(self))]
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Union[Dict, Tuple[str, str, float, float]]]) -> "Library":
+        lib = cls()
+        for r in rows:
+            if isinstance(r, dict):
+                r = (r.get('appid'), r.get('name') or '', r.get('hoursOnRecord'), r.get('hoursLast2Weeks'))
+            appid, name, h_all, h_recent = r
+            try:
+                appid = int(appid)
+            except (TypeError, ValueError):
+                continue  # Steam appids are integers; anything else is noise
+            lib.append(appid, name, float(h_all or 0.0), float(h_recent or 0.0))
+        return lib
+
+    def __repr__(self) -> str:
+        return f"<Library {len(self)} games>"
+
+
+@dataclass
+class FriendPage:
+    """Timing and size of one fetched friends page."""
+    page: int
+    bytes: int
+    parse_s: float
+    friends: int
+
+
+@dataclass
+class FriendsCrawl:
+    """A seed's deduplicated friends plus per-page stats from ``crawl_friends``."""
+    friends: List[Dict] = field(default_factory=list)
+    pages: List[FriendPage] = field(default_factory=list)
+    page_hint: Optional[int] = None  # last page announced by a pager, if the markup had one
+
+    @property
+    def page_count(self) -> int:
+        return len(self.pages)
+
+    @property
+    def parse_s(self) -> float:
+        return sum(p.parse_s for p in self.pages)
+
+    @property
+    def bytes(self) -> int:
+        return sum(p.bytes for p in self.pages)
@@ -0,0 +1,126 @@
+from __future__ import annotations
+import concurrent.futures as cf
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from . import metrics
+from .clients import MAX_WORKERS, resolve_steam64
+from .util import is_steam64
+
+logger = logging.getLogger("steamagg.resolver")
+
+
+class VanityTable:
+    """Persistent vanity -> steam64 lookups. Custom URLs are case-insensitive, so keys are lowercased."""
+
+    def __init__(self, directory: str):
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, 'vanity.sqlite')
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("CREATE TABLE IF NOT EXISTS vanity (name TEXT PRIMARY KEY, steam64 TEXT, resolved_at REAL)")
+        self._conn.commit()
+
+    def get_many(self, names: Iterable[str]) -> Dict[str, str]:
+        keys = list({n.lower() for n in names})
+        out: Dict[str, str] = {}
+        with self._lock:
+            for i in range(0, len(keys), 500):
+                batch = keys[i:i + 500]
+                q = f"SELECT name, steam64 FROM vanity WHERE name IN ({','.join('?' * len(batch))})"
+                out.update(self._conn.execute(q, batch).fetchall())
+        return out
+
+    def put_many(self, pairs: Iterable[Tuple[str, str]]) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.executemany("INSERT OR REPLACE INTO vanity VALUES (?, ?, ?)",
+                                   [(n.lower(), s64, now) for n, s64 in pairs])
+            self._conn.commit()
+
+
+# Configured by the entry points (see configure_vanity_table); None keeps lookups in-process only.
+VANITY_TABLE: Optional[VanityTable] = None
+
+
+def configure_vanity_table(directory: Optional[str]) -> Optional[VanityTable]:
+    global VANITY_TABLE
+    VANITY_TABLE = VanityTable(directory) if directory else None
+    return VANITY_TABLE
+
+
+def resolve_many(names: Iterable[str], max_workers: int = MAX_WORKERS
+                 ) -> Dict[str, Tuple[Optional[str], Optional[str]]]:
+    """Resolve many vanities at once: dedupe, answer known ones from VANITY_TABLE and
+    fetch only the misses, concurrently (each request still passes the gate).
+
+    Returns ``{name: (steam64 or None, error or None)}`` for every distinct input name.
+    """
+    wanted = list(dict.fromkeys(n.strip() for n in names if n and n.strip()))
+    out: Dict[str, Tuple[Optional[str], Optional[str]]] = {}
+    table = VANITY_TABLE
+    known = table.get_many(wanted) if table is not None else {}
+
+    misses: List[str] = []
+    for name in wanted:
+        if is_steam64(name):
+            out[name] = (name, None)
+        elif name.lower() in known:
+            out[name] = (known[name.lower()], None)
+        else:
+            misses.append(name)
+
+    # several spellings of one vanity only need one request
+    by_key: Dict[str, List[str]] = {}
+    for name in misses:
+        by_key.setdefault(name.lower(), []).append(name)
+
+    fresh: List[Tuple[str, str]] = []
+    if by_key:
+        with cf.ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(by_key)))) as pool:
+            futures = {pool.submit(metrics.propagate(resolve_steam64), spellings[0]): key for key, spellings in by_key.items()}
+            for fut in cf.as_completed(futures):
+                key = futures[fut]
+                try:
+                    s64, err = fut.result()
+                except Exception as e:
+                    s64, err = None, str(e) or type(e).__name__
+                for name in by_key[key]:
+                    out[name] = (s64, err)
+                if s64:
+                    fresh.append((key, s64))
+    if table is not None and fresh:
+        table.put_many(fresh)
+    logger.info("Resolved %d names: %d known, %d fetched, %d failed",
+                len(wanted), len(wanted) - len(misses), len(fresh), sum(1 for s, _ in out.values() if not s))
+    return out
+
+
+def resolve_entries(entries: Iterable[Tuple[str, str]],
+                    lookups: Optional[Dict[str, Tuple[Optional[str], Optional[str]]]] = None,
+                    ) -> Tuple[List[Tuple[str, str]], List[Tuple[str, str]]]:
+    """Turn ``(vanity, steam64_id)`` CSV rows into ``[(label, steam64)]`` in input order,
+    plus ``[(vanity, error)]`` for rows whose vanity could not be resolved. Blank rows are skipped.
+
+    ``lookups`` is a ``resolve_many`` result to reuse (e.g. shared by several CSVs); by default
+    the vanities are resolved here.
+    """
+    entries = list(entries)
+    if lookups is None:
+        lookups = resolve_many(v for v, s64 in entries if v and not (s64 and is_steam64(s64)))
+    resolved: List[Tuple[str, str]] = []
+    failures: List[Tuple[str, str]] = []
+    for vanity, s64 in entries:
+        if s64 and is_steam64(s64):
+            resolved.append((vanity or s64, s64))
+        elif vanity:
+            r, err = lookups.get(vanity.strip(), (None, "not resolved"))
+            if r:
+                resolved.append((vanity, r))
+            else:
+                failures.append((vanity, err or "unknown error"))
+    return resolved, failures
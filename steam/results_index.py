@@ -0,0 +1,102 @@
+"""Sorted, filtered, paged views over one run's aggregated rows, for the results API.
+
+Sort orders for every column and direction are computed once up front; a filter goes through a
+trigram index over ``"<appid> <name>"``, built on first use (queries shorter than three
+characters scan). The filtered order for a (query, column, direction) is cached, so
+scrolling through a view only slices a list.
+"""
+from __future__ import annotations
+import threading
+from array import array
+from typing import Dict, List, Optional, Tuple
+
+from .cache import TTLCache
+
+COLUMNS = ("appid", "name", "family_playtime_forever_h", "family_playtime_recent_h", "owners_count")
+DEFAULT_SORT = ("family_playtime_forever_h", "desc")
+
+
+def _trigrams(text: str):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class ResultsIndex:
+    def __init__(self, rows: List[Dict]):
+        self.rows = rows
+        self._haystack = [f"{r['appid']} {r['name']}".casefold() for r in rows]
+        # both directions per column; ties go by name then appid in either one, as in the CSV,
+        # so reading the ascending order backwards would not do
+        appid = lambda i: int(rows[i]["appid"])
+        by_appid = sorted(range(len(rows)), key=appid)
+        by_name = sorted(by_appid, key=lambda i: rows[i]["name"].lower())
+        self._orders: Dict[Tuple[str, str], array] = {}
+        for col in COLUMNS:
+            if col == "appid":
+                base, key = by_appid, appid
+            elif col == "name":
+                base, key = by_appid, lambda i: rows[i]["name"].casefold()
+            else:
+                base, key = by_name, lambda i, col=col: rows[i][col]
+            # sorted() is stable with reverse=True too, so equal keys keep the base order
+            self._orders[col, 'asc'] = array('i', sorted(base, key=key))
+            self._orders[col, 'desc'] = array('i', sorted(base, key=key, reverse=True))
+        self._postings: Optional[Dict[str, array]] = None
+        self._postings_lock = threading.Lock()
+        self._views = TTLCache(maxsize=64, ttl=600)
+
+    def _trigram_index(self) -> Dict[str, array]:
+        # built on the first filter, so a page that is only scrolled and sorted never pays for it
+        with self._postings_lock:
+            if self._postings is None:
+                postings: Dict[str, array] = {}
+                for i, text in enumerate(self._haystack):
+                    for g in _trigrams(text):
+                        lst = postings.get(g)
+                        if lst is None:
+                            lst = postings[g] = array('i')
+                        lst.append(i)
+                self._postings = postings
+            return self._postings
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def matches(self, q: str) -> Optional[bytearray]:
+        """Row mask for rows whose appid or name contains ``q`` (case-insensitive); None = all rows."""
+        q = (q or '').strip().casefold()
+        if not q:
+            return None
+        hay = self._haystack
+        mask = bytearray(len(hay))
+        if len(q) < 3:
+            candidates = range(len(hay))
+        else:
+            postings = self._trigram_index()
+            lists = sorted((postings.get(g, ()) for g in _trigrams(q)), key=len)
+            candidates = set(lists[0])
+            for other in lists[1:]:
+                if not candidates:
+                    break
+                candidates.intersection_update(other)
+        for i in candidates:
+            if q in hay[i]:  # trigrams only narrow it down; confirm the substring
+                mask[i] = 1
+        return mask
+
+    def view(self, sort: str = DEFAULT_SORT[0], order: str = DEFAULT_SORT[1], q: str = '') -> List[int]:
+        sort = sort if sort in COLUMNS else DEFAULT_SORT[0]
+        order = 'asc' if order == 'asc' else 'desc'
+        key = (sort, order, (q or '').strip().casefold())
+
+        def build() -> List[int]:
+            ids = self._orders[sort, order]
+            mask = self.matches(key[2])
+            return list(ids) if mask is None else [i for i in ids if mask[i]]
+        return self._views.get_or_set(key, build)
+
+    def page(self, sort: str = DEFAULT_SORT[0], order: str = DEFAULT_SORT[1], q: str = '',
+             offset: int = 0, limit: int = 100) -> Tuple[int, List[Dict]]:
+        """(matching row count, rows[offset:offset + limit]) of the requested view."""
+        ids = self.view(sort, order, q)
+        offset = max(0, offset)
+        return len(ids), [self.rows[i] for i in ids[offset:offset + max(0, limit)]]
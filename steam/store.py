@@ -0,0 +1,253 @@
+"""Store data for aggregated appids: availability, reviews, release/update dates, size, genres.
+
+    info = enrich_appids(appids_of(agg_rows))          # {appid: {...}}
+    rows = merge_store_info(agg_rows, info)
+
+Per appid this reads the store ``appdetails`` and ``appreviews`` JSON and the latest
+``GetNewsForApp`` item (a stand-in for "last updated"), all through ``clients._get`` so the
+gate, backoff and disk cache apply; the store hosts get their own limiter lanes. Results
+are kept per appid in ``store.sqlite`` for STORE_TTL, so a rerun only fetches appids it has
+not seen. Enrichment has its own pool (STORE_MAX_WORKERS), separate from library fetches.
+
+    python -m steam.store output/libraries_2025-10-12_15-43_seed-gaben.csv [more runs...]
+"""
+from __future__ import annotations
+import argparse
+import concurrent.futures as cf
+import csv
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterable, List, Optional
+
+from . import clients, metrics
+from .export import read_results
+
+logger = logging.getLogger("steamagg.store")
+
+STORE_BASE = "https://store.steampowered.com"
+API_BASE = "https://api.steampowered.com"
+STORE_TTL = 14 * 24 * 3600
+STORE_MAX_WORKERS = 2
+STORE_COLUMNS = ["available", "type", "is_free", "release_date", "last_update", "download_size_mb",
+                 "review_score_desc", "review_positive_pct", "total_reviews", "genres", "tags"]
+
+SIZE_RE = re.compile(r"(?:storage|hard (?:disk|drive)(?: space)?|disk space)\s*:?\s*(?:</strong>)?\s*"
+                     r"([0-9]+(?:[.,][0-9]+)?)\s*(gb|mb)", re.I)
+DATE_FORMATS = ("%d %b, %Y", "%b %d, %Y", "%d %B, %Y", "%B %d, %Y", "%b %Y", "%B %Y", "%Y")
+
+
+class StoreCache:
+    """appid -> store info JSON with the time it was fetched."""
+
+    def __init__(self, directory: str):
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, 'store.sqlite')
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("CREATE TABLE IF NOT EXISTS apps (appid INTEGER PRIMARY KEY, info TEXT, fetched_at REAL)")
+        self._conn.commit()
+
+    def get_many(self, appids: Iterable[int], ttl: float = STORE_TTL) -> Dict[int, dict]:
+        keys = list(appids)
+        cutoff = time.time() - ttl
+        out: Dict[int, dict] = {}
+        with self._lock:
+            for i in range(0, len(keys), 500):
+                batch = keys[i:i + 500]
+                q = f"SELECT appid, info FROM apps WHERE fetched_at > ? AND appid IN ({','.join('?' * len(batch))})"
+                out.update((a, json.loads(info)) for a, info in self._conn.execute(q, [cutoff, *batch]))
+        return out
+
+    def put(self, appid: int, info: dict) -> None:
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO apps VALUES (?, ?, ?)", (appid, json.dumps(info), time.time()))
+            self._conn.commit()
+
+
+# Configured by the entry points (see configure_store_cache); None keeps results in-process only.
+STORE_CACHE: Optional[StoreCache] = None
+
+
+def configure_store_cache(directory: Optional[str]) -> Optional[StoreCache]:
+    global STORE_CACHE
+    STORE_CACHE = StoreCache(directory) if directory else None
+    return STORE_CACHE
+
+
+def _get_json(url: str) -> Optional[dict]:
+    resp = clients._get(url)
+    if resp.status_code != 200:
+        raise RuntimeError(f"HTTP {resp.status_code} for {url}")
+    try:
+        return resp.json()
+    except ValueError:
+        return None
+
+
+def _iso_date(text: Optional[str]) -> Optional[str]:
+    text = (text or '').strip()
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(text, fmt).date().isoformat()
+        except ValueError:
+            continue
+    return None
+
+
+def _download_size_mb(requirements) -> Optional[float]:
+    # pc_requirements is {"minimum": html, ...}, or [] when the store lists none
+    text = requirements.get('minimum', '') if isinstance(requirements, dict) else ''
+    m = SIZE_RE.search(text or '')
+    if not m:
+        return None
+    size = float(m.group(1).replace(',', '.'))
+    return size * 1024 if m.group(2).lower() == 'gb' else size
+
+
+def parse_appdetails(appid: int, doc: Optional[dict]) -> dict:
+    entry = (doc or {}).get(str(appid)) or {}
+    if not entry.get('success'):
+        return {"available": False}
+    data = entry.get('data') or {}
+    release = data.get('release_date') or {}
+    return {
+        "available": not release.get('coming_soon', False),
+        "type": data.get('type'),
+        "is_free": bool(data.get('is_free')),
+        "release_date": _iso_date(release.get('date')) or release.get('date') or None,
+        "download_size_mb": _download_size_mb(data.get('pc_requirements')),
+        "genres": [g.get('description') for g in data.get('genres') or [] if g.get('description')],
+        # appdetails has no user tags; store categories are the closest structured equivalent
+        "tags": [c.get('description') for c in data.get('categories') or [] if c.get('description')],
+    }
+
+
+def parse_appreviews(doc: Optional[dict]) -> dict:
+    summary = (doc or {}).get('query_summary') or {}
+    total = int(summary.get('total_reviews') or 0)
+    return {
+        "review_score_desc": summary.get('review_score_desc'),
+        "review_positive_pct": round(100.0 * int(summary.get('total_positive') or 0) / total, 1) if total else None,
+        "total_reviews": total,
+    }
+
+
+def parse_news(doc: Optional[dict]) -> dict:
+    items = ((doc or {}).get('appnews') or {}).get('newsitems') or []
+    ts = max((int(i.get('date') or 0) for i in items), default=0)
+    return {"last_update": datetime.fromtimestamp(ts, timezone.utc).date().isoformat() if ts else None}
+
+
+def fetch_store_info(appid: int) -> dict:
+    """Store info for one appid (three requests, or one for an app the store no longer lists)."""
+    info = parse_appdetails(appid, _get_json(f"{STORE_BASE}/api/appdetails?appids={appid}&l=english"))
+    if info.get("type") is None and not info["available"]:
+        return info  # delisted: no reviews or news to fetch
+    info.update(parse_appreviews(_get_json(
+        f"{STORE_BASE}/appreviews/{appid}?json=1&language=all&purchase_type=all&num_per_page=0")))
+    info.update(parse_news(_get_json(
+        f"{API_BASE}/ISteamNews/GetNewsForApp/v2/?appid={appid}&count=1&feeds=steam_community_announcements")))
+    return info
+
+
+def appids_of(*row_lists: Iterable[Dict]) -> List[int]:
+    """Distinct appids across any number of aggregate() outputs (or saved runs), first-seen order."""
+    seen: Dict[int, None] = {}
+    for rows in row_lists:
+        for r in rows:
+            try:
+                seen.setdefault(int(r["appid"]), None)
+            except (KeyError, TypeError, ValueError):
+                continue
+    return list(seen)
+
+
+def enrich_appids(appids: Iterable[int], max_workers: int = STORE_MAX_WORKERS,
+                  on_progress: Optional[Callable[[int, int], None]] = None) -> Dict[int, dict]:
+    """Store info for each appid: cached ones from STORE_CACHE, the rest fetched concurrently.
+
+    Appids whose fetch fails are left out (and not cached), so a later run retries them.
+    ``on_progress(done, total)`` is called after each fetch.
+    """
+    wanted = list(dict.fromkeys(int(a) for a in appids))
+    cache = STORE_CACHE
+    out = cache.get_many(wanted) if cache is not None else {}
+    missing = [a for a in wanted if a not in out]
+    failed = 0
+    if missing:
+        with cf.ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(missing)))) as pool:
+            futures = {pool.submit(metrics.propagate(fetch_store_info), a): a for a in missing}
+            for n, fut in enumerate(cf.as_completed(futures), 1):
+                appid = futures[fut]
+                try:
+                    info = fut.result()
+                except Exception as e:
+                    logger.warning("Store data for %s failed: %s", appid, e)
+                    failed += 1
+                else:
+                    out[appid] = info
+                    if cache is not None:
+                        cache.put(appid, info)
+                if on_progress is not None:
+                    on_progress(n, len(missing))
+    logger.info("Store data: %d appids, %d cached, %d fetched, %d failed",
+                len(wanted), len(wanted) - len(missing), len(missing) - failed, failed)
+    return out
+
+
+def merge_store_info(rows: Iterable[Dict], info: Dict[int, dict]) -> List[Dict]:
+    """Result rows with STORE_COLUMNS added (blank where no store data is known)."""
+    out = []
+    for r in rows:
+        extra = info.get(int(r["appid"]), {})
+        merged = dict(r)
+        for col in STORE_COLUMNS:
+            v = extra.get(col)
+            merged[col] = "; ".join(v) if isinstance(v, list) else v
+        out.append(merged)
+    return out
+
+
+def write_enriched_csv(rows: List[Dict], path: str) -> str:
+    fields = list(rows[0].keys()) if rows else STORE_COLUMNS
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        w = csv.DictWriter(f, fieldnames=fields)
+        w.writeheader()
+        w.writerows(rows)
+    return path
+
+
+def enriched_path(run_path: str) -> str:
+    base = os.path.basename(run_path)
+    for ext in ('.csv', '.jsonl.gz', '.parquet'):
+        if base.endswith(ext):
+            base = base[:-len(ext)]
+            break
+    return os.path.join(os.path.dirname(run_path), f"{base}_store.csv")
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    ap = argparse.ArgumentParser(description="Add store data to saved runs")
+    ap.add_argument('runs', nargs='+', help='run files written by the aggregator (csv, jsonl.gz, parquet)')
+    ap.add_argument('--cache-dir', default=os.environ.get("STEAMAGG_CACHE_DIR") or 'cache')
+    ap.add_argument('--workers', type=int, default=STORE_MAX_WORKERS)
+    args = ap.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='[%(asctime)s] %(levelname)s: %(message)s')
+    configure_store_cache(args.cache_dir)
+    runs = {path: list(read_results(path)) for path in args.runs}
+    # one fetch per appid no matter how many runs share it
+    info = enrich_appids(appids_of(*runs.values()), max_workers=args.workers,
+                         on_progress=lambda n, total: print(f"  store data {n}/{total}", end='\r'))
+    for path, rows in runs.items():
+        print(f"Wrote {write_enriched_csv(merge_store_info(rows, info), enriched_path(path))}")
+
+
+if __name__ == '__main__':
+    main()
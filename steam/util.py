@@ -1,5 +1,7 @@
+import csv
+import io
 import re
-from typing import List, Dict
+from typing import Dict, Iterator, List, Tuple
 
 STEAM64_RE = re.compile(r"^[0-9]{17}$")
 SLUG_RE = re.compile(r"[^a-z0-9]+")
@@ -39,4 +41,16 @@ def friends_url(id_or_vanity: str) -> str:
     if is_steam64(id_or_vanity):
         return f"https://steamcommunity.com/profiles/{id_or_vanity}/friends"
     else:
-        return f"https://steamcommunity.com/id/{id_or_vanity}/friends"
\ No newline at end of file
+        return f"https://steamcommunity.com/id/{id_or_vanity}/friends"
+
+def iter_id_csv(stream) -> Iterator[Tuple[str, str]]:
+    """Yield (vanity, steam64_id) from a ``vanity,steam64_id`` CSV, reading the stream
+    incrementally. Accepts text or binary file objects (e.g. an upload's ``.stream``)."""
+    text = stream if isinstance(stream, io.TextIOBase) else io.TextIOWrapper(
+        stream, encoding='utf-8', errors='ignore', newline='')
+    try:
+        for row in csv.DictReader(text):
+            yield (row.get('vanity') or '').strip(), (row.get('steam64_id') or '').strip()
+    finally:
+        if text is not stream:
+            text.detach()  # leave the caller's stream open
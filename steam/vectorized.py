@@ -0,0 +1,114 @@
+"""NumPy aggregation path for bulk / cross-family runs (requires the optional numpy dependency).
+
+``aggregate_np`` returns exactly what ``steam.aggregate.aggregate`` does for the same input,
+but group-sums with ``unique``/``bincount`` and can stop at a top-K instead of sorting
+every appid.
+"""
+from __future__ import annotations
+import csv
+import os
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from .aggregate import Rows
+from .records import Library
+
+SORTABLE = ('family_playtime_forever_h', 'family_playtime_recent_h', 'owners_count')
+
+
+def _concat(games_by_user: Dict[str, Rows]):
+    libs = [r if isinstance(r, Library) else Library.from_rows(r) for r in games_by_user.values()]
+    sizes = [len(lib) for lib in libs]
+    appids = np.concatenate([np.frombuffer(lib.appids, dtype=np.int64) for lib in libs]) if libs else np.empty(0, np.int64)
+    forever = np.concatenate([np.frombuffer(lib.forever, dtype=np.float64) for lib in libs]) if libs else np.empty(0)
+    recent = np.concatenate([np.frombuffer(lib.recent, dtype=np.float64) for lib in libs]) if libs else np.empty(0)
+    owner = np.repeat(np.arange(len(libs), dtype=np.int64), sizes)
+    names: List[str] = []
+    for lib in libs:
+        names.extend(lib.names)
+    return appids, forever, recent, owner, names, len(libs)
+
+
+def _round1(values: np.ndarray) -> np.ndarray:
+    # np.round(x, 1) is rint(x * 10) / 10 and agrees with Python's round(x, 1) unless x * 10
+    # lands next to a .5 boundary; recompute just those with round() to match aggregate().
+    out = np.round(values, 1)
+    scaled = values * 10
+    near_half = np.flatnonzero(np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6)
+    for i in near_half.tolist():
+        out[i] = round(float(values[i]), 1)
+    return out
+
+
+def aggregate_np(games_by_user: Dict[str, Rows], top_k: Optional[int] = None,
+                 sort_by: str = 'family_playtime_forever_h') -> List[dict]:
+    """Group-sum hours and count distinct owners per appid.
+
+    Rows are ordered by ``sort_by`` descending, then name (case-insensitive), then first
+    appearance — the same order as ``aggregate()`` for the default column. With ``top_k``
+    only the best K rows are selected (partition, then sort just the candidates).
+    """
+    if sort_by not in SORTABLE:
+        raise ValueError(f"sort_by must be one of {SORTABLE}")
+    appids, forever, recent, owner, names, n_users = _concat(games_by_user)
+    if appids.size == 0:
+        return []
+
+    uniq, first_idx, inverse = np.unique(appids, return_index=True, return_inverse=True)
+    n = uniq.size
+    # bincount accumulates in input order, matching the float sums of the pure-Python loop
+    forever_sum = np.bincount(inverse, weights=forever, minlength=n)
+    recent_sum = np.bincount(inverse, weights=recent, minlength=n)
+    pairs = np.sort(inverse.astype(np.int64) * n_users + owner)
+    distinct = pairs[np.concatenate(([True], pairs[1:] != pairs[:-1]))]
+    owners_count = np.bincount(distinct // n_users, minlength=n)
+
+    forever_r = _round1(forever_sum)
+    recent_r = _round1(recent_sum)
+    column = {'family_playtime_forever_h': forever_r, 'family_playtime_recent_h': recent_r,
+              'owners_count': owners_count}[sort_by]
+
+    if top_k is not None and top_k < n:
+        if top_k <= 0:
+            return []
+        # everything tied with the K-th value stays a candidate so ties resolve like a full sort
+        threshold = np.partition(column, n - top_k)[n - top_k]
+        candidates = np.flatnonzero(column >= threshold)
+    else:
+        candidates = np.arange(n)
+
+    cand = candidates.tolist()
+    col = column.tolist()
+    first = first_idx.tolist()
+    cand.sort(key=lambda i: (-col[i], names[first[i]].lower(), first[i]))
+    if top_k is not None:
+        cand = cand[:max(top_k, 0)]
+
+    idx = np.asarray(cand, dtype=np.int64)
+    return [
+        {
+            'appid': str(appid),
+            'name': names[fi],
+            'family_playtime_forever_h': f,
+            'family_playtime_recent_h': r,
+            'owners_count': o,
+        }
+        for appid, fi, f, r, o in zip(uniq[idx].tolist(), first_idx[idx].tolist(), forever_r[idx].tolist(),
+                                      recent_r[idx].tolist(), owners_count[idx].tolist())
+    ]
+
+
+def libraries_from_outputs(paths: Iterable[str]) -> Dict[str, Library]:
+    """Load saved run CSVs (``output/libraries_*.csv``) as one Library per run.
+
+    Aggregating these gives cross-family totals, where ``owners_count`` is the number of
+    runs (families) that contain the appid.
+    """
+    out: Dict[str, Library] = {}
+    for path in paths:
+        with open(path, 'r', encoding='utf-8', newline='') as f:
+            rows = ((r.get('appid'), r.get('name') or '', r.get('family_playtime_forever_h'),
+                     r.get('family_playtime_recent_h')) for r in csv.DictReader(f))
+            out[os.path.basename(path)] = Library.from_rows(rows)
+    return out
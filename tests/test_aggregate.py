@@ -0,0 +1,24 @@
+from steam.aggregate import IncrementalAggregator, aggregate
+
+
+def _lib(name, hours):
+    return [{"appid": "10", "name": name, "hoursOnRecord": hours, "hoursLast2Weeks": 0.0}]
+
+
+def test_remove_user_takes_the_name_from_a_remaining_owner():
+    agg = IncrementalAggregator()
+    agg.add_user("u1", _lib("Old", 1.0))
+    agg.add_user("u2", _lib("New", 2.0))
+    agg.remove_user("u1")
+    assert agg.snapshot() == aggregate({"u2": _lib("New", 2.0)})
+    assert agg.snapshot()[0]["name"] == "New"
+
+
+def test_snapshot_matches_aggregate_after_add_and_remove():
+    libs = {"u1": _lib("Old", 1.0), "u2": _lib("New", 2.0), "u3": _lib("Newer", 4.0)}
+    agg = IncrementalAggregator()
+    for uid, rows in libs.items():
+        agg.add_user(uid, rows)
+    agg.remove_user("u2")
+    agg.add_user("u1", _lib("Old", 1.5))  # re-adding moves u1 behind u3
+    assert agg.snapshot() == aggregate({"u3": libs["u3"], "u1": _lib("Old", 1.5)})
@@ -0,0 +1,20 @@
+from datetime import datetime
+
+from steam.export import export_results
+from steam.history import HistoryStore
+
+
+def _run(directory, seed, ts, hours):
+    rows = [{"appid": appid, "name": f"Game {appid}", "family_playtime_forever_h": h,
+             "family_playtime_recent_h": 0.0, "owners_count": 1} for appid, h in hours.items()]
+    export_results(rows, seed, directory=str(directory), run_ts=datetime.fromisoformat(ts))
+
+
+def test_top_growth_skips_seeds_with_a_single_run(tmp_path):
+    _run(tmp_path, "a", "2025-01-01 10:00", {10: 5.0, 20: 1.0})
+    _run(tmp_path, "a", "2025-01-02 10:00", {10: 7.5, 20: 1.0})
+    _run(tmp_path, "b", "2025-01-02 10:00", {30: 900.0})  # one run only: no growth to report
+    with HistoryStore(str(tmp_path / "history.sqlite")) as store:
+        assert store.ingest(str(tmp_path)) == 3
+        rows = store.top_growth()
+    assert [(seed, appid, growth) for seed, appid, _, growth, _ in rows] == [("a", 10, 2.5), ("a", 20, 0.0)]
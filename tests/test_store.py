@@ -0,0 +1,48 @@
+import pytest
+
+from bench.stub_server import StubServer, StubSteam
+from steam import clients, store
+from steam.rate_limit import AdaptiveGate
+
+
+@pytest.fixture
+def stub(monkeypatch, tmp_path):
+    with StubServer(StubSteam(users=1)) as srv:
+        # every store and Web API request goes to the stub, through an open gate and no disk cache
+        monkeypatch.setattr(store, "STORE_BASE", srv.url)
+        monkeypatch.setattr(store, "API_BASE", srv.url)
+        monkeypatch.setattr(clients, "GATE", AdaptiveGate(base_delay=1e-4, max_rate=1e6, jitter=(0.0, 0.0)))
+        monkeypatch.setattr(clients, "DISK_CACHE", None)
+        monkeypatch.setattr(store, "STORE_CACHE", store.StoreCache(str(tmp_path)))
+        yield srv
+
+
+def test_fetch_store_info(stub):
+    info = store.fetch_store_info(730)
+    assert info["available"] and info["type"] == "game" and info["is_free"] is False
+    assert info["release_date"][:2] in ("19", "20") and info["last_update"]
+    assert info["download_size_mb"] % 1024 == 0
+    assert info["review_score_desc"] == "Very Positive" and 0 < info["review_positive_pct"] <= 100
+    assert info["tags"] == ["Single-player", "Multi-player"] and len(info["genres"]) == 2
+    assert stub.requests == 3
+
+    assert store.fetch_store_info(1000) == {"available": False}  # delisted: appdetails only
+    assert stub.requests == 4
+
+
+def test_enrich_appids_reuses_the_store_cache(stub):
+    appids = [730, 1000, 730, 440]
+    info = store.enrich_appids(appids)
+    assert sorted(info) == [440, 730, 1000]
+    assert stub.requests == 3 + 1 + 3
+
+    assert store.enrich_appids(appids) == info
+    assert stub.requests == 7  # the rerun is served entirely from store.sqlite
+
+    rows = [{"appid": 730, "name": "A"}, {"appid": 1000, "name": "B"}, {"appid": 99, "name": "C"}]
+    merged = store.merge_store_info(rows, info)
+    assert [list(r)[2:] for r in merged] == [store.STORE_COLUMNS] * 3
+    assert merged[0]["genres"] == "; ".join(info[730]["genres"])
+    assert merged[0]["total_reviews"] == info[730]["total_reviews"]
+    assert merged[1]["available"] is False and merged[1]["total_reviews"] is None
+    assert all(merged[2][col] is None for col in store.STORE_COLUMNS)